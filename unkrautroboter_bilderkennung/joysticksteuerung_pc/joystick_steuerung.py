@@ -2,7 +2,9 @@
 # C:\Users\johan\OneDrive\Documents\KI-Projekte\Roboter\unkrautroboter_bilderkennung>  python3 joystick_steuerung.py
 
 import pygame
+import random
 import socket
+import struct
 import time
 import threading
 
@@ -10,6 +12,21 @@ import threading
 UDP_IP = "192.168.179.252"  # IP-Adresse des Raspberry Pi
 UDP_PORT = 5006  # Neuer UDP-Port für Joystick-Daten
 
+# "binary": kompaktes Datagramm mit Sequenznummer, bei Änderung mit bis zu 50 Hz (niedrige Latenz)
+# "text":   bisheriges Format JOYSTICK:X=..,Y=..[,B=..] alle 500 ms
+PROTOCOL = "binary"
+BUTTON_INDEX_1 = 1  # physical button index that should send B=1
+BUTTON_INDEX_3 = 2  # physical button index that should send B=3
+
+# Binärformat – muss zu src/joystick_protocol.py auf dem Pi passen
+BIN_STRUCT = struct.Struct("<2sBBIIIbbBB")
+BIN_MAGIC = b"\xa7J"
+BIN_VERSION = 1
+TYPE_STATE, TYPE_PING, TYPE_PONG = 0, 1, 2
+BIN_POLL_S = 0.02  # 50 Hz
+BIN_KEEPALIVE_S = 0.25  # unveränderten Zustand trotzdem wiederholen (verlorene Pakete)
+PING_INTERVAL_S = 1.0
+
 
 # Joystick-Initialisierung
 def init_joystick():
@@ -33,11 +50,7 @@ def joystick_to_udp(joystick):
     """
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 
-    # Configure two physical buttons. Each maps to a button code sent as B=<code>.
-    # Defaults: physical button at index 0 -> sends B=1; physical button at index 1 -> sends B=3.
-    # These are 0-based joystick button indices and are user-configurable.
-    BUTTON_INDEX_1 = 1  # physical button index that should send B=1
-    BUTTON_INDEX_3 = 2  # physical button index that should send B=3
+    # Two physical buttons (BUTTON_INDEX_1/BUTTON_INDEX_3 above), each sent as B=<code>.
     SEND_INTERVAL_MS = 500
 
     # Per-button edge detection / latch state
@@ -105,12 +118,92 @@ def joystick_to_udp(joystick):
         time.sleep(0.02)
 
 
+def _now_ms():
+    return int(time.monotonic() * 1000) & 0xFFFFFFFF
+
+
+def _pong_listener(sock):
+    """Empfängt PONGs und gibt alle 5 s die Round-Trip-Zeit (min/mittel/max) aus."""
+    rtts = []
+    last_print = time.monotonic()
+    while True:
+        try:
+            data, _ = sock.recvfrom(64)
+        except socket.timeout:
+            data = None
+        except OSError:
+            time.sleep(0.1)
+            continue
+        if data and len(data) == BIN_STRUCT.size:
+            magic, version, typ, _, _, ts_ms, *_rest = BIN_STRUCT.unpack(data)
+            if magic == BIN_MAGIC and version == BIN_VERSION and typ == TYPE_PONG:
+                rtts.append((_now_ms() - ts_ms) & 0xFFFFFFFF)
+        if time.monotonic() - last_print >= 5.0:
+            if rtts:
+                print(f"RTT: min {min(rtts)} ms, Mittel {sum(rtts) / len(rtts):.1f} ms, max {max(rtts)} ms ({len(rtts)} Pings)")
+            else:
+                print("RTT: keine Antwort vom Pi")
+            rtts = []
+            last_print = time.monotonic()
+
+
+def joystick_to_udp_binary(joystick):
+    """
+    Binärformat: Zustand (Achsen, gehaltene Tasten, Klickzähler) wird mit 50 Hz abgefragt und sofort
+    gesendet, sobald er sich ändert, sonst alle BIN_KEEPALIVE_S. Jedes Paket trägt Session und
+    Sequenznummer; der Pi verwirft veraltete/umsortierte Pakete. Klicks auf Taste 1 werden gezählt,
+    damit ein verlorenes Paket keinen Klick verschluckt. Zusätzlich misst ein PING/PONG die Latenz.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(0.5)
+    threading.Thread(target=_pong_listener, args=(sock,), daemon=True).start()
+    session = random.getrandbits(32)
+    seq = 0
+    clicks = 0
+    last_button_1 = 0
+    last_state = None
+    last_send = 0.0
+    last_ping = 0.0
+
+    def send(typ, x, y, buttons):
+        nonlocal seq
+        if typ == TYPE_STATE:  # PINGs zählen nicht mit (sonst sähe der Pi Lücken)
+            seq = (seq + 1) & 0xFFFFFFFF
+        pkt = BIN_STRUCT.pack(BIN_MAGIC, BIN_VERSION, typ, session, seq, _now_ms(), x, y, buttons, clicks & 0xFF)
+        sock.sendto(pkt, (UDP_IP, UDP_PORT))
+
+    print(f"Binärprotokoll, Session {session:08x}")
+    while True:
+        pygame.event.pump()
+        x = int(max(-1.0, min(1.0, joystick.get_axis(0))) * 100)
+        y = int(max(-1.0, min(1.0, joystick.get_axis(1))) * 100)
+        button_1 = 1 if joystick.get_button(BUTTON_INDEX_1) else 0
+        button_3 = 1 if joystick.get_button(BUTTON_INDEX_3) else 0
+        if button_1 and not last_button_1:
+            clicks += 1
+        last_button_1 = button_1
+        buttons = (0x01 if button_1 else 0) | (0x02 if button_3 else 0)
+        state = (x, y, buttons, clicks)
+        now = time.monotonic()
+        if state != last_state or now - last_send >= BIN_KEEPALIVE_S:
+            send(TYPE_STATE, x, y, buttons)
+            if state != last_state:
+                print(f"Gesendet: X={x},Y={y},Tasten={buttons:02b},Klicks={clicks}")
+            last_state = state
+            last_send = now
+        if now - last_ping >= PING_INTERVAL_S:
+            send(TYPE_PING, 0, 0, 0)
+            last_ping = now
+        time.sleep(BIN_POLL_S)
+
+
 # Hauptprogramm
 if __name__ == "__main__":
     joystick = init_joystick()
 
     # Joystick-Thread starten
-    joystick_thread = threading.Thread(target=joystick_to_udp, args=(joystick,))
+    target = joystick_to_udp_binary if PROTOCOL == "binary" else joystick_to_udp
+    joystick_thread = threading.Thread(target=target, args=(joystick,))
     joystick_thread.daemon = True
     joystick_thread.start()
 
@@ -33,6 +33,23 @@ if (isset($_GET['reset'])) {
     exit;
 }
 
+// Standby-Modell übernehmen: ?promote_model=1 per GET – sendet UDP "PROMOTE_MODEL" an den Pi
+if (isset($_GET['promote_model'])) {
+    $udpHost = "192.168.179.252"; // IP-Adresse des Raspberry Pi
+    $udpPort = 5005; // Steuer-Port
+    $socket = socket_create(AF_INET, SOCK_DGRAM, SOL_UDP);
+    if ($socket) {
+        $msg = "PROMOTE_MODEL";
+        socket_sendto($socket, $msg, strlen($msg), 0, $udpHost, $udpPort);
+        socket_close($socket);
+        echo "OK";
+    } else {
+        http_response_code(500);
+        echo "Fehler beim Erstellen des Sockets";
+    }
+    exit;
+}
+
 // Virtuelles Joystick-Forwarding (POST): x,y in -100..100, optional button=1 (sent as B=1)
 if ($_SERVER['REQUEST_METHOD'] === 'POST' && isset($_POST['joy'])) {
     $x = isset($_POST['x']) ? intval($_POST['x']) : 0;
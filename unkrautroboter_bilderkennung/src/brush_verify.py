@@ -0,0 +1,117 @@
+"""
+Nachkontrolle gebürsteter Ziele mit automatischer Wiederholung.
+
+Der Mega meldet nach senkeBuersteZuPosition nichts zurück; der Pi sieht den Boden erst beim
+nächsten GETXY wieder. Deshalb werden die zuletzt gesendeten (= behandelten) Ziele um die
+gefahrene Strecke verschoben (siehe tracker.firmware_advance_mm), per world_to_pixels ins neue
+Bild projiziert und nur auf einem kleinen Ausschnitt um jede Position geprüft (Excess-Green-Anteil).
+Ist dort noch Bewuchs, wird das Ziel in den nächsten XY-Batch übernommen – höchstens
+BRUSH_VERIFY_MAX_RETRIES-mal.
+
+Der Mega fährt nicht rückwärts: Ziele, die deutlich hinter der Bürste liegen (Y < -Toleranz),
+können nicht erneut angefahren werden und werden nur gezählt.
+"""
+
+import logging
+from typing import Optional
+
+import numpy as np
+
+from . import config, detections, geometry, tracker, vegetation
+
+logger = logging.getLogger("brush_verify")
+
+
+def green_fraction(frame: np.ndarray, box) -> Optional[float]:
+    """Excess-Green-Anteil (0..1) im Ausschnitt (x1,y1,x2,y2); None, wenn außerhalb des Bildes."""
+    h, w = frame.shape[:2]
+    x1, y1 = max(0, int(box[0])), max(0, int(box[1]))
+    x2, y2 = min(w, int(box[2])), min(h, int(box[3]))
+    if x2 - x1 < 2 or y2 - y1 < 2:
+        return None
+    roi = frame[y1:y2, x1:x2]
+    mask = vegetation.excess_green_mask(roi, width=roi.shape[1])
+    return float(np.count_nonzero(mask)) / float(mask.size)
+
+
+class BrushVerifier:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._treated = detections.empty()
+        self._retries = np.zeros(0, dtype=np.int32)
+        self._advance_mm = 0.0
+        self._pending_retries = (detections.empty(), np.zeros(0, dtype=np.int32))
+        self.stats = {"checked": 0, "cleared": 0, "requeued": 0, "given_up": 0, "unreachable": 0}
+
+    def note_treated(self, det: np.ndarray, xy: np.ndarray) -> None:
+        """Merkt sich die gesendeten Ziele (mit Weltkoordinaten) und die daraus folgende Fahrt."""
+        ok = np.isfinite(det["xw"]) & np.isfinite(det["yw"]) if len(det) else np.zeros(0, dtype=bool)
+        self._treated = det[ok].copy()
+        self._retries = np.zeros(len(self._treated), dtype=np.int32)
+        prev, prev_retries = self._pending_retries
+        if len(prev) and len(self._treated):
+            # Wiederholungszähler der übernommenen Ziele weitertragen
+            r = float(getattr(config, "BRUSH_VERIFY_MATCH_MM", 10.0))
+            d2 = (self._treated["xw"][:, None] - prev["xw"][None, :]) ** 2 + (self._treated["yw"][:, None] - prev["yw"][None, :]) ** 2
+            near = d2 <= r * r
+            has = np.any(near, axis=1)
+            self._retries[has] = prev_retries[np.argmax(near[has], axis=1)]
+        self._pending_retries = (detections.empty(), np.zeros(0, dtype=np.int32))
+        self._advance_mm = tracker.firmware_advance_mm(xy)
+
+    def check(self, frame: np.ndarray, frame_ts: float) -> np.ndarray:
+        """Prüft die zuletzt behandelten Ziele im neuen Bild. Rückgabe: erneut zu sendende Ziele."""
+        treated, retries = self._treated, self._retries
+        self._treated = detections.empty()
+        self._retries = np.zeros(0, dtype=np.int32)
+        if frame is None or len(treated) == 0:
+            return detections.empty()
+        h, w = frame.shape[:2]
+        t = treated.copy()
+        t["yw"] -= self._advance_mm
+        u, v = geometry.world_to_pixels(t["xw"], t["yw"])
+        t["cx"], t["cy"] = u, v
+        t["frame_ts"] = frame_ts
+        pad = float(getattr(config, "BRUSH_VERIFY_PAD", 0.25))
+        min_green = float(getattr(config, "BRUSH_VERIFY_MIN_GREEN", 0.08))
+        max_retries = int(getattr(config, "BRUSH_VERIFY_MAX_RETRIES", 1))
+        y_tol = float(getattr(config, "BRUSH_VERIFY_Y_TOLERANCE_MM", 5.0))
+        failed = np.zeros(len(t), dtype=bool)
+        for i in range(len(t)):
+            if not (np.isfinite(u[i]) and np.isfinite(v[i]) and 0 <= u[i] < w and 0 <= v[i] < h):
+                continue
+            bw, bh = t["w"][i] * (0.5 + pad), t["h"][i] * (0.5 + pad)
+            frac = green_fraction(frame, (u[i] - bw, v[i] - bh, u[i] + bw, v[i] + bh))
+            if frac is None:
+                continue
+            self.stats["checked"] += 1
+            if frac < min_green:
+                self.stats["cleared"] += 1
+                continue
+            if retries[i] >= max_retries:
+                self.stats["given_up"] += 1
+                continue
+            if t["yw"][i] < -y_tol:
+                self.stats["unreachable"] += 1
+                continue
+            failed[i] = True
+        out = t[failed]
+        out_retries = retries[failed] + 1
+        self._pending_retries = (out, out_retries)
+        self.stats["requeued"] += len(out)
+        if len(treated):
+            logger.info(
+                f"[Nachkontrolle] {len(treated)} behandelt, {len(out)} erneut eingeplant "
+                f"(gesamt: {self.stats['cleared']}/{self.stats['checked']} sauber, {self.stats['given_up']} aufgegeben, "
+                f"{self.stats['unreachable']} hinter der Bürste)"
+            )
+        return out
+
+
+def merge(retry: np.ndarray, det: np.ndarray, radius_mm: float) -> np.ndarray:
+    """Stellt die Wiederholungen vor den neuen Batch; neue Detektionen an derselben Stelle entfallen."""
+    if len(retry) == 0:
+        return det
+    return np.concatenate([retry, tracker.dedupe(retry, det, radius_mm)])
@@ -8,6 +8,7 @@ import threading
 import time
 import logging
 from . import config
+from . import image_quality
 import numpy as np
 import cv2  # für Undistortion-Remap
 from picamera2 import Picamera2  # type: ignore
@@ -150,6 +151,10 @@ _last_capture_bytes: bytes | None = None
 _last_capture_ts: float | None = None
 _last_capture_bytes: bytes | None = None
 _last_capture_ts: float | None = None
+# Letztes aufgenommenes Bild als BGR-Array (für Vorfilter/Detektor ohne erneutes Einlesen)
+_last_frame = None
+# Metadaten zum letzten Bild (Zeitstempel, Qualitätskennzahlen, Anzahl Aufnahmen)
+_last_frame_meta: dict = {}
 
 
 def _set_last_capture_bytes(data: bytes) -> None:
@@ -282,6 +287,25 @@ def reload_calibration():
     _ensure_calibration_loaded()
 
 
+def _set_last_frame(bgr, meta=None) -> None:
+    global _last_frame, _last_frame_meta
+    with _last_capture_lock:
+        _last_frame = bgr
+        _last_frame_meta = dict(meta or {})
+
+
+def get_last_frame():
+    """Gibt das zuletzt per capture_image aufgenommene BGR-Array zurück (oder None)."""
+    with _last_capture_lock:
+        return _last_frame
+
+
+def get_last_frame_meta() -> dict:
+    """Metadaten zum letzten Bild, z. B. {'ts', 'quality': {...}, 'quality_ok', 'attempts'}."""
+    with _last_capture_lock:
+        return dict(_last_frame_meta)
+
+
 def get_last_capture_timestamp():
     """Gibt den Zeitstempel (epoch seconds, float) des letzten capture_image-Aufrufs zurück, sonst None."""
     with _last_capture_lock:
@@ -347,52 +371,90 @@ def stop_camera_if_idle():
         logger.error(f"Fehler beim Stoppen der Kamera: {e}")
 
 
+def _to_bgr(arr, undistort: bool):
+    """RGBA → BGR und optional Undistortion. Rückgabe: (bgr, undistorted_flag)."""
+    if arr.ndim == 3 and arr.shape[2] == 4:
+        bgr = cv2.cvtColor(arr, cv2.COLOR_RGBA2BGR)
+    else:
+        bgr = arr
+    h, w = bgr.shape[:2]
+    if undistort:
+        if (
+            _ensure_calibration_loaded()
+            and _calib_img_size
+            and (w, h) != _calib_img_size
+        ):
+            logger.info(
+                f"Undistortion bei {w}x{h}, Kalibrierung bei {_calib_img_size} – skaliere K entsprechend."
+            )
+        mm = _get_maps_for_size(w, h)
+        if mm is not None:
+            map1, map2 = mm
+            return cv2.remap(bgr, map1, map2, interpolation=cv2.INTER_LINEAR), True
+        logger.warning("Undistortion nicht möglich, verwende Rohbild.")
+    return bgr, False
+
+
+def _grab_checked(undistort: bool, quality_gate: bool):
+    """Nimmt ein Bild auf; mit quality_gate wird bei unscharfen/fehlbelichteten Bildern bis zu
+    QUALITY_MAX_RETAKES-mal neu aufgenommen. Rückgabe: (bgr, undistorted_flag, meta).
+
+    Besteht kein Versuch, wird das schärfste Bild verwendet (meta['quality_ok'] = False).
+    """
+    retakes = int(getattr(config, "QUALITY_MAX_RETAKES", 2)) if quality_gate else 0
+    delay = float(getattr(config, "QUALITY_RETAKE_DELAY_S", 0.15))
+    best = None
+    for attempt in range(1, retakes + 2):
+        arr = picam2.capture_array()
+        if arr is None:
+            raise RuntimeError("capture_array lieferte None")
+        ts = time.time()
+        if not quality_gate:
+            out, undistorted = _to_bgr(arr, undistort)
+            return out, undistorted, {"ts": ts, "attempts": attempt}
+        # Qualität auf dem nicht entzerrten Bild prüfen (Remap erst für das ausgewählte Bild)
+        raw, _ = _to_bgr(arr, False)
+        q = image_quality.frame_quality(raw)
+        ok, reason = image_quality.passes(q)
+        if best is None or q["sharpness"] > best[2]["quality"]["sharpness"]:
+            best = (raw, ok, {"ts": ts, "quality": q, "quality_ok": ok, "attempts": attempt})
+        if ok:
+            break
+        logger.info(f"Qualitätsprüfung Versuch {attempt}: {reason}")
+        if attempt <= retakes and delay > 0:
+            time.sleep(delay)
+    raw, ok, meta = best
+    meta["attempts"] = attempt
+    if not ok:
+        logger.warning(
+            f"Qualitätsprüfung nach {attempt} Aufnahme(n) nicht bestanden – verwende schärfstes Bild."
+        )
+    out, undistorted = _to_bgr(raw, undistort)
+    return out, undistorted, meta
+
+
 # Alte Signatur entfernt; neue Signatur unten
-def capture_image(filename: str, undistort: bool = True):
+def capture_image(filename: str, undistort: bool = True, quality_gate: bool = False):
     """
     Nimmt ein einzelnes Bild auf.
     - undistort=True: Bild wird entzerrt (empfohlen für GETXY/EXTRINSIK).
     - undistort=False: Bild wird roh gespeichert (empfohlen für Trainings/Testdaten).
+    - quality_gate=True: unscharfe/fehlbelichtete Bilder werden begrenzt neu aufgenommen
+      (siehe QUALITY_* in config); Kennzahlen über get_last_frame_meta().
     """
+    started_here = False
     try:
         logger.debug("Starte Bildaufnahme...")
         started_here = ensure_camera_started()
-        arr = picam2.capture_array()
-        if arr is None:
-            raise RuntimeError("capture_array lieferte None")
-        # RGBA → BGR
-        if arr.ndim == 3 and arr.shape[2] == 4:
-            bgr = cv2.cvtColor(arr, cv2.COLOR_RGBA2BGR)
-        else:
-            bgr = arr
-        h, w = bgr.shape[:2]
-        if undistort:
-            if (
-                _ensure_calibration_loaded()
-                and _calib_img_size
-                and (w, h) != _calib_img_size
-            ):
-                logger.info(
-                    f"Undistortion bei {w}x{h}, Kalibrierung bei {_calib_img_size} – skaliere K entsprechend."
-                )
-            mm = _get_maps_for_size(w, h)
-            if mm is not None:
-                map1, map2 = mm
-                out = cv2.remap(bgr, map1, map2, interpolation=cv2.INTER_LINEAR)
-                _encode_and_store_last_capture(out, quality=90)
-                ok = cv2.imwrite(filename, out)
-                if not ok:
-                    raise RuntimeError("cv2.imwrite fehlgeschlagen")
-                logger.info(f"Bild (undistorted) aufgenommen: {filename}")
-                return filename
-            else:
-                logger.warning("Undistortion nicht möglich, speichere Rohbild.")
-        # Rohbild speichern (entweder weil undistort=False oder kein Mapping möglich)
-        _encode_and_store_last_capture(bgr, quality=90)
-        ok = cv2.imwrite(filename, bgr)
+        out, undistorted, meta = _grab_checked(undistort, quality_gate)
+        _set_last_frame(out, meta)
+        _encode_and_store_last_capture(out, quality=90)
+        ok = cv2.imwrite(filename, out)
         if not ok:
-            raise RuntimeError("cv2.imwrite fehlgeschlagen (Fallback)")
-        logger.info(f"Bild (roh) aufgenommen: {filename}")
+            raise RuntimeError("cv2.imwrite fehlgeschlagen")
+        logger.info(
+            f"Bild ({'undistorted' if undistorted else 'roh'}) aufgenommen: {filename}"
+        )
         return filename
     except Exception as e:
         logger.error(f"Fehler bei der Bildaufnahme: {str(e)}")
@@ -407,6 +469,47 @@ def capture_image(filename: str, undistort: bool = True):
             pass
 
 
+def capture_burst(filename: str, count: int, interval_s: float = 0.1, undistort: bool = True, quality_gate: bool = False):
+    """
+    Nimmt `count` Bilder im Abstand von `interval_s` auf (Burst nach dem Anhalten des Roboters).
+    Mit quality_gate wird das erste Bild geprüft (ggf. neu aufgenommen), bevor der Burst startet.
+    Das erste Bild wird zusätzlich als `filename` gespeichert und als Vorschau veröffentlicht.
+    Rückgabe: Liste von (bgr, ts); leer bei Fehler.
+    """
+    frames = []
+    started_here = False
+    try:
+        started_here = ensure_camera_started()
+        first, _, meta = _grab_checked(undistort, quality_gate)
+        frames.append((first, meta["ts"]))
+        for i in range(1, max(1, int(count))):
+            if interval_s > 0:
+                time.sleep(interval_s)
+            arr = picam2.capture_array()
+            if arr is None:
+                logger.warning(f"Burst: capture_array lieferte None (Bild {i + 1})")
+                continue
+            ts = time.time()
+            bgr, _ = _to_bgr(arr, undistort)
+            frames.append((bgr, ts))
+        if frames:
+            _set_last_frame(frames[0][0], meta)
+            _encode_and_store_last_capture(frames[0][0], quality=90)
+            if not cv2.imwrite(filename, frames[0][0]):
+                logger.warning(f"Burst: {filename} konnte nicht geschrieben werden")
+        logger.info(f"Burst aufgenommen: {len(frames)}/{count} Bild(er)")
+    except Exception as e:
+        logger.error(f"Fehler bei der Burst-Aufnahme: {str(e)}")
+    finally:
+        try:
+            if started_here and not stream_active:
+                picam2.stop()
+                logger.info("Kamera nach Burst-Aufnahme gestoppt (kein aktiver Stream).")
+        except Exception:
+            pass
+    return frames
+
+
 def start_http_server():
     """Startet den HTTP-Server für den Stream."""
     server = ServerClass(("", config.HTTP_PORT), StreamHandler)
@@ -13,6 +13,12 @@ Enthält alle wichtigen Konstanten und Einstellungen.
 SIMULATED_SERIAL_PORT = "/tmp/ttyV8"  # Virtueller Port für die Simulation
 SERIAL_PORT = "/dev/serial0"  # Echter serieller Port
 BAUDRATE = 115200
+MAIN_LOOP_TIMEOUT_S = 1.0  # Hauptschleife: max. Wartezeit auf eine Zeile vom Mega (danach Upload-Prüfung)
+# Zielübergabe an den Mega: "text" (XY-Zeilen + DONE) oder "frame" (ein Binärrahmen mit CRC,
+# ACK/NAK und Wiederholung; erfordert die passende Firmware, siehe src/target_protocol.py)
+SERIAL_TARGET_PROTOCOL = "text"
+SERIAL_FRAME_ACK_TIMEOUT_S = 0.5
+SERIAL_FRAME_RETRIES = 3
 
 # UDP Setup
 UDP_IP = "0.0.0.0"  # Hört auf alle Schnittstellen
@@ -21,6 +27,9 @@ UDP_JOYSTICK_PORT = 5006  # Port für Joystick-Kommandos
 UDP_HEARTBEAT_PORT = 5007  # Port für Heartbeat-Messages
 UDP_STATUS_BROADCAST_PORT = 5008  # Port für Status-Broadcast
 HEARTBEAT_TIMEOUT = 5.0  # Sekunden, wie lange der Stream nach letztem Heartbeat läuft
+# Joystick → Mega: nur der neueste Wert, höchstens so oft pro Sekunde (Tastenwechsel/Stopp sofort)
+JOYSTICK_MAX_RATE_HZ = 20.0
+JOYSTICK_KEEPALIVE_S = None  # letzten Wert periodisch wiederholen (None = nur bei Änderung senden)
 
 # Optionale Whitelist für UDP-Steuerung/Joystick (Absender-IP-Adressen oder CIDR-Netze)
 # Beispiel: ALLOWED_UDP_SOURCES = ["192.168.179.10", "192.168.179.0/24"]
@@ -33,21 +42,54 @@ HTTP_PORT = 8080
 # YOLO Setup
 USE_DUMMY = False  # Auf False setzen, wenn das echte YOLO-Modell verwendet wird
 YOLO_MODEL_PATH = "./model/best.pt"  # z. B. "best.pt"
+# Modell-Registry (aus yolo-training/prepare_and_train.py): Eintrag per Tag wählen; hat Vorrang vor
+# YOLO_MODEL_PATH (nicht vor einem per PROMOTE_MODEL übernommenen Modell). None = YOLO_MODEL_PATH.
+YOLO_REGISTRY_DIR = "./model/registry/"
+YOLO_MODEL_TAG = None  # z. B. "20250101-1200-train"
+# Hot-Swap: neue *.pt in YOLO_MODEL_DIR werden als Standby-Modell geladen und laufen im
+# Schattenbetrieb mit; Übernahme per UDP-Steuerbefehl PROMOTE_MODEL (Port UDP_CONTROL_PORT).
+YOLO_MODEL_DIR = "./model/"
+YOLO_MODEL_WATCH_INTERVAL_S = 5.0
+YOLO_SHADOW_ACTIVE = False  # Schattenbetrieb kostet eine zweite volle Inferenz je GETXY
+YOLO_SHADOW_MATCH_PX = 20.0  # max. Mittelpunktabstand für "übereinstimmende" Boxen
 
 # Inferenz-Parameter (Subprozess mit Timeout)
 YOLO_TIMEOUT_SEC = 40
 YOLO_IMG_SIZE = 640  # Netzgröße (h, w); rechteckig für 720p→736x1280 mit wenig Padding
 YOLO_CONF = 0.25  # Konfidenzschwelle
 YOLO_IOU = 0.45  # IoU-Schwelle
+YOLO_OWN_PREPROCESS = False  # Letterbox in vorab allokierten Tensor statt Ultralytics-Vorverarbeitung (erst nach Messung mit tools/benchmark_detector.py aktivieren)
+
+# Optionale Inferenz auf einem LAN-Rechner (tools/inference_server.py); None = immer lokal.
+# Bei Timeout/Fehler wird automatisch lokal gerechnet.
+REMOTE_INFERENCE_URL = None  # z. B. "http://192.168.179.4:8501/predict"
+REMOTE_INFERENCE_DEADLINE_S = 2.0  # Zeitbudget je Anfrage (inkl. Übertragung)
+REMOTE_INFERENCE_ENCODING = "jpeg"  # "jpeg" oder "raw" (unkomprimiertes BGR)
+REMOTE_INFERENCE_JPEG_QUALITY = 90
+REMOTE_INFERENCE_BACKOFF_S = 30.0  # Pause nach einem Fehler, bevor der Server erneut versucht wird
 
 # Camera Setup
 CAMERA_RESOLUTION = (1280, 720)
 
 # Training Setup
 TRAINING_IMAGE_DIR = "./training/"
+TRAINING_BURST_FRAMES = 1  # Bilder pro Joystick-Klick im MANUAL-Modus
+TRAINING_BURST_INTERVAL_S = 0.3  # Abstand zwischen den Burst-Bildern
+TRAINING_QUEUE_SIZE = 4  # ausstehende Klicks; weitere werden verworfen
+
+# Active-Learning im AUTO-Modus: unsichere Bilder und eine Stichprobe leerer Bilder sammeln
+HARVEST_ACTIVE = False
+HARVEST_DIR = "./harvest/"
+HARVEST_CONF_LOW = 0.25  # Konfidenzband "unsicher"
+HARVEST_CONF_HIGH = 0.5
+HARVEST_CLASS_IOU = 0.5  # Überlappung, ab der unterschiedliche Klassen als Widerspruch gelten
+HARVEST_EMPTY_RATE = 0.02  # Anteil der leeren Bilder, die gespeichert werden
+HARVEST_DHASH_MAX_DIST = 6  # Hamming-Abstand, bis zu dem ein Bild als Duplikat gilt
+HARVEST_MAX_MB = 500  # Platzbudget; älteste Bilder werden zuerst gelöscht
 
 # Firmware upload directory for .hex files (Pi -> Mega flashing)
 UPLOAD_DIR = "./upload/"
+UPLOAD_SCAN_INTERVAL_S = 5.0  # Fallback ohne inotify: so oft nach neuen .hex sehen
 
 # GPIO-Pin (BCM) an der Raspberry Pi, der mit dem RESET-Pin des Mega verbunden ist.
 # Wenn None, wird kein Reset per GPIO durchgeführt. Hinweis: RESET ist aktiv LOW.
@@ -56,3 +98,71 @@ FW_RESET_GPIO = None  # z.B. 17
 # Weltkoordinaten: optionaler XY-Versatz (mm), um den Ursprung zu verschieben (z. B. unter die linke Bürste)
 # Beispiel: WORLD_OFFSET_XY_MM = (x_mm, y_mm) – wird von pixel_to_world subtrahiert
 WORLD_OFFSET_XY_MM = (0.0, 0.0)
+
+# Vogelperspektive (BEV): Bild vor YOLO auf die Bodenebene entzerren (benötigt Homographie/Extrinsik).
+# Jeder Pixel entspricht BEV_MM_PER_PX mm; Weltkoordinaten folgen aus reiner Skalierung.
+# Hinweis: Das Modell sollte auf BEV-Bildern trainiert sein.
+BEV_ACTIVE = False
+BEV_MM_PER_PX = 1.0
+BEV_X_RANGE_MM = None  # (min, max); None = aus dem Bildrand auf dem Boden bestimmen
+BEV_Y_RANGE_MM = None
+BEV_MAX_SIZE_PX = 1280  # längere Seite; größere Bereiche werden gröber abgetastet
+
+# Vegetations-Vorfilter (Excess-Green) vor YOLO: überspringt die Inferenz auf blankem Pflaster.
+# Vor dem Aktivieren mit tools/eval_vegetation_prefilter.py auf aufgenommenen Bildern prüfen.
+VEG_PREFILTER_ACTIVE = False
+VEG_DOWNSCALE_WIDTH = 160  # Breite des verkleinerten Bildes für den Index
+VEG_EXG_THRESHOLD = 20.0  # ExG = 2G - R - B; Pixel darüber gelten als grün
+VEG_MIN_FRACTION = 0.002  # Mindestanteil grüner Pixel, sonst keine Inferenz
+VEG_ROI_PAD_PX = 32  # Rand um grüne Flecken (Vollbild-Pixel)
+VEG_CROP_HINTS = False  # YOLO nur auf dem umschließenden Rechteck der grünen Flecken ausführen
+VEG_CROP_MAX_AREA_FRAC = 0.5  # Crop nur nutzen, wenn er höchstens diesen Bildanteil abdeckt
+
+# Fugen-Maske: Detektionen mitten auf einem Stein verwerfen; optional YOLO nur auf dem Fugenbereich.
+JOINT_MASK_ACTIVE = False
+JOINT_DOWNSCALE_WIDTH = 320  # Breite des verkleinerten Bildes für die Maske
+JOINT_BLACKHAT_KERNEL_PX = 9  # > Fugenbreite im verkleinerten Bild
+JOINT_BLACKHAT_THRESHOLD = None  # None = Otsu
+JOINT_MIN_COMPONENT_PX = 30  # kleinere Flecken gelten als Steinstruktur
+JOINT_DILATE_PX = 3  # Toleranz um die Fuge (verkleinerte Pixel)
+JOINT_MIN_BOX_COVERAGE = 0.05  # Mindestanteil Fugen-Pixel in einer Box
+JOINT_CROP_HINTS = False  # YOLO nur auf dem umschließenden Rechteck der Fugen ausführen
+
+# Tracking über GETXY-Halte (nur mit Welttransformation): bekannte Ziele werden anhand der gefahrenen
+# Strecke vorhergesagt und per Grün-Index geprüft; volle Inferenz nur bei wenig bekannter Szene.
+TRACK_ACTIVE = False
+TRACK_KNOWN_FRACTION = 0.8  # Mindestanteil bereits gesehener Bodenfläche für den Prüfpfad
+TRACK_FULL_EVERY_N = 5  # spätestens jeder n-te Halt mit voller Inferenz
+TRACK_MIN_CONFIRMED = 0.7  # sonst volle Inferenz
+TRACK_VERIFY_MIN_GREEN = 0.05  # Grünanteil im Box-Ausschnitt für "bestätigt"
+TRACK_MATCH_RADIUS_MM = 20.0
+TRACK_MAX_MISSES = 1  # so oft darf ein Track unbestätigt bleiben
+TRACK_DEFAULT_ADVANCE_MM = None  # None = Fahrt wie die Firmware aus den gesendeten Zielen berechnen
+TRACK_FIRMWARE_MAX_TARGETS = 50  # MAX_KOORDINATEN im Mega-Sketch
+
+# Nachkontrolle gebürsteter Ziele beim nächsten GETXY (nur mit Welttransformation):
+# Restbewuchs im Ausschnitt um die alte Position -> Ziel erneut senden.
+BRUSH_VERIFY_ACTIVE = False
+BRUSH_VERIFY_MIN_GREEN = 0.08  # Grünanteil im Ausschnitt, ab dem das Ziel als "nicht entfernt" gilt
+BRUSH_VERIFY_PAD = 0.25  # Ausschnitt = Box um diesen Anteil vergrößert
+BRUSH_VERIFY_MAX_RETRIES = 1
+BRUSH_VERIFY_MATCH_MM = 10.0  # Abstand, ab dem eine neue Detektion dasselbe Ziel ist
+BRUSH_VERIFY_Y_TOLERANCE_MM = 5.0  # weiter hinter der Bürste ist kein erneutes Anfahren möglich
+
+# Burst-Modus für GETXY: mehrere Bilder je Halt, eine gebündelte Inferenz, Fusion per Clustering.
+BURST_FRAMES = 1  # 1 = aus (Einzelbild wie bisher); z. B. 3
+BURST_INTERVAL_S = 0.1  # Abstand zwischen den Burst-Bildern
+BURST_MIN_VOTES = None  # Mindestanzahl Bilder pro Ziel; None = einfache Mehrheit
+BURST_FUSION_RADIUS_MM = 15.0  # Cluster-Radius in Weltkoordinaten
+BURST_FUSION_RADIUS_PX = 20.0  # Cluster-Radius in Pixeln (ohne Welttransformation)
+
+# Qualitätsprüfung vor GETXY-Inferenz: unscharfe/fehlbelichtete Bilder begrenzt neu aufnehmen.
+# Schwellen sind noch nicht auf der Zielkamera kalibriert → standardmäßig aus.
+QUALITY_GATE_ACTIVE = False
+QUALITY_MIN_SHARPNESS = 40.0  # Laplace-Varianz auf 320 px breitem Graubild
+QUALITY_MIN_MEAN = 40.0  # mittlere Helligkeit (0..255)
+QUALITY_MAX_MEAN = 220.0
+QUALITY_MAX_CLIPPED_FRAC = 0.25  # max. Anteil fast schwarzer bzw. fast weißer Pixel
+QUALITY_MAX_RETAKES = 2  # zusätzliche Aufnahmen, danach wird das schärfste Bild verwendet
+QUALITY_RETAKE_DELAY_S = 0.15  # Wartezeit vor einer erneuten Aufnahme (Nachschwingen)
+QUALITY_SKIP_ON_FAIL = True  # auch nach den Wiederholungen ungenügend → keine Inferenz, leeres Zielset (Mega fragt erneut)
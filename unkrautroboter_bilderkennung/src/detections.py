@@ -0,0 +1,89 @@
+"""
+Kompakte Detektionsdarstellung als NumPy-Structured-Array.
+
+Eine Zeile pro Box; alle Folgestufen (Geometrie, Filter, serielle Übertragung)
+arbeiten spaltenweise auf diesem Array statt mit Python-Schleifen pro Box.
+
+Felder:
+- cx, cy, w, h: Box-Mittelpunkt und -Größe in Pixeln (UNDISTORTED Bild)
+- conf: Konfidenz (0..1)
+- cls: Klassen-ID (0 = unkraut, 1 = moos; siehe NAMES in prepare_and_train.py)
+- frame_ts: Aufnahmezeitpunkt des Bildes (epoch seconds)
+- xw, yw: Weltkoordinaten in mm (NaN, solange nicht von geometry gesetzt)
+"""
+
+import cv2
+import numpy as np
+
+DETECTION_DTYPE = np.dtype(
+    [
+        ("cx", np.float32),
+        ("cy", np.float32),
+        ("w", np.float32),
+        ("h", np.float32),
+        ("conf", np.float32),
+        ("cls", np.int16),
+        ("frame_ts", np.float64),
+        ("xw", np.float32),
+        ("yw", np.float32),
+    ]
+)
+
+
+def empty(n: int = 0) -> np.ndarray:
+    """Leeres (bzw. n-zeiliges) Detektions-Array; Weltkoordinaten auf NaN."""
+    det = np.zeros(n, dtype=DETECTION_DTYPE)
+    det["xw"] = np.nan
+    det["yw"] = np.nan
+    return det
+
+
+def from_xyxy(data, frame_ts: float = 0.0) -> np.ndarray:
+    """Baut das Array aus einer (N,6)-Matrix x1,y1,x2,y2,conf,cls (z. B. boxes.data.cpu().numpy())."""
+    data = np.asarray(data, dtype=np.float32).reshape(-1, 6) if data is not None else np.zeros((0, 6), np.float32)
+    det = empty(len(data))
+    det["w"] = data[:, 2] - data[:, 0]
+    det["h"] = data[:, 3] - data[:, 1]
+    det["cx"] = data[:, 0] + 0.5 * det["w"]
+    det["cy"] = data[:, 1] + 0.5 * det["h"]
+    det["conf"] = data[:, 4]
+    det["cls"] = data[:, 5].astype(np.int16)
+    det["frame_ts"] = frame_ts
+    return det
+
+
+def to_xyxy(det: np.ndarray) -> np.ndarray:
+    """Umkehrung von from_xyxy: (N,6)-Matrix x1,y1,x2,y2,conf,cls (float32), z. B. für die Vorschau."""
+    out = np.empty((len(det), 6), dtype=np.float32)
+    out[:, 0] = det["cx"] - 0.5 * det["w"]
+    out[:, 1] = det["cy"] - 0.5 * det["h"]
+    out[:, 2] = det["cx"] + 0.5 * det["w"]
+    out[:, 3] = det["cy"] + 0.5 * det["h"]
+    out[:, 4] = det["conf"]
+    out[:, 5] = det["cls"]
+    return out
+
+
+def target_xy(det: np.ndarray) -> np.ndarray:
+    """(N,2)-Zielkoordinaten: Weltkoordinaten, wo vorhanden, sonst Pixel-Mittelpunkt."""
+    world_ok = np.isfinite(det["xw"]) & np.isfinite(det["yw"])
+    xy = np.empty((len(det), 2), dtype=np.float64)
+    xy[:, 0] = np.where(world_ok, det["xw"], det["cx"])
+    xy[:, 1] = np.where(world_ok, det["yw"], det["cy"])
+    return xy
+
+
+def draw_boxes(img: np.ndarray, det: np.ndarray, names=None) -> np.ndarray:
+    """Zeichnet die Boxen eines Detektions-Arrays in eine Kopie des BGR-Bildes."""
+    out = img.copy()
+    if det is None or len(det) == 0:
+        return out
+    for x1, y1, x2, y2, cf, cl in to_xyxy(det):
+        cls_id = int(cl)
+        color = (0, 255, 0) if cls_id == 0 else (255, 128, 0)
+        p1 = (int(x1), int(y1))
+        p2 = (int(x2), int(y2))
+        cv2.rectangle(out, p1, p2, color, 2)
+        label = f"{(names or {}).get(cls_id, cls_id)} {cf:.2f}"
+        cv2.putText(out, label, (p1[0], max(12, p1[1] - 4)), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1, cv2.LINE_AA)
+    return out
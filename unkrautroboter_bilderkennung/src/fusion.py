@@ -0,0 +1,77 @@
+"""
+Fusion der Detektionen mehrerer Bilder desselben Halts (Burst-Modus).
+
+Die Detektionen aller Bilder werden räumlich geclustert – in Weltkoordinaten (mm), wenn für alle
+Boxen verfügbar, sonst in Pixeln. Ein Cluster wird nur übernommen, wenn es in mindestens
+`min_votes` verschiedenen Bildern vorkommt; ein einzelnes schlechtes Bild (Bewegungsunschärfe,
+Reflexion, Blattschatten) erzeugt so weder Phantom-Ziele noch verschiebt es echte Ziele stark.
+Die fusionierte Position ist der konfidenzgewichtete Mittelwert des Clusters.
+"""
+
+from typing import List, Optional
+
+import numpy as np
+
+from . import detections
+
+
+def fuse_detections(
+    dets: List[np.ndarray],
+    radius_mm: float = 15.0,
+    radius_px: float = 20.0,
+    min_votes: Optional[int] = None,
+) -> np.ndarray:
+    """Fusioniert eine Liste von Detektions-Arrays (eins pro Bild) zu einem Array.
+
+    min_votes: Mindestanzahl Bilder pro Cluster; Standard ist die einfache Mehrheit.
+    """
+    n_frames = len(dets)
+    if n_frames == 0:
+        return detections.empty()
+    if n_frames == 1:
+        return dets[0]
+    if min_votes is None:
+        min_votes = n_frames // 2 + 1
+    all_det = np.concatenate(dets)
+    if len(all_det) == 0:
+        return detections.empty()
+    frame_idx = np.concatenate([np.full(len(d), i, dtype=np.int32) for i, d in enumerate(dets)])
+
+    use_world = bool(np.all(np.isfinite(all_det["xw"])) and np.all(np.isfinite(all_det["yw"])))
+    if use_world:
+        pts = np.stack([all_det["xw"], all_det["yw"]], axis=1).astype(np.float64)
+        radius = float(radius_mm)
+    else:
+        pts = np.stack([all_det["cx"], all_det["cy"]], axis=1).astype(np.float64)
+        radius = float(radius_px)
+    r2 = radius * radius
+
+    order = np.argsort(-all_det["conf"])
+    assigned = np.zeros(len(all_det), dtype=bool)
+    fused = []
+    for seed in order:
+        if assigned[seed]:
+            continue
+        d2 = np.sum((pts - pts[seed]) ** 2, axis=1)
+        members = np.flatnonzero((d2 <= r2) & ~assigned)
+        # Pro Bild höchstens eine Box (die mit der höchsten Konfidenz) in den Cluster aufnehmen
+        members = members[np.argsort(-all_det["conf"][members])]
+        _, first = np.unique(frame_idx[members], return_index=True)
+        members = members[first]
+        assigned[members] = True
+        if len(members) < min_votes:
+            continue
+        m = all_det[members]
+        wts = m["conf"].astype(np.float64)
+        wts = wts / wts.sum() if wts.sum() > 0 else np.full(len(m), 1.0 / len(m))
+        row = detections.empty(1)
+        for f in ("cx", "cy", "w", "h", "xw", "yw"):
+            row[f] = np.sum(m[f].astype(np.float64) * wts)
+        row["conf"] = float(m["conf"].mean())
+        cls_ids, cls_idx = np.unique(m["cls"], return_inverse=True)
+        row["cls"] = cls_ids[np.argmax(np.bincount(cls_idx, weights=m["conf"]))]
+        row["frame_ts"] = float(m["frame_ts"].max())
+        fused.append(row)
+    if not fused:
+        return detections.empty()
+    return np.concatenate(fused)
@@ -47,6 +47,8 @@ _t: Optional[np.ndarray] = None  # (3,)
 _plane_n: Optional[np.ndarray] = None  # (3,)
 _plane_d: Optional[float] = None
 _plane_is_z0: bool = False
+_transform_version = 0  # erhöht bei jedem Laden; invalidiert abgeleitete Caches (BEV-Remap)
+_bev_cache: Optional[dict] = None
 
 
 def _safe_load_npz(path: str) -> Optional[dict]:
@@ -65,7 +67,7 @@ def load_homography(path: Optional[str] = None) -> bool:
     Die Homographie soll von (u,v,1)^T (Pixel im UNDISTORTED Bild) nach (X_mm, Y_mm, W)^T
     auf die Bodenebene abbilden; die Rückgabe erfolgt als (X/W, Y/W) in Millimetern.
     """
-    global _H
+    global _H, _transform_version
     p = path or H_FILE
     d = _safe_load_npz(p)
     if not d:
@@ -79,6 +81,7 @@ def load_homography(path: Optional[str] = None) -> bool:
         logger.warning(f"[Geom] Ungültige H-Form {H.shape} in {p}.")
         return False
     _H = H
+    _transform_version += 1
     logger.info(f"[Geom] Homographie geladen aus {p}.")
     return True
 
@@ -90,7 +93,7 @@ def load_extrinsics(path: Optional[str] = None) -> bool:
     - plane_n (3,), plane_d (Skalar) mit Ebenengleichung n^T X + d = 0
     - plane_z0=True (setzt Welt-Ebene Z=0)
     """
-    global _K, _R, _t, _plane_n, _plane_d, _plane_is_z0
+    global _K, _R, _t, _plane_n, _plane_d, _plane_is_z0, _transform_version
     p = path or EXTR_FILE
     d = _safe_load_npz(p)
     if not d:
@@ -110,6 +113,7 @@ def load_extrinsics(path: Optional[str] = None) -> bool:
         )
         return False
     _K, _R, _t = K, R, t
+    _transform_version += 1
     n = d.get("plane_n")
     plane_d = d.get("plane_d")
     _plane_is_z0 = bool(d.get("plane_z0", False))
@@ -218,6 +222,196 @@ def pixel_to_world(px: float, py: float) -> Optional[Tuple[float, float]]:
     return None
 
 
+def pixels_to_world(px: np.ndarray, py: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Vektorisierte Variante von pixel_to_world für N Punkte.
+
+    Gibt (X_mm, Y_mm) als float64-Arrays zurück; nicht umrechenbare Punkte sind NaN.
+    """
+    px = np.asarray(px, dtype=float).reshape(-1)
+    py = np.asarray(py, dtype=float).reshape(-1)
+    X = np.full(px.shape, np.nan)
+    Y = np.full(px.shape, np.nan)
+    if px.size == 0:
+        return X, Y
+    pix = np.stack([px, py, np.ones_like(px)])  # (3,N)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # 1) Homographie
+        if _H is not None:
+            out = _H @ pix
+            w = out[2]
+            ok = np.abs(w) >= 1e-9
+            X = np.where(ok, out[0] / w, np.nan)
+            Y = np.where(ok, out[1] / w, np.nan)
+        # 2) Extrinsik (nur wenn keine Homographie geladen ist)
+        elif _K is not None and _R is not None and _t is not None:
+            ray_cam = np.linalg.inv(_K) @ pix
+            ray_cam = ray_cam / np.linalg.norm(ray_cam, axis=0)
+            Rinv = _R.T
+            C = -Rinv @ _t
+            d_world = Rinv @ ray_cam  # (3,N)
+            if _plane_is_z0:
+                denom = d_world[2]
+                s = -C[2] / denom
+            elif _plane_n is not None and _plane_d is not None:
+                denom = _plane_n @ d_world
+                s = -(_plane_n @ C + _plane_d) / denom
+            else:
+                return X, Y
+            ok = (np.abs(denom) >= 1e-9) & (s > 0)
+            Xw = C[:, None] + s * d_world
+            X = np.where(ok, Xw[0], np.nan)
+            Y = np.where(ok, Xw[1], np.nan)
+        else:
+            return X, Y
+    ox, oy = getattr(config, "WORLD_OFFSET_XY_MM", (0.0, 0.0))
+    return X - ox, Y - oy
+
+
+def detections_to_world(det: np.ndarray) -> np.ndarray:
+    """Setzt die Felder xw/yw eines Detektions-Arrays (siehe detections.py) in-place und gibt es zurück."""
+    if len(det) == 0:
+        return det
+    X, Y = pixels_to_world(det["cx"], det["cy"])
+    det["xw"] = X
+    det["yw"] = Y
+    return det
+
+
+def world_to_pixels(X: np.ndarray, Y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Umkehrung von pixels_to_world: Weltpunkte (mm, inkl. WORLD_OFFSET_XY_MM) -> Pixel im UNDISTORTED Bild.
+
+    Gleiche Priorität wie pixels_to_world (Homographie > Extrinsik+Ebene); nicht abbildbare
+    Punkte (z. B. hinter der Kamera) sind NaN.
+    """
+    ox, oy = getattr(config, "WORLD_OFFSET_XY_MM", (0.0, 0.0))
+    X = np.asarray(X, dtype=float).reshape(-1) + ox
+    Y = np.asarray(Y, dtype=float).reshape(-1) + oy
+    u = np.full(X.shape, np.nan)
+    v = np.full(X.shape, np.nan)
+    if X.size == 0:
+        return u, v
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if _H is not None:
+            out = np.linalg.inv(_H) @ np.stack([X, Y, np.ones_like(X)])
+            w = out[2]
+            ok = np.abs(w) >= 1e-9
+            u = np.where(ok, out[0] / w, np.nan)
+            v = np.where(ok, out[1] / w, np.nan)
+        elif _K is not None and _R is not None and _t is not None:
+            if _plane_is_z0 or _plane_n is None or _plane_d is None or abs(_plane_n[2]) < 1e-9:
+                Z = np.zeros_like(X)
+            else:
+                Z = -(_plane_n[0] * X + _plane_n[1] * Y + _plane_d) / _plane_n[2]
+            cam = _R @ np.stack([X, Y, Z]) + _t[:, None]
+            pix = _K @ cam
+            ok = cam[2] > 1e-9
+            u = np.where(ok, pix[0] / pix[2], np.nan)
+            v = np.where(ok, pix[1] / pix[2], np.nan)
+    return u, v
+
+
+# ==== Vogelperspektive (BEV): Bild auf die Bodenebene entzerren ====
+# Jeder BEV-Pixel entspricht BEV_MM_PER_PX Millimetern; Spalte -> X (rechts), Zeile 0 = größtes Y
+# (vorne, oben im Bild wie im Kamerabild). Die Remap-Tabelle wird pro Bildgröße/Kalibrierung
+# einmal berechnet und gecacht.
+def _bev_ranges(img_w: int, img_h: int) -> Optional[Tuple[Tuple[float, float], Tuple[float, float]]]:
+    xr = getattr(config, "BEV_X_RANGE_MM", None)
+    yr = getattr(config, "BEV_Y_RANGE_MM", None)
+    if xr is not None and yr is not None:
+        return (float(xr[0]), float(xr[1])), (float(yr[0]), float(yr[1]))
+    # Automatisch: Umriss des Bildrands auf dem Boden (Punkte entlang aller vier Kanten)
+    n = 16
+    us = np.linspace(0, img_w - 1, n)
+    vs = np.linspace(0, img_h - 1, n)
+    px = np.concatenate([us, us, np.zeros(n), np.full(n, img_w - 1)])
+    py = np.concatenate([np.zeros(n), np.full(n, img_h - 1), vs, vs])
+    X, Y = pixels_to_world(px, py)
+    ok = np.isfinite(X) & np.isfinite(Y)
+    if not np.any(ok):
+        return None
+    if xr is None:
+        xr = (float(X[ok].min()), float(X[ok].max()))
+    if yr is None:
+        yr = (float(Y[ok].min()), float(Y[ok].max()))
+    return (float(xr[0]), float(xr[1])), (float(yr[0]), float(yr[1]))
+
+
+def bev_params(img_w: int, img_h: int) -> Optional[dict]:
+    """Liefert (und cacht) die BEV-Remap-Tabelle für eine Eingangsgröße; None ohne Welttransformation."""
+    global _bev_cache
+    if not is_world_transform_ready():
+        return None
+    mm = float(getattr(config, "BEV_MM_PER_PX", 1.0))
+    key = (
+        int(img_w), int(img_h), mm,
+        getattr(config, "BEV_X_RANGE_MM", None), getattr(config, "BEV_Y_RANGE_MM", None),
+        getattr(config, "WORLD_OFFSET_XY_MM", (0.0, 0.0)), _transform_version,
+    )
+    if _bev_cache is not None and _bev_cache["key"] == key:
+        return _bev_cache
+    import cv2  # Lazy import
+
+    ranges = _bev_ranges(img_w, img_h)
+    if ranges is None:
+        return None
+    (x0, x1), (y0, y1) = ranges
+    max_px = int(getattr(config, "BEV_MAX_SIZE_PX", 1280))
+    if max(x1 - x0, y1 - y0) / mm > max_px:
+        mm_eff = max(x1 - x0, y1 - y0) / max_px
+        logger.warning(f"[Geom] BEV-Bereich zu groß für {mm:.2f} mm/px – nutze {mm_eff:.2f} mm/px")
+        mm = mm_eff
+    bw = max(1, int(np.ceil((x1 - x0) / mm)))
+    bh = max(1, int(np.ceil((y1 - y0) / mm)))
+    # Weltkoordinate der Pixelmitte je BEV-Pixel
+    gx = x0 + (np.arange(bw) + 0.5) * mm
+    gy = y1 - (np.arange(bh) + 0.5) * mm
+    GX, GY = np.meshgrid(gx, gy)
+    u, v = world_to_pixels(GX.ravel(), GY.ravel())
+    bad = ~(np.isfinite(u) & np.isfinite(v))
+    u[bad] = -1.0
+    v[bad] = -1.0
+    map_x = u.reshape(bh, bw).astype(np.float32)
+    map_y = v.reshape(bh, bw).astype(np.float32)
+    m1, m2 = cv2.convertMaps(map_x, map_y, cv2.CV_16SC2)
+    _bev_cache = {
+        "key": key, "map1": m1, "map2": m2, "size": (bw, bh),
+        "x0": x0, "y1": y1, "mm_per_px": mm,
+    }
+    logger.info(
+        f"[Geom] BEV-Tabelle: {bw}x{bh} px, {mm:.2f} mm/px, X {x0:.0f}..{x1:.0f} mm, Y {y0:.0f}..{y1:.0f} mm"
+    )
+    return _bev_cache
+
+
+def warp_to_bev(bgr: np.ndarray) -> Optional[np.ndarray]:
+    """Entzerrt ein UNDISTORTED BGR-Bild in die Vogelperspektive; None ohne Welttransformation."""
+    import cv2  # Lazy import
+
+    h, w = bgr.shape[:2]
+    prm = bev_params(w, h)
+    if prm is None:
+        return None
+    return cv2.remap(bgr, prm["map1"], prm["map2"], cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT, borderValue=(114, 114, 114))
+
+
+def bev_to_world(bu: np.ndarray, bv: np.ndarray, prm: dict) -> Tuple[np.ndarray, np.ndarray]:
+    """BEV-Pixel -> Welt (mm): reine Skalierung plus Verschiebung (Offset ist bereits enthalten)."""
+    mm = prm["mm_per_px"]
+    X = prm["x0"] + np.asarray(bu, dtype=float) * mm
+    Y = prm["y1"] - np.asarray(bv, dtype=float) * mm
+    return X, Y
+
+
+def bev_detections_to_world(det: np.ndarray, prm: dict) -> np.ndarray:
+    """Setzt xw/yw eines auf dem BEV-Bild erzeugten Detektions-Arrays in-place."""
+    if len(det) == 0:
+        return det
+    X, Y = bev_to_world(det["cx"], det["cy"], prm)
+    det["xw"] = X
+    det["yw"] = Y
+    return det
+
+
 def try_autoload() -> None:
     """Versucht beim Start Homographie/Extrinsik zu laden (falls vorhanden)."""
     loaded = False
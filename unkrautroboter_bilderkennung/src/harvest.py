@@ -0,0 +1,177 @@
+"""
+Active-Learning: Bilder aus dem AUTO-Betrieb für das Training sammeln.
+
+Gespeichert werden (im Hintergrund, niedrige Priorität, nie auf dem GETXY-Pfad):
+- "unsicher": mindestens eine Box mit Konfidenz im Band HARVEST_CONF_LOW..HARVEST_CONF_HIGH,
+- "klassen":  zwei stark überlappende Boxen mit unterschiedlicher Klasse,
+- "leer":     eine Zufallsstichprobe (HARVEST_EMPTY_RATE) der Bilder ohne Detektion.
+
+Fast gleiche Bilder (Roboter steht, gleicher Halt) werden über einen Differenz-Hash (dHash,
+64 Bit, im Dateinamen abgelegt) verworfen. Das Verzeichnis HARVEST_DIR hat ein Platzbudget
+(HARVEST_MAX_MB); bei Überschreitung werden die ältesten Bilder gelöscht.
+
+Hinweis: gespeichert wird das Bild, in dessen Pixeln die Boxen liegen – bei GETXY das entzerrte
+Kamerabild bzw. im BEV-Modus das Vogelperspektiv-Bild (bei Crops das volle Bild, Boxen sind zurückgerechnet).
+Neben jedem JPEG liegt eine .json mit Grund und Detektionen als Hilfe beim Labeln.
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from . import config, detections
+
+logger = logging.getLogger("harvest")
+
+_queue = queue.Queue(maxsize=4)
+_thread = None
+_thread_lock = threading.Lock()
+_hashes = None  # zuletzt gespeicherte dHashes (int)
+_files = None  # [(mtime, path, bytes)] aller gesammelten JPEGs, älteste zuerst
+_total_bytes = 0
+stats = {"queued": 0, "dropped": 0, "saved": 0, "duplicates": 0, "evicted": 0}
+
+
+def dhash(bgr: np.ndarray) -> int:
+    """64-Bit-Differenz-Hash (9x8-Graubild, horizontale Gradienten)."""
+    gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY) if bgr.ndim == 3 else bgr
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def _hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def harvest_reason(det: np.ndarray) -> Optional[str]:
+    """Grund, warum das Bild gesammelt werden soll (oder None)."""
+    if len(det) == 0:
+        rate = float(getattr(config, "HARVEST_EMPTY_RATE", 0.02))
+        return "leer" if random.random() < rate else None
+    lo = float(getattr(config, "HARVEST_CONF_LOW", 0.25))
+    hi = float(getattr(config, "HARVEST_CONF_HIGH", 0.5))
+    if np.any((det["conf"] >= lo) & (det["conf"] < hi)):
+        return "unsicher"
+    if len(det) > 1 and len(np.unique(det["cls"])) > 1:
+        # Überlappende Boxen unterschiedlicher Klasse (IoU > HARVEST_CLASS_IOU)
+        b = detections.to_xyxy(det)
+        ix1 = np.maximum(b[:, None, 0], b[None, :, 0])
+        iy1 = np.maximum(b[:, None, 1], b[None, :, 1])
+        ix2 = np.minimum(b[:, None, 2], b[None, :, 2])
+        iy2 = np.minimum(b[:, None, 3], b[None, :, 3])
+        inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+        area = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+        iou = inter / np.maximum(1e-6, area[:, None] + area[None, :] - inter)
+        differ = det["cls"][:, None] != det["cls"][None, :]
+        if np.any(np.triu(differ & (iou > float(getattr(config, "HARVEST_CLASS_IOU", 0.5))), 1)):
+            return "klassen"
+    return None
+
+
+def consider(frame: np.ndarray, det: np.ndarray, frame_ts: float) -> None:
+    """Prüft ein Ergebnis und übergibt es ggf. an die Hintergrund-Stufe. Blockiert nie."""
+    global _thread
+    if frame is None:
+        return
+    reason = harvest_reason(det)
+    if reason is None:
+        return
+    with _thread_lock:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(target=_worker, name="harvest", daemon=True)
+            _thread.start()
+    try:
+        _queue.put_nowait((frame, det.copy(), float(frame_ts), reason))
+        stats["queued"] += 1
+    except queue.Full:
+        stats["dropped"] += 1
+
+
+def _scan_dir(d: str) -> None:
+    global _hashes, _files, _total_bytes
+    _hashes, _files, _total_bytes = [], [], 0
+    try:
+        for name in os.listdir(d):
+            if not name.endswith(".jpg"):
+                continue
+            p = os.path.join(d, name)
+            st = os.stat(p)
+            _files.append((st.st_mtime, p, st.st_size))
+            _total_bytes += st.st_size
+            try:
+                _hashes.append(int(name.rsplit("_", 1)[1][:-4], 16))
+            except Exception:
+                pass
+    except FileNotFoundError:
+        pass
+    _files.sort()
+
+
+def _evict(budget: int) -> None:
+    global _total_bytes
+    while _files and _total_bytes > budget:
+        _, p, size = _files.pop(0)
+        for f in (p, p[:-4] + ".json"):
+            try:
+                os.remove(f)
+            except FileNotFoundError:
+                pass
+        _total_bytes -= size
+        stats["evicted"] += 1
+
+
+def _save(frame, det, frame_ts, reason) -> None:
+    global _total_bytes
+    d = getattr(config, "HARVEST_DIR", "./harvest/")
+    os.makedirs(d, exist_ok=True)
+    if _files is None:
+        _scan_dir(d)
+    h = dhash(frame)
+    max_dist = int(getattr(config, "HARVEST_DHASH_MAX_DIST", 6))
+    if any(_hamming(h, o) <= max_dist for o in _hashes):
+        stats["duplicates"] += 1
+        return
+    ok, enc = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), 95])
+    if not ok:
+        return
+    base = os.path.join(d, f"{time.strftime('%Y%m%d_%H%M%S', time.localtime(frame_ts))}_{reason}_{h:016x}")
+    meta = {
+        "ts": frame_ts,
+        "reason": reason,
+        "boxes": detections.to_xyxy(det).tolist(),
+    }
+    for path, data in ((base + ".json", json.dumps(meta).encode("utf-8")), (base + ".jpg", enc.tobytes())):
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    _hashes.append(h)
+    if len(_hashes) > 5000:
+        del _hashes[:1000]
+    _files.append((time.time(), base + ".jpg", len(enc)))
+    _total_bytes += len(enc)
+    stats["saved"] += 1
+    _evict(int(float(getattr(config, "HARVEST_MAX_MB", 500)) * 1024 * 1024))
+    logger.info(f"[Harvest] {reason}: {os.path.basename(base)}.jpg ({len(det)} Box(en), {_total_bytes / 1e6:.0f} MB belegt)")
+
+
+def _worker():
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except Exception:
+        pass
+    while True:
+        item = _queue.get()
+        try:
+            _save(*item)
+        except Exception as e:
+            logger.warning(f"[Harvest] Speichern fehlgeschlagen: {e}")
@@ -0,0 +1,51 @@
+"""
+Bildqualitäts-Prüfung vor der Inferenz (Schärfe und Belichtung).
+
+- Schärfe: Varianz des Laplace-Operators auf einem verkleinerten Graubild. Direkt nach
+  fahreStrecke schwingt der Roboter noch nach; solche Bilder haben eine deutlich kleinere Varianz.
+- Belichtung: mittlere Helligkeit sowie Anteil fast schwarzer bzw. fast weißer Pixel.
+
+Nur NumPy/OpenCV – keine Projekt-Abhängigkeiten außer config.
+"""
+
+from typing import Dict, Tuple
+
+import cv2
+import numpy as np
+
+from . import config
+
+
+def frame_quality(bgr: np.ndarray, width: int = 320) -> Dict[str, float]:
+    """Berechnet Qualitätskennzahlen eines BGR-Bildes auf einer auf `width` verkleinerten Graustufenkopie."""
+    h0, w0 = bgr.shape[:2]
+    if w0 > width:
+        small = cv2.resize(bgr, (width, max(1, int(round(h0 * width / float(w0))))), interpolation=cv2.INTER_AREA)
+    else:
+        small = bgr
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+    sharpness = float(cv2.Laplacian(gray, cv2.CV_64F).var())
+    n = float(gray.size)
+    return {
+        "sharpness": sharpness,
+        "mean": float(gray.mean()),
+        "dark_frac": float(np.count_nonzero(gray <= 10)) / n,
+        "bright_frac": float(np.count_nonzero(gray >= 245)) / n,
+    }
+
+
+def passes(q: Dict[str, float]) -> Tuple[bool, str]:
+    """Prüft Kennzahlen gegen die Schwellen aus config. Rückgabe: (ok, Grund)."""
+    min_sharp = float(getattr(config, "QUALITY_MIN_SHARPNESS", 40.0))
+    min_mean = float(getattr(config, "QUALITY_MIN_MEAN", 40.0))
+    max_mean = float(getattr(config, "QUALITY_MAX_MEAN", 220.0))
+    max_clip = float(getattr(config, "QUALITY_MAX_CLIPPED_FRAC", 0.25))
+    if q["sharpness"] < min_sharp:
+        return False, f"unscharf (Laplace-Varianz {q['sharpness']:.0f} < {min_sharp:.0f})"
+    if q["mean"] < min_mean:
+        return False, f"zu dunkel (Mittel {q['mean']:.0f})"
+    if q["mean"] > max_mean:
+        return False, f"zu hell (Mittel {q['mean']:.0f})"
+    if q["dark_frac"] > max_clip or q["bright_frac"] > max_clip:
+        return False, f"abgeschnitten (dunkel {q['dark_frac'] * 100:.0f}%, hell {q['bright_frac'] * 100:.0f}%)"
+    return True, "ok"
@@ -0,0 +1,129 @@
+"""
+Fugen-Maske (Ritzen zwischen Pflastersteinen) mit klassischer Bildverarbeitung.
+
+Unkraut wächst praktisch nur in den Fugen. Auf einem verkleinerten Graubild heben eine
+Black-Hat-Operation (dunkle, schmale Strukturen) und Canny-Kanten die Fugen hervor; Schließen,
+Aufweiten und das Entfernen kleiner Flecken ergeben eine Maske. Grüne Pixel (Excess-Green)
+werden dazugenommen, weil dichter Bewuchs die Fuge selbst verdeckt.
+
+Verwendung:
+- Detektionen, deren Box die Fugen-Maske kaum berührt (mitten auf einem Stein), werden verworfen.
+- Das umschließende Rechteck der Maske kann als Crop-Hinweis für YOLO dienen.
+
+Innerhalb eines GETXY-Zyklus (Roboter steht: Burst, Tracking-Streifen, Rückfall auf volle
+Inferenz) wird die Maske nur einmal berechnet; new_cycle() verwirft sie vor jedem neuen Halt.
+Ein Vergleich über die Bildähnlichkeit wäre auf gleichförmigem Pflaster nach der Fahrt trügerisch.
+"""
+
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from . import config, vegetation
+
+# Cache für den laufenden GETXY-Zyklus: (Bildgröße, Maske)
+_cache: Optional[Tuple[Tuple[int, int], np.ndarray]] = None
+
+
+def new_cycle() -> None:
+    """Verwirft die zwischengespeicherte Maske (vor jeder neuen Aufnahme nach einer Fahrt)."""
+    global _cache
+    _cache = None
+
+
+def compute_joint_mask(bgr: np.ndarray, width: Optional[int] = None) -> np.ndarray:
+    """Binärmaske (uint8, 0/255) der Fugen auf dem auf `width` verkleinerten Bild."""
+    width = int(width or getattr(config, "JOINT_DOWNSCALE_WIDTH", 320))
+    h0, w0 = bgr.shape[:2]
+    if w0 > width:
+        small = cv2.resize(bgr, (width, max(1, int(round(h0 * width / float(w0))))), interpolation=cv2.INTER_AREA)
+    else:
+        small = bgr
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    gray = cv2.GaussianBlur(gray, (3, 3), 0)
+
+    # Dunkle, schmale Linien: Black-Hat mit einem Kern, der breiter als die Fuge ist
+    k = int(getattr(config, "JOINT_BLACKHAT_KERNEL_PX", 9)) | 1
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (k, k))
+    blackhat = cv2.morphologyEx(gray, cv2.MORPH_BLACKHAT, kernel)
+    thr = getattr(config, "JOINT_BLACKHAT_THRESHOLD", None)
+    if thr is None:
+        _, mask = cv2.threshold(blackhat, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    else:
+        _, mask = cv2.threshold(blackhat, float(thr), 255, cv2.THRESH_BINARY)
+
+    # Kanten (Steinränder) und grüne Pixel (Bewuchs verdeckt die Fuge) hinzunehmen
+    edges = cv2.Canny(gray, 50, 150)
+    green = vegetation.excess_green_mask(small, width=small.shape[1])
+    mask = cv2.bitwise_or(mask, cv2.bitwise_and(edges, cv2.dilate(mask, None)))
+    mask = cv2.bitwise_or(mask, green)
+
+    # Lücken schließen, kleine Flecken (Steinstruktur) entfernen, dann als Toleranz aufweiten
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3)))
+    n, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    min_area = int(getattr(config, "JOINT_MIN_COMPONENT_PX", 30))
+    keep = np.zeros(n, dtype=np.uint8)
+    keep[1:] = np.where(stats[1:, cv2.CC_STAT_AREA] >= min_area, 255, 0)
+    mask = keep[labels]
+    d = int(getattr(config, "JOINT_DILATE_PX", 3))
+    if d > 0:
+        mask = cv2.dilate(mask, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (2 * d + 1, 2 * d + 1)))
+    return mask
+
+
+def joint_mask(bgr: np.ndarray) -> np.ndarray:
+    """Wie compute_joint_mask, aber innerhalb eines GETXY-Zyklus (bis new_cycle()) nur einmal berechnet."""
+    global _cache
+    h, w = bgr.shape[:2]
+    if _cache is not None and _cache[0] == (w, h):
+        return _cache[1]
+    mask = compute_joint_mask(bgr)
+    _cache = ((w, h), mask)
+    return mask
+
+
+def mask_roi(mask: np.ndarray, full_size: Tuple[int, int], pad_px: int = 16) -> Optional[Tuple[int, int, int, int]]:
+    """Umschließendes Rechteck (x1,y1,x2,y2) der Maske in Vollbild-Pixeln (oder None bei leerer Maske)."""
+    pts = cv2.findNonZero(mask)
+    if pts is None:
+        return None
+    x, y, w, h = cv2.boundingRect(pts)
+    W, H = full_size
+    sx = W / float(mask.shape[1])
+    sy = H / float(mask.shape[0])
+    return (
+        max(0, int(x * sx) - pad_px),
+        max(0, int(y * sy) - pad_px),
+        min(W, int((x + w) * sx) + pad_px),
+        min(H, int((y + h) * sy) + pad_px),
+    )
+
+
+def box_coverage(det: np.ndarray, mask: np.ndarray, full_size: Tuple[int, int]) -> np.ndarray:
+    """Anteil der Fugen-Pixel innerhalb jeder Box (0..1), über ein Integralbild in O(1) je Box."""
+    if len(det) == 0:
+        return np.zeros(0, dtype=np.float32)
+    W, H = full_size
+    mh, mw = mask.shape[:2]
+    sx = mw / float(W)
+    sy = mh / float(H)
+    integ = cv2.integral((mask > 0).astype(np.uint8))
+    x1 = np.clip(np.floor((det["cx"] - 0.5 * det["w"]) * sx), 0, mw).astype(np.int64)
+    x2 = np.clip(np.ceil((det["cx"] + 0.5 * det["w"]) * sx), 0, mw).astype(np.int64)
+    y1 = np.clip(np.floor((det["cy"] - 0.5 * det["h"]) * sy), 0, mh).astype(np.int64)
+    y2 = np.clip(np.ceil((det["cy"] + 0.5 * det["h"]) * sy), 0, mh).astype(np.int64)
+    x2 = np.maximum(x2, x1 + 1).clip(max=mw)
+    y2 = np.maximum(y2, y1 + 1).clip(max=mh)
+    inside = integ[y2, x2] - integ[y1, x2] - integ[y2, x1] + integ[y1, x1]
+    area = np.maximum(1, (x2 - x1) * (y2 - y1))
+    return (inside / area).astype(np.float32)
+
+
+def filter_detections(det: np.ndarray, mask: np.ndarray, full_size: Tuple[int, int], min_coverage: Optional[float] = None) -> np.ndarray:
+    """Verwirft Boxen, die (fast) keine Fugen-Pixel enthalten, also mitten auf einem Stein liegen."""
+    if len(det) == 0:
+        return det
+    if min_coverage is None:
+        min_coverage = float(getattr(config, "JOINT_MIN_BOX_COVERAGE", 0.05))
+    return det[box_coverage(det, mask, full_size) >= min_coverage]
@@ -0,0 +1,130 @@
+"""
+Joystick-Kanal zum Mega: nur der jeweils neueste Achsenwert wird gesendet.
+
+Der UDP-Server liefert jedes JOYSTICK-Paket einzeln an. Statt jedes Paket direkt auf die
+serielle Leitung zu schreiben (bei Paket-Bursts stauen sich die Zeilen hinter einem beschäftigten
+Mega), wird hier nur der letzte Zustand (X, Y, Haltetaste B=3) gehalten. Ein Sende-Thread schreibt
+ihn höchstens JOYSTICK_MAX_RATE_HZ-mal pro Sekunde und nur, wenn er sich geändert hat.
+
+Sofort (ohne Ratenbegrenzung) gesendet werden:
+- Tastenwechsel (B=3 gedrückt/losgelassen – der Mega schaltet damit zwischen Fahr- und X/Z-Steuerung),
+- der Übergang auf Neutral (X=0, Y=0), damit Anhalten nie verzögert wird.
+
+Mit JOYSTICK_KEEPALIVE_S wird der letzte Zustand zusätzlich periodisch wiederholt (None = aus).
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+from . import config
+
+logger = logging.getLogger("joystick_channel")
+
+
+def parse_joystick(command: str) -> Optional[Tuple[int, int, Optional[int]]]:
+    """'JOYSTICK:X=..,Y=..[,B=..]' -> (x, y, button) oder None bei ungültigem Format."""
+    if not command.startswith("JOYSTICK:"):
+        return None
+    x = y = button = None
+    try:
+        for p in command[len("JOYSTICK:") :].split(","):
+            if p.startswith("X="):
+                x = int(p[2:])
+            elif p.startswith("Y="):
+                y = int(p[2:])
+            elif p.startswith("B="):
+                button = int(p[2:])
+    except ValueError:
+        return None
+    if x is None or y is None:
+        return None
+    return x, y, button
+
+
+def format_joystick(x: int, y: int, button: Optional[int]) -> str:
+    msg = f"JOYSTICK:X={x},Y={y}"
+    if button is not None:
+        msg += f",B={button}"
+    return msg
+
+
+class JoystickChannel:
+    def __init__(self, send_fn: Callable[[str], None]):
+        self._send_fn = send_fn
+        self._cond = threading.Condition()
+        self._pending = None  # (x, y, button) noch nicht gesendet
+        self._immediate = False
+        self._last_sent = None
+        self._last_send_t = 0.0
+        self._thread = None
+        self.stats = {"received": 0, "sent": 0, "coalesced": 0, "unchanged": 0, "immediate": 0, "keepalive": 0, "errors": 0}
+
+    def reset(self) -> None:
+        """Vergisst den Zustand (z. B. beim Moduswechsel); der nächste Wert wird in jedem Fall gesendet."""
+        with self._cond:
+            self._pending = None
+            self._immediate = False
+            self._last_sent = None
+
+    def submit(self, x: int, y: int, button: Optional[int] = None) -> None:
+        """Neuen Joystick-Zustand übernehmen (blockiert nie). button: nur 3 wird an den Mega weitergegeben."""
+        state = (int(x), int(y), 3 if button == 3 else None)
+        with self._cond:
+            self.stats["received"] += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="joystick-channel", daemon=True)
+                self._thread.start()
+            if self._pending is not None:
+                self.stats["coalesced"] += 1  # noch nicht gesendeter Wert wird überschrieben
+            ref = self._pending if self._pending is not None else self._last_sent
+            if state == self._last_sent:
+                if self._pending is None:
+                    self.stats["unchanged"] += 1
+                self._pending = None
+                self._immediate = False
+                return
+            if ref is None or state[2] != ref[2] or (state[:2] == (0, 0) and ref[:2] != (0, 0)):
+                self._immediate = True
+            self._pending = state
+            self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                rate = float(getattr(config, "JOYSTICK_MAX_RATE_HZ", 20.0))
+                interval = 1.0 / rate if rate > 0 else 0.0
+                keepalive = getattr(config, "JOYSTICK_KEEPALIVE_S", None)
+                now = time.monotonic()
+                if self._pending is not None:
+                    wait = 0.0 if self._immediate else self._last_send_t + interval - now
+                    reason = "immediate" if self._immediate and self._last_send_t + interval > now else None
+                    state = self._pending
+                elif keepalive and self._last_sent is not None:
+                    wait = self._last_send_t + float(keepalive) - now
+                    reason = "keepalive"
+                    state = self._last_sent
+                else:
+                    self._cond.wait()
+                    continue
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                self._pending = None
+                self._immediate = False
+                self._last_sent = state
+                self._last_send_t = now
+            # Schreiben außerhalb des Locks: submit() blockiert nie hinter der seriellen Leitung
+            try:
+                self._send_fn(format_joystick(*state))
+                self.stats["sent"] += 1
+                if reason:
+                    self.stats[reason] += 1
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning(f"Joystick-Kommando nicht gesendet: {e}")
+
+    def get_stats(self) -> dict:
+        with self._cond:
+            return dict(self.stats)
@@ -0,0 +1,90 @@
+"""
+Binäres Joystick-Datagramm (UDP-Port UDP_JOYSTICK_PORT, neben dem Textformat "JOYSTICK:X=..,Y=..").
+
+Aufbau (little endian, 20 Byte) – muss zu joysticksteuerung_pc/joystick_steuerung.py passen:
+
+    magic    2s  b"\\xa7J" (erstes Byte kein ASCII → eindeutig vom Textformat unterscheidbar)
+    version  B   PROTOCOL_VERSION
+    type     B   TYPE_STATE, TYPE_PING oder TYPE_PONG
+    session  I   Zufallswert je Start des Senders (neue Session → Sequenz neu beginnen)
+    seq      I   fortlaufend je Session (mit Überlauf)
+    ts_ms    I   Sendezeit des Absenders in ms (eigene Uhr, nur für RTT: PONG spiegelt den Wert)
+    x, y     b b Achsen -100..100
+    buttons  B   gehaltene Tasten (BUTTON_1, BUTTON_3)
+    clicks   B   Klickzähler für Taste 1 (mod 256) – verlorene Pakete verschlucken keinen Klick
+"""
+
+import struct
+from typing import NamedTuple, Optional
+
+MAGIC = b"\xa7J"
+PROTOCOL_VERSION = 1
+TYPE_STATE = 0
+TYPE_PING = 1
+TYPE_PONG = 2
+BUTTON_1 = 0x01
+BUTTON_3 = 0x02
+
+_STRUCT = struct.Struct("<2sBBIIIbbBB")
+SIZE = _STRUCT.size
+
+
+class JoystickPacket(NamedTuple):
+    type: int
+    session: int
+    seq: int
+    ts_ms: int
+    x: int
+    y: int
+    buttons: int
+    clicks: int
+
+
+def is_binary(data: bytes) -> bool:
+    return data[:2] == MAGIC
+
+
+def encode(p: JoystickPacket) -> bytes:
+    return _STRUCT.pack(
+        MAGIC, PROTOCOL_VERSION, p.type, p.session & 0xFFFFFFFF, p.seq & 0xFFFFFFFF, p.ts_ms & 0xFFFFFFFF,
+        max(-100, min(100, p.x)), max(-100, min(100, p.y)), p.buttons & 0xFF, p.clicks & 0xFF,
+    )
+
+
+def decode(data: bytes) -> Optional[JoystickPacket]:
+    """Datagramm → JoystickPacket; None bei falscher Länge, Magic oder Version."""
+    if len(data) != SIZE:
+        return None
+    magic, version, typ, session, seq, ts_ms, x, y, buttons, clicks = _STRUCT.unpack(data)
+    if magic != MAGIC or version != PROTOCOL_VERSION:
+        return None
+    return JoystickPacket(typ, session, seq, ts_ms, x, y, buttons, clicks)
+
+
+def seq_newer(a: int, b: int) -> bool:
+    """True, wenn Sequenznummer a nach b kommt (32-Bit-Überlauf berücksichtigt)."""
+    return a != b and ((a - b) & 0xFFFFFFFF) < 0x80000000
+
+
+class SequenceFilter:
+    """Verwirft veraltete/umsortierte STATE-Pakete je Absender; neue Session setzt zurück."""
+
+    def __init__(self):
+        self._last = {}  # addr -> (session, seq, clicks)
+        self.stats = {"accepted": 0, "stale": 0, "sessions": 0, "lost": 0}
+
+    def accept(self, addr, p: JoystickPacket):
+        """Rückgabe (ok, new_clicks): ok=False für veraltete Pakete; new_clicks = neue Klicks auf Taste 1."""
+        prev = self._last.get(addr)
+        if prev is None or prev[0] != p.session:
+            self.stats["sessions"] += 1
+            self._last[addr] = (p.session, p.seq, p.clicks)
+            self.stats["accepted"] += 1
+            return True, 0
+        if not seq_newer(p.seq, prev[1]):
+            self.stats["stale"] += 1
+            return False, 0
+        self.stats["lost"] += ((p.seq - prev[1]) & 0xFFFFFFFF) - 1
+        self._last[addr] = (p.session, p.seq, p.clicks)
+        self.stats["accepted"] += 1
+        return True, (p.clicks - prev[2]) & 0xFF
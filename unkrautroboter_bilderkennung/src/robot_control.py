@@ -17,9 +17,18 @@ from . import (
     udp_server,
     status_ws_server,
     status_bus,
+    detections,
+    vegetation,
+    fusion,
 )
 from .calibration import CalibrationSession
 from . import geometry
+from . import joints
+from . import tracker
+from . import brush_verify
+from . import harvest
+from . import joystick_channel
+from . import upload_watch
 import subprocess
 import shutil
 
@@ -69,6 +78,13 @@ class RobotControl:
         self.last_joystick = {"x": 0, "y": 0}
         self.last_joystick_lock = threading.Lock()
         self.calib_session = None
+        self.tracker = tracker.WeedTracker()
+        self.verifier = brush_verify.BrushVerifier()
+        self._det_frame = None  # Eingabebild des Detektors im laufenden GETXY-Zyklus (für Harvest)
+        self.joystick = joystick_channel.JoystickChannel(self.send_command)
+        self._upload_pending = threading.Event()
+        # Zeilen vom Mega → Handler (Hauptschleife)
+        self._line_handlers = {"GETXY": self._on_getxy}
         msg = "START"
         logger.info(f"-> Arduino: {msg}")
         self.send_command(msg)
@@ -79,7 +95,9 @@ class RobotControl:
             and persisted != self.mode
         ):
             logger.info(f"Lade letzten Modus: {persisted}")
-            self.set_mode(persisted)
+            setup = self.set_mode(persisted)
+            if setup is not None:
+                setup()
         elif persisted is None:
             # Erster Start: Standardmodus persistieren
             try:
@@ -93,11 +111,19 @@ class RobotControl:
             return self.mode
 
     def set_mode(self, new_mode):
-        """Setzt den Betriebsmodus (AUTO, MANUAL, DISTORTION, EXTRINSIK)."""
+        """Setzt den Betriebsmodus (AUTO, MANUAL, DISTORTION, EXTRINSIK).
+
+        Nur der schnelle Teil (Modus, MODE:-Zeile an den Mega, Persistenz) läuft sofort. Rückgabe:
+        Funktion für die langsame Einrichtung (Kamera-Vorschau, Kalibriersession) oder None, wenn
+        sich der Modus nicht geändert hat – der Aufrufer führt sie aus (UDP-Server: im Worker).
+        """
         with self.mode_lock:
             if new_mode == self.mode:
-                return
+                return None
             self.mode = new_mode
+            self.tracker.reset()
+            self.verifier.reset()
+            self.joystick.reset()
             msg = f"MODE:{self.mode}"
             logger.info(f"-> Arduino: {msg}")
             self.send_command(msg)
@@ -106,92 +132,103 @@ class RobotControl:
                 _persist_mode(self.mode)
             except Exception as e:
                 logger.warning(f"Modus konnte nicht persistiert werden: {e}")
-            if self.calib_session is not None:
-                try:
-                    self.calib_session.stop()
-                except Exception as e:
-                    pass
-                self.calib_session = None
-            # Beim Wechsel in EXTRINSIK: Bannerbild in Vorschau
+        return lambda: self._setup_mode(new_mode)
+
+    def _setup_mode(self, mode):
+        """Langsamer Teil des Moduswechsels (Kamera, Kalibrierung); ohne mode_lock."""
+        if self.get_mode() != mode:
+            return  # inzwischen erneut gewechselt
+        if self.calib_session is not None:
             try:
-                if self.mode == "EXTRINSIK" and camera.is_camera_started():
-                    arr = camera.picam2.capture_array()
-                    if arr is not None:
-                        if arr.ndim == 3 and arr.shape[2] == 4:
-                            bgr = cv2.cvtColor(arr, cv2.COLOR_RGBA2BGR)
-                        elif arr.ndim == 3 and arr.shape[2] == 3:
-                            bgr = cv2.cvtColor(arr, cv2.COLOR_RGB2BGR)
-                        else:
-                            bgr = arr
-                        h, w = bgr.shape[:2]
-                        target_w = 320
-                        scale = target_w / float(w)
-                        preview = cv2.resize(
-                            bgr,
-                            (target_w, max(1, int(h * scale))),
-                            interpolation=cv2.INTER_AREA,
-                        )
-                        text = "Extrinsik: Klick zum Starten"
-                        try:
-                            status_bus.set_message(text)
-                        except Exception:
-                            pass
-                        camera._encode_and_store_last_capture(preview, quality=85)
-                # Beim Wechsel in DISTORTION: Erste Phase ohne Klick starten und Status setzen
-                if self.mode == "DISTORTION":
-                    # Kalibriersession anlegen
-                    try:
-                        self.calib_session = CalibrationSession(target_snapshots=20)
-                    except Exception:
-                        self.calib_session = None
-                    # Statusmeldung sofort anzeigen
-                    try:
-                        status_bus.set_message("Kalibrierung: Klick zum Starten")
-                    except Exception:
-                        pass
-                    # Optional: aktuelle Vorschau ohne Overlay speichern
+                self.calib_session.stop()
+            except Exception as e:
+                pass
+            self.calib_session = None
+        # Beim Wechsel in EXTRINSIK: Bannerbild in Vorschau
+        try:
+            if mode == "EXTRINSIK" and camera.is_camera_started():
+                arr = camera.picam2.capture_array()
+                if arr is not None:
+                    if arr.ndim == 3 and arr.shape[2] == 4:
+                        bgr = cv2.cvtColor(arr, cv2.COLOR_RGBA2BGR)
+                    elif arr.ndim == 3 and arr.shape[2] == 3:
+                        bgr = cv2.cvtColor(arr, cv2.COLOR_RGB2BGR)
+                    else:
+                        bgr = arr
+                    h, w = bgr.shape[:2]
+                    target_w = 320
+                    scale = target_w / float(w)
+                    preview = cv2.resize(
+                        bgr,
+                        (target_w, max(1, int(h * scale))),
+                        interpolation=cv2.INTER_AREA,
+                    )
+                    text = "Extrinsik: Klick zum Starten"
                     try:
-                        if camera.is_camera_started():
-                            arr = camera.picam2.capture_array()
-                            if arr is not None:
-                                if arr.ndim == 3 and arr.shape[2] == 4:
-                                    bgr = cv2.cvtColor(arr, cv2.COLOR_RGBA2BGR)
-                                elif arr.ndim == 3 and arr.shape[2] == 3:
-                                    bgr = cv2.cvtColor(arr, cv2.COLOR_RGB2BGR)
-                                else:
-                                    bgr = arr
-                                h, w = bgr.shape[:2]
-                                target_w = 320
-                                scale = target_w / float(w)
-                                preview = cv2.resize(
-                                    bgr,
-                                    (target_w, max(1, int(h * scale))),
-                                    interpolation=cv2.INTER_AREA,
-                                )
-                                camera._encode_and_store_last_capture(
-                                    preview, quality=85
-                                )
+                        status_bus.set_message(text)
                     except Exception:
                         pass
-            except Exception:
-                pass
+                    camera._encode_and_store_last_capture(preview, quality=85)
+            # Beim Wechsel in DISTORTION: Erste Phase ohne Klick starten und Status setzen
+            if mode == "DISTORTION":
+                # Kalibriersession anlegen
+                try:
+                    self.calib_session = CalibrationSession(target_snapshots=20)
+                except Exception:
+                    self.calib_session = None
+                # Statusmeldung sofort anzeigen
+                try:
+                    status_bus.set_message("Kalibrierung: Klick zum Starten")
+                except Exception:
+                    pass
+                # Optional: aktuelle Vorschau ohne Overlay speichern
+                try:
+                    if camera.is_camera_started():
+                        arr = camera.picam2.capture_array()
+                        if arr is not None:
+                            if arr.ndim == 3 and arr.shape[2] == 4:
+                                bgr = cv2.cvtColor(arr, cv2.COLOR_RGBA2BGR)
+                            elif arr.ndim == 3 and arr.shape[2] == 3:
+                                bgr = cv2.cvtColor(arr, cv2.COLOR_RGB2BGR)
+                            else:
+                                bgr = arr
+                            h, w = bgr.shape[:2]
+                            target_w = 320
+                            scale = target_w / float(w)
+                            preview = cv2.resize(
+                                bgr,
+                                (target_w, max(1, int(h * scale))),
+                                interpolation=cv2.INTER_AREA,
+                            )
+                            camera._encode_and_store_last_capture(
+                                preview, quality=85
+                            )
+                except Exception:
+                    pass
+        except Exception:
+            pass
 
     def send_command(self, command):
         """Sendet ein Kommando an den Arduino."""
         self.serial.send_command(command)
 
-    def process_auto_mode(self):
+    def _on_getxy(self, line):
+        if self.get_mode() == "AUTO":
+            self.process_auto_mode(line)
+        else:
+            logger.debug(f"<- Arduino: {line} (ignoriert, Modus {self.get_mode()})")
+
+    def process_auto_mode(self, line=None):
         """Verarbeitet die automatische Steuerung."""
-        line = self.serial.read_line()
+        if line is None:
+            line = self.serial.read_line()
         if line == "GETXY":
             logger.info("<- Arduino: GETXY")
+            # Neuer Halt nach einer Fahrt: Fugen-Maske neu berechnen
+            joints.new_cycle()
+            # Bild, in dessen Pixeln die Boxen liegen (BEV-Pfad setzt das entzerrte Vogelperspektiv-Bild)
+            self._det_frame = None
 
-            # Entzerrtes Einzelbild aufnehmen und verarbeiten (immer undistortiert für GETXY)
-            filename = "frame.jpg"
-            camera.capture_image(filename, undistort=True)
-            img_path = filename
-
-            coords = yolo_detector.process_image(img_path)
             # Falls Welttransformation verfügbar: Pixel -> Welt (mm)
             use_world = False
             try:
@@ -201,49 +238,275 @@ class RobotControl:
                 )
             except Exception:
                 use_world = geometry.is_world_transform_ready()
-            for x, y in coords:
-                if use_world:
-                    try:
-                        w = geometry.pixel_to_world(float(x), float(y))
-                        if w is not None:
-                            xw, yw = w
-                            msg = f"XY:{xw:.1f},{yw:.1f}"
-                        else:
-                            msg = f"XY:{x:.1f},{y:.1f}"
-                    except Exception:
-                        msg = f"XY:{x:.1f},{y:.1f}"
-                else:
-                    msg = f"XY:{x:.1f},{y:.1f}"
-                logger.info(f"-> Arduino: {msg}")
-                self.send_command(msg)
-                time.sleep(0.05)
 
-            # Abschlussmeldung
-            self.send_command("DONE")
-            logger.info("-> Arduino: DONE")
+            tracking = use_world and getattr(config, "TRACK_ACTIVE", False)
+            if tracking:
+                adv = self.tracker.begin_cycle()
+                logger.debug(f"[Track] Fahrt seit letztem GETXY: {adv:.1f} mm")
+
+            filename = "frame.jpg"
+            burst = int(getattr(config, "BURST_FRAMES", 1))
+            if burst > 1:
+                det = self._detect_burst(filename, burst, use_world)
+                if det is None:
+                    self._send_no_targets(tracking)
+                    return
+            else:
+                # Entzerrtes Einzelbild aufnehmen und verarbeiten (immer undistortiert für GETXY)
+                camera.capture_image(
+                    filename,
+                    undistort=True,
+                    quality_gate=getattr(config, "QUALITY_GATE_ACTIVE", False),
+                )
+                frame_ts = camera.get_last_frame_meta().get(
+                    "ts", camera.get_last_capture_timestamp()
+                )
+                det = None
+                if self._quality_rejected():
+                    self._send_no_targets(tracking)
+                    return
+                if tracking:
+                    det = self._detect_tracked(filename, frame_ts)
+                if det is None:
+                    det = self._detect(filename, frame_ts, use_world)
+
+            if tracking and not self.tracker.cycle_updated:
+                ids = self.tracker.update(det, full=True)
+                logger.info(f"[Track] IDs {ids.tolist()} ({len(self.tracker.tracks)} aktive Track(s))")
+
+            # Unsichere/leere Bilder im Hintergrund für das Training sammeln
+            if getattr(config, "HARVEST_ACTIVE", False):
+                try:
+                    harvest.consider(
+                        self._det_frame if self._det_frame is not None else camera.get_last_frame(),
+                        det,
+                        camera.get_last_frame_meta().get("ts", time.time()),
+                    )
+                except Exception as e:
+                    logger.warning(f"[Harvest] fehlgeschlagen: {e}")
+
+            # Nachkontrolle: zuletzt gebürstete Ziele mit Restbewuchs erneut einplanen
+            verify = use_world and getattr(config, "BRUSH_VERIFY_ACTIVE", False)
+            if verify:
+                try:
+                    retry = self.verifier.check(
+                        camera.get_last_frame(),
+                        camera.get_last_frame_meta().get("ts", time.time()),
+                    )
+                    det = brush_verify.merge(
+                        retry, det, float(getattr(config, "BRUSH_VERIFY_MATCH_MM", 10.0))
+                    )
+                except Exception as e:
+                    logger.warning(f"[Nachkontrolle] fehlgeschlagen: {e}")
+
+            # Zielkoordinaten senden (Welt, wo verfügbar, sonst Pixel) inkl. Abschlussmeldung
+            xy = detections.target_xy(det)
+            self.serial.send_targets(xy, cls=det["cls"], prio=det["conf"] * 255.0)
+            if tracking:
+                self.tracker.note_sent(xy)
+            if verify:
+                self.verifier.note_treated(det, xy)
+
+    @staticmethod
+    def _quality_rejected():
+        """True, wenn das letzte Bild die Qualitätsprüfung nicht bestanden hat und verworfen werden soll."""
+        if not getattr(config, "QUALITY_SKIP_ON_FAIL", True):
+            return False
+        if camera.get_last_frame_meta().get("quality_ok", True):
+            return False
+        logger.warning("[Qualität] Bild unbrauchbar – keine Inferenz, leeres Zielset.")
+        return True
+
+    def _send_no_targets(self, tracking):
+        """Leeres Zielset senden: der Mega fährt nicht weiter und fordert mit GETXY ein neues Bild an."""
+        xy = np.zeros((0, 2), dtype=np.float64)
+        self.serial.send_targets(xy)
+        if tracking:
+            self.tracker.note_sent(xy)
+
+    def _prefilter(self, frame):
+        """Vegetations-Vorfilter. Rückgabe: (skip, crop) – skip=True, wenn keine Inferenz nötig ist."""
+        if not getattr(config, "VEG_PREFILTER_ACTIVE", False) or frame is None:
+            return False, None
+        crop = None
+        try:
+            has_veg, frac, rois = vegetation.prefilter(frame)
+            if not has_veg:
+                logger.info(
+                    f"[Veg] Grünanteil {frac * 100:.2f}% unter Schwelle – Inferenz übersprungen."
+                )
+                return True, None
+            logger.info(f"[Veg] Grünanteil {frac * 100:.2f}%, {len(rois)} Fleck(en)")
+            if getattr(config, "VEG_CROP_HINTS", False):
+                u = vegetation.union_roi(rois)
+                if u is not None:
+                    h, w = frame.shape[:2]
+                    area_frac = (u[2] - u[0]) * (u[3] - u[1]) / float(w * h)
+                    if area_frac <= float(getattr(config, "VEG_CROP_MAX_AREA_FRAC", 0.5)):
+                        crop = u
+        except Exception as e:
+            logger.warning(f"[Veg] Vorfilter fehlgeschlagen, normale Inferenz: {e}")
+        return False, crop
+
+    def _detect(self, img_path, frame_ts, use_world):
+        """Führt Vorfilter und Detektion für das aufgenommene Bild aus und gibt das Detektions-Array zurück."""
+        bev = self._bev_params() if use_world else None
+        if bev is not None:
+            frame = geometry.warp_to_bev(camera.get_last_frame())
+            self._det_frame = frame
+            skip, _ = self._prefilter(frame)
+            if skip:
+                return detections.empty()
+            mask = self._joint_mask(frame)
+            det = yolo_detector.process_frames([frame], [frame_ts])[0]
+            det = self._filter_joints(det, mask, frame)
+            return geometry.bev_detections_to_world(det, bev)
+        frame = camera.get_last_frame()
+        skip, crop = self._prefilter(frame)
+        if skip:
+            return detections.empty()
+        mask = self._joint_mask(frame)
+        if mask is not None and getattr(config, "JOINT_CROP_HINTS", False):
+            h, w = frame.shape[:2]
+            jr = joints.mask_roi(mask, (w, h))
+            if jr is not None:
+                crop = jr if crop is None else (
+                    max(crop[0], jr[0]), max(crop[1], jr[1]), min(crop[2], jr[2]), min(crop[3], jr[3])
+                )
+        det = yolo_detector.process_image(img_path, frame_ts=frame_ts, crop=crop)
+        det = self._filter_joints(det, mask, frame)
+        return self._to_world(det) if use_world else det
+
+    def _detect_tracked(self, img_path, frame_ts):
+        """Tracking-Pfad: bekannte Ziele nur prüfen, Inferenz nur auf dem neu sichtbaren Streifen.
+
+        Gibt None zurück, wenn eine volle Inferenz nötig ist (Szene zu wenig bekannt, periodische
+        Vollinferenz fällig, BEV-Modus aktiv oder zu viele Vorhersagen nicht bestätigt).
+        """
+        frame = camera.get_last_frame()
+        if frame is None or self._bev_params() is not None:
+            return None
+        h, w = frame.shape[:2]
+        if not self.tracker.can_skip_full(w, h):
+            return None
+        pred, _ = self.tracker.predict(w, h, frame_ts)
+        ok = self.tracker.verify(frame, pred)
+        if len(pred) and ok.mean() < float(getattr(config, "TRACK_MIN_CONFIRMED", 0.7)):
+            logger.info(f"[Track] Nur {int(ok.sum())}/{len(pred)} Vorhersage(n) bestätigt – volle Inferenz")
+            return None
+        crop = self.tracker.new_strip_crop(w, h)
+        new = detections.empty()
+        if crop is not None:
+            new = yolo_detector.process_image(img_path, frame_ts=frame_ts, crop=crop)
+            new = self._filter_joints(new, self._joint_mask(frame), frame)
+            self._to_world(new)
+        known = pred[ok]
+        new = tracker.dedupe(known, new, float(getattr(config, "TRACK_MATCH_RADIUS_MM", 20.0)))
+        det = np.concatenate([known, new]) if len(new) else known
+        ids = self.tracker.update(det, full=False)
+        logger.info(
+            f"[Track] Szene bekannt: {int(ok.sum())}/{len(pred)} bestätigt, {len(new)} neu im Streifen {crop} – IDs {ids.tolist()}"
+        )
+        return det
+
+    def _joint_mask(self, frame):
+        """Fugen-Maske des Bildes, falls aktiviert (sonst None)."""
+        if not getattr(config, "JOINT_MASK_ACTIVE", False) or frame is None:
+            return None
+        try:
+            return joints.joint_mask(frame)
+        except Exception as e:
+            logger.warning(f"[Fugen] Maske fehlgeschlagen, keine Filterung: {e}")
+            return None
+
+    def _filter_joints(self, det, mask, frame):
+        """Verwirft Detektionen außerhalb der Fugen."""
+        if mask is None or len(det) == 0:
+            return det
+        h, w = frame.shape[:2]
+        kept = joints.filter_detections(det, mask, (w, h))
+        if len(kept) < len(det):
+            logger.info(f"[Fugen] {len(det) - len(kept)} von {len(det)} Detektion(en) auf Steinfläche verworfen")
+        return kept
+
+    def _bev_params(self):
+        """BEV-Remap-Parameter für das aktuelle Bild, falls der BEV-Modus aktiv ist (sonst None)."""
+        if not getattr(config, "BEV_ACTIVE", False):
+            return None
+        frame = camera.get_last_frame()
+        if frame is None:
+            return None
+        try:
+            h, w = frame.shape[:2]
+            return geometry.bev_params(w, h)
+        except Exception as e:
+            logger.warning(f"[BEV] Entzerrung nicht verfügbar, normales Bild: {e}")
+            return None
+
+    def _detect_burst(self, filename, count, use_world):
+        """Burst-Modus: mehrere Bilder aufnehmen, gebündelt detektieren und fusionieren.
+        Rückgabe None, wenn das erste Bild die Qualitätsprüfung nicht bestanden hat."""
+        frames = camera.capture_burst(
+            filename,
+            count,
+            interval_s=float(getattr(config, "BURST_INTERVAL_S", 0.1)),
+            undistort=True,
+            quality_gate=getattr(config, "QUALITY_GATE_ACTIVE", False),
+        )
+        if not frames:
+            return detections.empty()
+        if self._quality_rejected():
+            return None
+        bev = self._bev_params() if use_world else None
+        if bev is not None:
+            frames = [(geometry.warp_to_bev(f), ts) for f, ts in frames]
+            self._det_frame = frames[0][0]
+        skip, _ = self._prefilter(frames[0][0])
+        if skip:
+            return detections.empty()
+        mask = self._joint_mask(frames[0][0])
+        dets = yolo_detector.process_frames(
+            [f for f, _ in frames], [ts for _, ts in frames]
+        )
+        dets = [self._filter_joints(d, mask, f) for d, (f, _) in zip(dets, frames)]
+        if bev is not None:
+            for d in dets:
+                geometry.bev_detections_to_world(d, bev)
+        elif use_world:
+            for d in dets:
+                self._to_world(d)
+        fused = fusion.fuse_detections(
+            dets,
+            radius_mm=float(getattr(config, "BURST_FUSION_RADIUS_MM", 15.0)),
+            radius_px=float(getattr(config, "BURST_FUSION_RADIUS_PX", 20.0)),
+            min_votes=getattr(config, "BURST_MIN_VOTES", None),
+        )
+        logger.info(
+            f"[Burst] {len(frames)} Bild(er), Detektionen {[len(d) for d in dets]} -> {len(fused)} fusioniert"
+        )
+        return fused
+
+    def _to_world(self, det):
+        try:
+            geometry.detections_to_world(det)
+        except Exception as e:
+            logger.warning(f"Welttransformation fehlgeschlagen: {e}")
+        return det
 
     def handle_command(self, command):
         """Verarbeitet ein empfangenes Kommando."""
         # Extrahiere Joystick-Daten
-        if command.startswith("JOYSTICK:"):
-            try:
-                parts = command[len("JOYSTICK:") :].split(",")
-                x = y = None
-                for p in parts:
-                    if p.startswith("X="):
-                        x = int(p[2:])
-                    elif p.startswith("Y="):
-                        y = int(p[2:])
-                if x is not None and y is not None:
-                    with self.last_joystick_lock:
-                        self.last_joystick = {"x": x, "y": y}
-            except Exception:
-                pass
+        joy = joystick_channel.parse_joystick(command)
+        if joy is not None:
+            with self.last_joystick_lock:
+                self.last_joystick = {"x": joy[0], "y": joy[1]}
         mode = self.get_mode()
         if mode == "MANUAL":
-            if ",B=1" in command:
-                command = command.replace(",B=1", "")
-            self.send_command(command)
+            if joy is not None:
+                # Nur der neueste Wert geht an den Mega (B=1 = Trainingsbild, wird nicht weitergegeben)
+                self.joystick.submit(*joy)
+            else:
+                self.send_command(command)
             return True
         elif mode == "DISTORTION":
             # DISTORTION: zur Sicherheit an Arduino wie AUTO (d. h. keine direkten Joystick-Kommandos),
@@ -439,7 +702,11 @@ class RobotControl:
 
     def get_joystick_status(self):
         with self.last_joystick_lock:
-            return dict(self.last_joystick)
+            status = dict(self.last_joystick)
+        status["channel"] = self.joystick.get_stats()
+        status["udp"] = udp_server.get_joystick_stats()
+        status["ports"] = udp_server.get_udp_stats()
+        return status
 
     def run(self):
         """Hauptschleife der Robotersteuerung."""
@@ -451,42 +718,38 @@ class RobotControl:
             logger.info("Starte HTTP-Server...")
             threading.Thread(target=camera.start_http_server, daemon=True).start()
 
-            logger.info("Starte UDP-Steuerkanal...")
-            threading.Thread(
-                target=udp_server.start_control_server, daemon=True
-            ).start()
+            logger.info("Starte UDP-Server (Steuerung, Joystick, Heartbeat)...")
+            udp_server.start()
 
-            logger.info("Starte UDP-Joystick-Server...")
-            threading.Thread(
-                target=udp_server.start_joystick_server, daemon=True
-            ).start()
+            # Modellverzeichnis auf neue Gewichte überwachen (Standby + Schattenbetrieb)
+            yolo_detector.start_model_watcher()
 
-            # Starte Heartbeat-Listener für Videostream (UDP)
-            udp_server.start_heartbeat_monitor()
             # Starte WebSocket-Status-Server (im Hintergrund)
             threading.Thread(
                 target=status_ws_server.start_status_ws_server, daemon=True
             ).start()
 
+            # Firmware-Uploads (inotify bzw. langsamer Scan); geflasht wird nur im Modus MANUAL
+            self._upload_pending.set()
+            upload_watch.start(config.UPLOAD_DIR, self._upload_pending.set)
+
             logger.info("Starte Hauptloop...")
+            timeout = float(getattr(config, "MAIN_LOOP_TIMEOUT_S", 1.0))
             while True:
-                # Check for firmware uploads in MANUAL mode
-                try:
-                    if self.get_mode() == "MANUAL":
-                        upload_dir = Path(config.UPLOAD_DIR)
-                        if upload_dir.exists():
-                            for p in upload_dir.iterdir():
-                                if p.suffix.lower() == ".hex":
-                                    logger.info(f"Gefundene Firmware: {p}")
-                                    # flash file p with avrdude
-                                    self._flash_hex_to_mega(p)
-                                    break
-                except Exception as e:
-                    logger.error(f"Fehler beim Scan des Upload-Verzeichnisses: {e}")
-
-                if self.get_mode() == "AUTO":
-                    self.process_auto_mode()
-                time.sleep(0.1)
+                # Blockiert bis zur nächsten Zeile vom Mega (GETXY wird sofort bearbeitet)
+                item = self.serial.read_line(timeout=timeout, with_ts=True)
+                if item is not None:
+                    rx_ts, line = item
+                    waited = time.monotonic() - rx_ts
+                    if waited > 0.5:
+                        logger.warning(f"<- Arduino: {line} erst nach {waited:.2f}s bearbeitet")
+                    handler = self._line_handlers.get(line)
+                    if handler is not None:
+                        handler(line)
+
+                if self._upload_pending.is_set() and self.get_mode() == "MANUAL":
+                    self._upload_pending.clear()
+                    self._flash_uploads()
 
         except KeyboardInterrupt:
             logger.info("Beendet.")
@@ -495,6 +758,21 @@ class RobotControl:
             if camera.stream_active:
                 camera.stop_stream()
 
+    def _flash_uploads(self) -> None:
+        """Flasht die erste gefundene .hex aus UPLOAD_DIR (weitere im nächsten Durchlauf)."""
+        try:
+            upload_dir = Path(config.UPLOAD_DIR)
+            if upload_dir.exists():
+                for p in upload_dir.iterdir():
+                    if p.suffix.lower() == ".hex":
+                        logger.info(f"Gefundene Firmware: {p}")
+                        # flash file p with avrdude
+                        self._flash_hex_to_mega(p)
+                        self._upload_pending.set()
+                        break
+        except Exception as e:
+            logger.error(f"Fehler beim Scan des Upload-Verzeichnisses: {e}")
+
     def _flash_hex_to_mega(self, hexpath: Path) -> None:
         """Flash the given .hex to the Mega using avrdude on config.SERIAL_PORT.
 
@@ -8,8 +8,7 @@ import time
 import threading
 import queue
 import logging
-from . import config
-from . import config
+from . import config, target_protocol
 
 # Logger einrichten
 logger = logging.getLogger("serial_manager")
@@ -40,39 +39,51 @@ class SerialManager:
             queue.Queue()
         )  # Thread-sichere Queue für empfangene Zeilen
         self.running = True
+        self._frame_seq = 0
+        self.frame_stats = {"sent": 0, "acked": 0, "nak": 0, "timeouts": 0, "superseded": 0, "unconfirmed": 0, "failed": 0}
         # Starte den Lese-Thread
         self.read_thread = threading.Thread(target=self._read_serial, daemon=True)
         self.read_thread.start()
         time.sleep(2)  # Zeit für Verbindungsaufbau
 
     def _read_serial(self):
-        """Thread-Funktion zum kontinuierlichen Lesen der seriellen Schnittstelle."""
+        """Thread-Funktion zum kontinuierlichen Lesen der seriellen Schnittstelle.
+        Liest alle verfügbaren Bytes auf einmal (blockiert sonst bis zum Timeout des Ports),
+        zerlegt sie in Zeilen und legt (Empfangszeit, Zeile) in die Queue."""
         import os
 
+        buf = bytearray()
         while self.running:
             try:
-                if self.serial.in_waiting:
-                    char = self.serial.read().decode(errors="ignore")
-                    logger.debug(f"Empfangenes Byte: 0x{ord(char):02x}")
-
-                    if char == "\n":  # Zeilenende gefunden
-                        complete_command = (
-                            self.buffer.strip()
-                        )  # Entferne Whitespace und CR
-                        if complete_command:  # Ignoriere leere Zeilen
-                            logger.info(f"Kompletter Befehl: {complete_command}")
+                data = self.serial.read(max(1, self.serial.in_waiting))
+                if not data:
+                    continue
+                now = time.monotonic()
+                buf += data
+                start = 0
+                while True:
+                    end = buf.find(b"\n", start)
+                    if end < 0:
+                        break
+                    # Entferne Whitespace und CR
+                    complete_command = buf[start:end].decode(errors="ignore").strip()
+                    start = end + 1
+                    if complete_command:  # Ignoriere leere Zeilen
+                        logger.info(f"Kompletter Befehl: {complete_command}")
+                        if logger.isEnabledFor(logging.DEBUG):
                             logger.debug(
                                 "Als Bytes: %s",
                                 " ".join(f"0x{ord(c):02x}" for c in complete_command),
                             )
-                            self.received_lines.put(complete_command)
-                        self.buffer = ""  # Puffer zurücksetzen
-                    else:
-                        self.buffer += char
-                else:
-                    # Kurze Pause wenn keine Daten verfügbar
-                    time.sleep(0.01)
+                        self.received_lines.put((now, complete_command))
+                del buf[:start]
+                if len(buf) > 4096:
+                    # Kein Zeilenende in Sicht (Störung auf der Leitung) → verwerfen
+                    logger.warning(f"Verwerfe {len(buf)} Byte ohne Zeilenende")
+                    buf.clear()
             except Exception as e:
+                if not self.running:
+                    break  # Port wird gerade geschlossen
                 logger.error(
                     f"Schwerwiegender Fehler in der seriellen Schnittstelle: {e}"
                 )
@@ -82,13 +93,93 @@ class SerialManager:
         """Sendet ein Kommando an den Arduino."""
         self.serial.write(f"{command}\n".encode())
 
-    def read_line(self):
+    def send_targets(self, xy, line_delay_s: float = 0.05, cls=None, prio=None):
+        """Sendet Zielkoordinaten ((N,2)-Array, mm bzw. Pixel) an den Mega.
+        SERIAL_TARGET_PROTOCOL "text": XY-Zeilen, gefolgt von DONE (cls/prio entfallen).
+        "frame": ein Binärrahmen mit CRC (target_protocol), Wiederholung bei NAK/Timeout.
+        Rückgabe: False, wenn der Rahmen nicht bestätigt wurde."""
+        if getattr(config, "SERIAL_TARGET_PROTOCOL", "text") == "frame":
+            return self._send_target_frame(xy, cls, prio)
+        for x, y in xy:
+            msg = f"XY:{x:.1f},{y:.1f}"
+            logger.info(f"-> Arduino: {msg}")
+            self.send_command(msg)
+            if line_delay_s > 0:
+                time.sleep(line_delay_s)
+        self.send_command("DONE")
+        logger.info("-> Arduino: DONE")
+        return True
+
+    def _send_target_frame(self, xy, cls, prio):
+        self._frame_seq = (self._frame_seq + 1) & 0xFF
+        seq = self._frame_seq
+        frame = target_protocol.encode_targets(seq, xy, cls, prio)
+        n = frame[3]
+        if n < len(xy):
+            logger.warning(f"Nur {n} von {len(xy)} Zielen übertragen (Firmware-Limit)")
+        retries = int(getattr(config, "SERIAL_FRAME_RETRIES", 3))
+        ack_timeout = float(getattr(config, "SERIAL_FRAME_ACK_TIMEOUT_S", 0.5))
+        other = []  # während des Wartens empfangene andere Zeilen (danach zurück in die Queue)
+        nak_seen = False
+        try:
+            for attempt in range(retries + 1):
+                self.serial.write(frame + target_protocol.FRAME_END)
+                self.frame_stats["sent"] += 1
+                logger.info(f"-> Arduino: Ziel-Rahmen seq={seq}, {n} Ziel(e), {len(frame)} Byte" + (f" (Wiederholung {attempt})" if attempt else ""))
+                deadline = time.monotonic() + ack_timeout
+                reply = None
+                while reply is None:
+                    left = deadline - time.monotonic()
+                    item = self.read_line(timeout=left, with_ts=True) if left > 0 else None
+                    if item is None:
+                        break
+                    if item[1] == "GETXY":
+                        # Mega fragt schon neu an: Zyklus vorbei (Rahmen ausgeführt, nur ACK verloren, oder
+                        # Mega-Timeout) – weitere Wiederholungen liefen nur in seinen vollen RX-Puffer
+                        other.append(item)
+                        self.frame_stats["superseded"] += 1
+                        logger.info(f"Ziel-Rahmen seq={seq}: kein ACK, aber Mega fordert bereits neue Ziele an")
+                        return True
+                    reply = target_protocol.parse_reply(item[1])
+                    if reply is None:
+                        other.append(item)
+                    elif reply[1] not in (seq, -1):
+                        reply = None  # Antwort auf einen älteren Rahmen
+                if reply is None:
+                    self.frame_stats["timeouts"] += 1
+                    logger.warning(f"Keine Antwort auf Ziel-Rahmen seq={seq}")
+                elif reply[0]:
+                    self.frame_stats["acked"] += 1
+                    return True
+                else:
+                    self.frame_stats["nak"] += 1
+                    nak_seen = True
+                    logger.warning(f"<- Arduino: NAK für Ziel-Rahmen seq={seq}")
+            if not nak_seen:
+                # Nur Timeouts: evtl. ging bloß das ACK verloren und der Mega fährt bereits
+                self.frame_stats["unconfirmed"] += 1
+                logger.warning(f"Ziel-Rahmen seq={seq} nach {retries + 1} Versuchen ohne Antwort – Mega evtl. beschäftigt")
+                return False
+            self.frame_stats["failed"] += 1
+            logger.error(f"Ziel-Rahmen seq={seq} nach {retries + 1} Versuchen nicht bestätigt")
+            return False
+        finally:
+            for item in other:
+                self.received_lines.put(item)
+
+    def read_line(self, timeout=None, with_ts=False):
         """Liest eine Zeile aus der Queue der empfangenen Befehle.
-        Nicht-blockierend, gibt None zurück wenn keine Zeile verfügbar."""
+        Ohne timeout nicht-blockierend, sonst wird höchstens timeout Sekunden gewartet.
+        Mit with_ts wird (Empfangszeit time.monotonic(), Zeile) zurückgegeben.
+        Gibt None zurück wenn keine Zeile verfügbar."""
         try:
-            return self.received_lines.get_nowait()
+            if timeout is None:
+                item = self.received_lines.get_nowait()
+            else:
+                item = self.received_lines.get(timeout=timeout)
         except queue.Empty:
             return None
+        return item if with_ts else item[1]
 
     def close(self):
         """Beendet den Lese-Thread und schließt die serielle Verbindung."""
@@ -6,7 +6,7 @@ import websockets
 import logging
 from . import config
 from websockets.exceptions import ConnectionClosedOK
-from . import robot_control, camera, geometry, status_bus
+from . import robot_control, camera, geometry, status_bus, yolo_detector
 
 # Logger einrichten
 logger = logging.getLogger("status_ws_server")
@@ -131,6 +131,7 @@ def get_status_data():
         "world_transform_ready": geometry.is_world_transform_ready(),
         "wifi": get_wifi_status(),
         "message": status_bus.get_message(),
+        "model": yolo_detector.get_model_status(),
     }
     # Joystick-Daten nur im Modus MANUAL mitsenden
     if status["mode"] == "MANUAL":
@@ -0,0 +1,145 @@
+"""
+Binäres Batch-Format für die Zielübergabe Pi → Mega (Antwort auf GETXY).
+
+Statt N Zeilen "XY:x,y" plus "DONE" wird ein einziger Rahmen gesendet:
+
+    SOF      u8   0xA5
+    version  u8   FRAME_VERSION
+    seq      u8   fortlaufend je Batch (Wiederholung mit derselben seq)
+    n        u8   Anzahl Ziele (0..MAX_TARGETS)
+    n ×      x    int16  X in 0,1 mm
+             y    int16  Y in 0,1 mm
+             cls  u8     Klasse
+             prio u8     Priorität 0..255 (aus der Konfidenz)
+    crc      u16  CRC-16/CCITT-FALSE (Poly 0x1021, Start 0xFFFF) über version..letztes Ziel
+
+Alle Mehrbyte-Werte little endian. Auf der Leitung folgt jedem Rahmen ein FRAME_END ('\n'): nach
+einem kaputten Rahmen verwirft der Mega bis dorthin und verliert so keine folgenden Textzeilen.
+Der Mega antwortet mit einer Textzeile "ACK:<seq>" oder "NAK:<seq>" (seq = -1, wenn der Kopf schon
+unlesbar war); bei NAK/Timeout wiederholt der Pi, bis der Mega mit dem nächsten GETXY zeigt, dass
+der Zyklus vorbei ist.
+Gegenstück: anfrageUndAbarbeiten/leseZielFrame in unkrautroboter_motorsteuerung.ino.
+"""
+
+import struct
+from typing import Optional, Tuple
+
+import numpy as np
+
+SOF = 0xA5
+FRAME_VERSION = 1
+MAX_TARGETS = 50  # MAX_KOORDINATEN in der Firmware
+SCALE = 10.0  # 0,1 mm
+FRAME_END = b"\n"  # Resynchronisation nach Übertragungsfehlern (nicht Teil von CRC/Länge)
+_HEADER = struct.Struct("<BBBB")
+_CRC = struct.Struct("<H")
+TARGET_DTYPE = np.dtype([("x", "<i2"), ("y", "<i2"), ("cls", "u1"), ("prio", "u1")])
+
+
+def _crc_table():
+    table = []
+    for i in range(256):
+        c = i << 8
+        for _ in range(8):
+            c = ((c << 1) ^ 0x1021) if c & 0x8000 else (c << 1)
+        table.append(c & 0xFFFF)
+    return tuple(table)
+
+
+_CRC_TABLE = _crc_table()
+
+
+def crc16_ccitt(data: bytes, crc: int = 0xFFFF) -> int:
+    for b in data:
+        crc = ((crc << 8) & 0xFFFF) ^ _CRC_TABLE[((crc >> 8) ^ b) & 0xFF]
+    return crc
+
+
+def encode_targets(seq: int, xy, cls=None, prio=None) -> bytes:
+    """(N,2)-Ziele in mm → Rahmen. Werte außerhalb ±3276,7 mm werden begrenzt, mehr als MAX_TARGETS abgeschnitten."""
+    xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)[:MAX_TARGETS]
+    n = len(xy)
+    t = np.zeros(n, dtype=TARGET_DTYPE)
+    scaled = np.clip(np.rint(xy * SCALE), -32768, 32767)
+    t["x"], t["y"] = scaled[:, 0], scaled[:, 1]
+    if cls is not None:
+        t["cls"] = np.clip(np.asarray(cls)[:n], 0, 255)
+    if prio is not None:
+        t["prio"] = np.clip(np.asarray(prio)[:n], 0, 255)
+    body = bytes((FRAME_VERSION, seq & 0xFF, n)) + t.tobytes()
+    return bytes((SOF,)) + body + _CRC.pack(crc16_ccitt(body))
+
+
+def frame_length(n: int) -> int:
+    return _HEADER.size + n * TARGET_DTYPE.itemsize + _CRC.size
+
+
+def decode_frame(frame: bytes) -> Tuple[int, np.ndarray]:
+    """Rahmen → (seq, Ziele als TARGET_DTYPE-Array). ValueError bei Formatfehler oder falscher CRC."""
+    if len(frame) < _HEADER.size + _CRC.size:
+        raise ValueError("Rahmen zu kurz")
+    sof, version, seq, n = _HEADER.unpack_from(frame)
+    if sof != SOF:
+        raise ValueError("kein Rahmenanfang")
+    if version != FRAME_VERSION:
+        raise ValueError(f"Version {version} nicht unterstützt")
+    if n > MAX_TARGETS or len(frame) != frame_length(n):
+        raise ValueError(f"Länge passt nicht zu {n} Zielen")
+    (crc,) = _CRC.unpack_from(frame, len(frame) - _CRC.size)
+    if crc != crc16_ccitt(frame[1:-_CRC.size]):
+        raise ValueError("CRC falsch")
+    return seq, np.frombuffer(frame, dtype=TARGET_DTYPE, count=n, offset=_HEADER.size).copy()
+
+
+def targets_mm(t: np.ndarray) -> np.ndarray:
+    """Ziele aus decode_frame → (N,2) in mm."""
+    return np.stack([t["x"], t["y"]], axis=1).astype(np.float64) / SCALE
+
+
+def parse_reply(line: str) -> Optional[Tuple[bool, int]]:
+    """'ACK:<seq>' / 'NAK:<seq>' → (ok, seq); None für andere Zeilen."""
+    for prefix, ok in (("ACK:", True), ("NAK:", False)):
+        if line.startswith(prefix):
+            try:
+                return ok, int(line[len(prefix) :])
+            except ValueError:
+                return None
+    return None
+
+
+class FrameReader:
+    """Setzt Rahmen aus einem Bytestrom zusammen (z. B. im Emulator). feed() liefert fertige Rahmen."""
+
+    def __init__(self):
+        self._buf = bytearray()
+
+    def feed(self, data: bytes):
+        """Rückgabe: Liste von (bytes_vor_dem_rahmen, rahmen_bytes) bzw. (text, None) für Textreste."""
+        self._buf += data
+        out = []
+        while self._buf:
+            sof = self._buf.find(bytes([SOF]))
+            if sof < 0:
+                out.append((bytes(self._buf), None))
+                self._buf.clear()
+                break
+            if sof > 0:
+                out.append((bytes(self._buf[:sof]), None))
+                del self._buf[:sof]
+            if len(self._buf) < _HEADER.size:
+                break
+            size = frame_length(self._buf[3])
+            if len(self._buf) < size:
+                break
+            out.append((b"", bytes(self._buf[:size])))
+            del self._buf[:size]
+        return out
+
+    def pending(self) -> int:
+        return len(self._buf)
+
+    def discard(self) -> bytes:
+        """Unvollständigen Rahmen verwerfen (Timeout, z. B. wegen verfälschter Länge)."""
+        data = bytes(self._buf)
+        self._buf.clear()
+        return data
@@ -0,0 +1,216 @@
+"""
+Verfolgung von Unkraut-Zielen über aufeinanderfolgende GETXY-Halte (Weltkoordinaten, mm).
+
+Zwischen zwei GETXY fährt der Mega genau so weit vor, wie es die gesendeten Ziele verlangen
+(anfrageUndAbarbeiten: aktuelleY_mm startet bei 0 und wächst nur, wenn ein Ziel mehr als 0,5 mm
+weiter vorne liegt). Der Tracker rechnet diese Fahrt aus den gesendeten Zielen nach und verschiebt
+alle bekannten Ziele entsprechend nach hinten (Y nimmt ab).
+
+Ist der größte Teil des Bildausschnitts schon bekannt (kurze Fahrt), genügt statt einer vollen
+Inferenz:
+- eine günstige Prüfung der vorhergesagten Positionen (Excess-Green im Box-Ausschnitt) und
+- eine Inferenz nur auf dem neu sichtbaren Streifen am oberen Bildrand.
+Alle TRACK_FULL_EVERY_N Halte (und immer, wenn zu viele Vorhersagen nicht bestätigt werden)
+läuft trotzdem die volle Inferenz.
+
+Jedes Ziel erhält eine fortlaufende Track-ID (für Logging und spätere Auswertung).
+"""
+
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+
+from . import config, detections, geometry, vegetation
+
+logger = logging.getLogger("tracker")
+
+TRACK_DTYPE = np.dtype(
+    [
+        ("id", np.int32),
+        ("xw", np.float32),
+        ("yw", np.float32),
+        ("w", np.float32),
+        ("h", np.float32),
+        ("conf", np.float32),
+        ("cls", np.int16),
+        ("hits", np.int32),
+        ("misses", np.int16),
+        ("first_ts", np.float64),
+        ("last_ts", np.float64),
+    ]
+)
+
+
+def firmware_advance_mm(xy: np.ndarray, max_targets: Optional[int] = None) -> float:
+    """Fahrstrecke (mm), die der Mega für die gesendeten Ziele zurücklegt (wie anfrageUndAbarbeiten)."""
+    if max_targets is None:
+        max_targets = int(getattr(config, "TRACK_FIRMWARE_MAX_TARGETS", 50))
+    cur = 0.0
+    for _, y in np.asarray(xy, dtype=float).reshape(-1, 2)[:max_targets]:
+        if y - cur > 0.5:
+            cur = y
+    return cur
+
+
+class WeedTracker:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.tracks = np.zeros(0, dtype=TRACK_DTYPE)
+        self._next_id = 1
+        self._advance_mm = 0.0
+        self._last_advance_mm = 0.0
+        self._footprint = None  # (img_w, img_h, y_min, y_max)
+        self._cycles_since_full = None  # None = noch keine volle Inferenz
+        self.cycle_updated = False
+
+    # ---- Bewegung ----
+    def note_sent(self, xy: np.ndarray) -> None:
+        """Merkt sich die aus den gesendeten Zielen folgende Fahrt bis zum nächsten GETXY."""
+        adv = getattr(config, "TRACK_DEFAULT_ADVANCE_MM", None)
+        self._advance_mm = float(adv) if adv is not None else firmware_advance_mm(xy)
+
+    def begin_cycle(self) -> float:
+        """Verschiebt alle Tracks um die seit dem letzten GETXY gefahrene Strecke."""
+        adv = self._advance_mm
+        self._advance_mm = 0.0
+        if adv and len(self.tracks):
+            self.tracks["yw"] -= adv
+        self.cycle_updated = False
+        self._last_advance_mm = adv
+        return adv
+
+    # ---- Bildausschnitt ----
+    def _view(self, img_w: int, img_h: int) -> Optional[Tuple[float, float]]:
+        """Y-Bereich (mm) des Bildausschnitts auf dem Boden (Kamera fest montiert, daher gecacht)."""
+        if self._footprint is not None and self._footprint[:2] == (img_w, img_h):
+            return self._footprint[2:]
+        us = np.linspace(0, img_w - 1, 9)
+        px = np.concatenate([us, us])
+        py = np.concatenate([np.zeros(9), np.full(9, img_h - 1)])
+        _, Y = geometry.pixels_to_world(px, py)
+        Y = Y[np.isfinite(Y)]
+        if Y.size == 0:
+            return None
+        self._footprint = (img_w, img_h, float(Y.min()), float(Y.max()))
+        return self._footprint[2:]
+
+    def known_fraction(self, img_w: int, img_h: int) -> float:
+        """Anteil des aktuellen Ausschnitts, der schon im vorherigen Bild zu sehen war."""
+        view = self._view(img_w, img_h)
+        if view is None or self._cycles_since_full is None:
+            return 0.0
+        length = view[1] - view[0]
+        if length <= 0:
+            return 0.0
+        return float(max(0.0, 1.0 - self._last_advance_mm / length))
+
+    def can_skip_full(self, img_w: int, img_h: int) -> bool:
+        if self._cycles_since_full is None:
+            return False
+        if self._cycles_since_full + 1 >= int(getattr(config, "TRACK_FULL_EVERY_N", 5)):
+            return False
+        return self.known_fraction(img_w, img_h) >= float(getattr(config, "TRACK_KNOWN_FRACTION", 0.8))
+
+    def new_strip_crop(self, img_w: int, img_h: int, pad_px: int = 32) -> Optional[Tuple[int, int, int, int]]:
+        """Pixel-Rechteck des neu sichtbaren Bereichs (vorne = oben im Bild); None ohne Fahrt."""
+        view = self._view(img_w, img_h)
+        if view is None or self._last_advance_mm <= 0.5:
+            return None
+        y_edge = view[1] - self._last_advance_mm
+        xs = np.linspace(-2000.0, 2000.0, 81)
+        u, v = geometry.world_to_pixels(xs, np.full(xs.shape, y_edge))
+        ok = np.isfinite(v) & (u >= 0) & (u < img_w)
+        if not np.any(ok):
+            return 0, 0, img_w, img_h
+        y2 = int(min(img_h, np.ceil(v[ok].max()) + pad_px))
+        return 0, 0, img_w, max(32, y2)
+
+    # ---- Vorhersage und Prüfung ----
+    def predict(self, img_w: int, img_h: int, frame_ts: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+        """Vorhergesagte Detektionen der Tracks im Bild. Rückgabe: (det, Track-Indizes)."""
+        if len(self.tracks) == 0:
+            return detections.empty(), np.zeros(0, dtype=np.int64)
+        u, v = geometry.world_to_pixels(self.tracks["xw"], self.tracks["yw"])
+        inside = np.isfinite(u) & np.isfinite(v) & (u >= 0) & (u < img_w) & (v >= 0) & (v < img_h)
+        idx = np.flatnonzero(inside)
+        t = self.tracks[idx]
+        det = detections.empty(len(idx))
+        det["cx"], det["cy"] = u[idx], v[idx]
+        det["w"], det["h"] = t["w"], t["h"]
+        det["conf"], det["cls"] = t["conf"], t["cls"]
+        det["xw"], det["yw"] = t["xw"], t["yw"]
+        det["frame_ts"] = frame_ts
+        return det, idx
+
+    @staticmethod
+    def verify(frame: np.ndarray, pred: np.ndarray, min_green: Optional[float] = None) -> np.ndarray:
+        """Günstige Bestätigung: Excess-Green-Anteil im (vergrößerten) Box-Ausschnitt je Vorhersage."""
+        if min_green is None:
+            min_green = float(getattr(config, "TRACK_VERIFY_MIN_GREEN", 0.05))
+        ok = np.zeros(len(pred), dtype=bool)
+        h, w = frame.shape[:2]
+        for i, (x1, y1, x2, y2, _, _) in enumerate(detections.to_xyxy(pred)):
+            pw, ph = 0.25 * (x2 - x1), 0.25 * (y2 - y1)
+            x1, y1 = max(0, int(x1 - pw)), max(0, int(y1 - ph))
+            x2, y2 = min(w, int(x2 + pw)), min(h, int(y2 + ph))
+            if x2 - x1 < 2 or y2 - y1 < 2:
+                continue
+            roi = frame[y1:y2, x1:x2]
+            mask = vegetation.excess_green_mask(roi, width=roi.shape[1])
+            ok[i] = np.count_nonzero(mask) >= min_green * mask.size
+        return ok
+
+    # ---- Zuordnung ----
+    def update(self, det: np.ndarray, full: bool = True) -> np.ndarray:
+        """Ordnet Detektionen (mit xw/yw) den Tracks zu und legt neue an. Rückgabe: Track-ID je Zeile."""
+        self.cycle_updated = True
+        self._cycles_since_full = 0 if full or self._cycles_since_full is None else self._cycles_since_full + 1
+        radius = float(getattr(config, "TRACK_MATCH_RADIUS_MM", 20.0))
+        ids = np.full(len(det), -1, dtype=np.int32)
+        matched = np.zeros(len(self.tracks), dtype=bool)
+        valid = np.isfinite(det["xw"]) & np.isfinite(det["yw"]) if len(det) else np.zeros(0, dtype=bool)
+        if len(self.tracks) and np.any(valid):
+            d2 = (det["xw"][:, None] - self.tracks["xw"][None, :]) ** 2 + (det["yw"][:, None] - self.tracks["yw"][None, :]) ** 2
+            for i in np.argsort(-det["conf"]):
+                if not valid[i]:
+                    continue
+                cand = np.where(matched, np.inf, d2[i])
+                j = int(np.argmin(cand))
+                if cand[j] <= radius * radius:
+                    matched[j] = True
+                    ids[i] = self.tracks["id"][j]
+                    t = self.tracks[j : j + 1]  # View, Zuweisungen wirken direkt
+                    t["xw"] = 0.5 * (t["xw"] + det["xw"][i])
+                    t["yw"] = 0.5 * (t["yw"] + det["yw"][i])
+                    t["w"], t["h"] = det["w"][i], det["h"][i]
+                    t["conf"], t["cls"] = det["conf"][i], det["cls"][i]
+                    t["hits"] += 1
+                    t["misses"] = 0
+                    t["last_ts"] = det["frame_ts"][i]
+        # Nicht bestätigte Tracks altern; zu oft verfehlte (z. B. weggebürstete) werden entfernt
+        self.tracks["misses"][~matched] += 1
+        keep = self.tracks["misses"] <= int(getattr(config, "TRACK_MAX_MISSES", 1))
+        self.tracks = self.tracks[keep]
+        new = np.flatnonzero(valid & (ids < 0))
+        if len(new):
+            t = np.zeros(len(new), dtype=TRACK_DTYPE)
+            t["id"] = np.arange(self._next_id, self._next_id + len(new))
+            self._next_id += len(new)
+            for f in ("xw", "yw", "w", "h", "conf", "cls"):
+                t[f] = det[f][new]
+            t["hits"] = 1
+            t["first_ts"] = t["last_ts"] = det["frame_ts"][new]
+            ids[new] = t["id"]
+            self.tracks = np.concatenate([self.tracks, t])
+        return ids
+
+
+def dedupe(base: np.ndarray, extra: np.ndarray, radius_mm: float) -> np.ndarray:
+    """Entfernt aus `extra` Detektionen, die näher als radius_mm an einer aus `base` liegen."""
+    if len(base) == 0 or len(extra) == 0:
+        return extra
+    d2 = (extra["xw"][:, None] - base["xw"][None, :]) ** 2 + (extra["yw"][:, None] - base["yw"][None, :]) ** 2
+    return extra[~np.any(d2 <= radius_mm * radius_mm, axis=1)]
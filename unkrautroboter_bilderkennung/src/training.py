@@ -1,10 +1,17 @@
 """
 Modul für das Training und die Bildaufnahme des Unkrautroboters.
+
+Aufnahmen laufen in einem Hintergrund-Thread (begrenzte Warteschlange), damit ein Joystick-Klick
+den UDP-Thread nie blockiert. Die nächste Bildnummer steht in TRAINING_IMAGE_DIR/.next_number
+und muss nicht bei jedem Klick aus allen vorhandenen Dateinamen ermittelt werden.
 """
 
 import os
 import glob
 import logging
+import queue
+import threading
+import time
 from . import config
 from . import config, camera
 
@@ -17,22 +24,94 @@ if not logging.getLogger().hasHandlers():
         datefmt="%H:%M:%S",
     )
 
+_COUNTER_FILE = ".next_number"
+_counter_lock = threading.Lock()
+_next_number = None
 
-def get_next_image_number():
-    """Ermittelt die nächste Bildnummer für das Training."""
-    if not os.path.exists(config.TRAINING_IMAGE_DIR):
-        os.makedirs(config.TRAINING_IMAGE_DIR)
+_capture_queue = queue.Queue(maxsize=int(getattr(config, "TRAINING_QUEUE_SIZE", 4)))
+_worker_thread = None
+_worker_lock = threading.Lock()
+stats = {"requested": 0, "dropped": 0, "saved": 0}
+
+
+def _scan_next_number():
+    """Ermittelt die nächste Bildnummer aus den vorhandenen Dateien (nur einmalig ohne Zähler-Datei)."""
     files = glob.glob(os.path.join(config.TRAINING_IMAGE_DIR, "bild_*.jpg"))
-    if not files:
-        return 1
-    numbers = [int(os.path.basename(f).split("_")[1].split(".")[0]) for f in files]
-    return max(numbers) + 1
+    numbers = []
+    for f in files:
+        try:
+            numbers.append(int(os.path.basename(f).split("_")[1].split(".")[0]))
+        except (IndexError, ValueError):
+            continue
+    return max(numbers) + 1 if numbers else 1
+
+
+def _store_counter(n):
+    path = os.path.join(config.TRAINING_IMAGE_DIR, _COUNTER_FILE)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(str(n))
+    os.replace(tmp, path)
+
+
+def get_next_image_number():
+    """Reserviert die nächste Bildnummer für das Training (O(1) über die Zähler-Datei)."""
+    global _next_number
+    with _counter_lock:
+        if not os.path.exists(config.TRAINING_IMAGE_DIR):
+            os.makedirs(config.TRAINING_IMAGE_DIR)
+        if _next_number is None:
+            try:
+                with open(os.path.join(config.TRAINING_IMAGE_DIR, _COUNTER_FILE), "r", encoding="utf-8") as f:
+                    _next_number = int(f.read().strip())
+            except (FileNotFoundError, ValueError):
+                _next_number = _scan_next_number()
+        n = _next_number
+        # Schutz gegen einen veralteten Zähler (z. B. Bilder von Hand hineinkopiert)
+        while os.path.exists(os.path.join(config.TRAINING_IMAGE_DIR, f"bild_{n:04d}.jpg")):
+            n += 1
+        _next_number = n + 1
+        _store_counter(_next_number)
+        return n
+
+
+def _capture_worker():
+    """Hintergrund-Thread: führt die angeforderten Aufnahmen (ggf. als Burst) nacheinander aus."""
+    while True:
+        count, interval = _capture_queue.get()
+        for i in range(count):
+            try:
+                t0 = time.time()
+                next_number = get_next_image_number()
+                filename = os.path.join(config.TRAINING_IMAGE_DIR, f"bild_{next_number:04d}.jpg")
+                if camera.capture_image(filename, undistort=False):
+                    stats["saved"] += 1
+                    logger.info(f"Bild gespeichert: {filename} ({i + 1}/{count})")
+                if i + 1 < count:
+                    time.sleep(max(0.0, interval - (time.time() - t0)))
+            except Exception as e:
+                logger.error(f"Trainingsbild konnte nicht gespeichert werden: {e}")
 
 
 def save_training_image():
-    """Nimmt ein Bild auf und speichert es im Trainingsverzeichnis (immer raw, ohne Undistortion)."""
+    """Fordert eine Aufnahme an (immer raw, ohne Undistortion) und kehrt sofort zurück.
+
+    Mit TRAINING_BURST_FRAMES > 1 werden pro Klick mehrere Bilder im Abstand
+    TRAINING_BURST_INTERVAL_S gespeichert. Ist die Warteschlange voll, wird der Klick verworfen.
+    """
+    global _worker_thread
     logger.info("Bild speichern....")
-    next_number = get_next_image_number()
-    filename = os.path.join(config.TRAINING_IMAGE_DIR, f"bild_{next_number:04d}.jpg")
-    camera.capture_image(filename, undistort=False)
-    logger.info(f"Bild gespeichert: {filename}")
+    with _worker_lock:
+        if _worker_thread is None or not _worker_thread.is_alive():
+            _worker_thread = threading.Thread(target=_capture_worker, name="training-capture", daemon=True)
+            _worker_thread.start()
+    count = max(1, int(getattr(config, "TRAINING_BURST_FRAMES", 1)))
+    interval = float(getattr(config, "TRAINING_BURST_INTERVAL_S", 0.3))
+    stats["requested"] += 1
+    try:
+        _capture_queue.put_nowait((count, interval))
+        return True
+    except queue.Full:
+        stats["dropped"] += 1
+        logger.warning(f"Aufnahme-Warteschlange voll – Klick verworfen ({stats['dropped']} verworfen)")
+        return False
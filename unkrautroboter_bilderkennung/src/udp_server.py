@@ -1,15 +1,22 @@
 """
 Modul für die UDP-Server-Funktionalität des Unkrautroboters.
+
+Alle UDP-Ports (Steuerung, Joystick, Heartbeat) werden von einer Ereignisschleife (selectors)
+in einem Thread bedient. Der Stream-Watchdog ist zeitgesteuert: die Schleife wacht genau zum
+Ablauf des Heartbeat-Timeouts auf, statt jede Sekunde nachzusehen. Langsame Aktionen (Moduswechsel,
+Kamera-Stream, Trainingsbild, Kalibrier-Taste, Neustart, Modellwechsel) laufen in einem eigenen
+Worker-Thread (in Eingangsreihenfolge), damit die Schleife nie blockiert.
 """
 
 import socket
+import selectors
 import subprocess
 import ipaddress
 import threading
 import time
 import logging
-from . import config
-from . import config, camera, training, robot_control
+from concurrent.futures import ThreadPoolExecutor
+from . import config, camera, training, robot_control, yolo_detector, joystick_protocol
 
 # Logger einrichten
 logger = logging.getLogger("udp_server")
@@ -25,147 +32,258 @@ on_mode_change = None
 on_command = None
 
 
+_allow_src = None  # Liste, aus der kompiliert wurde (Änderung → neu kompilieren)
+_allow_ips = frozenset()
+_allow_nets = ()
+_allow_cache = {}
+
+
+def _compile_allowlist(entries) -> None:
+    """ALLOWED_UDP_SOURCES einmalig in eine Menge von Adressen und eine Liste von Netzen übersetzen."""
+    global _allow_src, _allow_ips, _allow_nets, _allow_cache
+    ips, nets = set(), []
+    for entry in entries or ():
+        try:
+            if "/" in entry:
+                nets.append(ipaddress.ip_network(entry, strict=False))
+            else:
+                ips.add(ipaddress.ip_address(entry))
+        except Exception:
+            logger.warning(f"Ungültiger Eintrag in ALLOWED_UDP_SOURCES ignoriert: {entry}")
+    _allow_src, _allow_ips, _allow_nets, _allow_cache = entries, frozenset(ips), tuple(nets), {}
+
+
 def _is_source_allowed(src_ip_str: str) -> bool:
     """Prüft, ob eine Absender-IP gemäß ALLOWED_UDP_SOURCES zugelassen ist.
     Erlaubt einzelne IPs und CIDR-Netze. Bei leerer Liste: alles erlaubt.
-    Fehler beim Parsen führen nicht zur Ablehnung (fail-open, wie zuvor)."""
-    try:
-        if not getattr(config, "ALLOWED_UDP_SOURCES", None):
-            return True
-        src_ip = ipaddress.ip_address(src_ip_str)
-        for entry in config.ALLOWED_UDP_SOURCES:
-            try:
-                if "/" in entry:
-                    net = ipaddress.ip_network(entry, strict=False)
-                    if src_ip in net:
-                        return True
-                else:
-                    if src_ip == ipaddress.ip_address(entry):
-                        return True
-            except Exception:
-                continue
-        return False
-    except Exception:
+    Fehler beim Parsen führen nicht zur Ablehnung (fail-open, wie zuvor).
+    Ergebnis je Absender-IP wird gecacht."""
+    entries = getattr(config, "ALLOWED_UDP_SOURCES", None)
+    if not entries:
         return True
+    if entries is not _allow_src:
+        _compile_allowlist(entries)
+    ok = _allow_cache.get(src_ip_str)
+    if ok is None:
+        try:
+            src_ip = ipaddress.ip_address(src_ip_str)
+            ok = src_ip in _allow_ips or any(src_ip in net for net in _allow_nets)
+        except Exception:
+            ok = True
+        if len(_allow_cache) > 1024:
+            _allow_cache.clear()
+        _allow_cache[src_ip_str] = ok
+    return ok
 
 
 _last_heartbeat = 0
 _stream_running = False
+_executor = None  # Worker für langsame Aktionen (ein Thread → Reihenfolge bleibt erhalten, auch für die Moduseinrichtung)
+stats = {
+    name: {"packets": 0, "dropped": 0, "errors": 0}
+    for name in ("control", "joystick", "heartbeat")
+}
 
 
-# Funktion zum Sammeln der Statusdaten
+def get_udp_stats() -> dict:
+    """Paket-/Verwerfungszähler je Port."""
+    return {k: dict(v) for k, v in stats.items()}
 
 
-def start_control_server():
-    """Startet den UDP-Server für die Modussteuerung."""
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.bind((config.UDP_IP, config.UDP_CONTROL_PORT))
-    logger.info(f"UDP-Steuerkanal läuft auf Port {config.UDP_CONTROL_PORT}...")
+def _submit(fn, *args):
+    """Langsame Aktion im Worker-Thread ausführen (Fehler werden geloggt)."""
 
-    while True:
-        data, addr = sock.recvfrom(1024)
-        command = data.decode().strip().upper()
-        # Quell-IP prüfen
-        if not _is_source_allowed(addr[0]):
-            logger.warning(
-                f"Verwerfe Steuer-Befehl von nicht erlaubter Quelle: {addr[0]}"
-            )
-            continue
-        if command in ["AUTO", "MANUAL", "DISTORTION", "EXTRINSIK"]:
-            if on_mode_change:
-                on_mode_change(command)
-                logger.info(f"Modus auf {command} geändert (von {addr})")
-        elif command in ["RESET", "RESTART"]:
-            logger.warning(
-                f"RESET empfangen (von {addr}) – starte roboter.service neu..."
-            )
+    def run():
+        try:
+            fn(*args)
+        except Exception as e:
+            logger.error(f"Fehler bei UDP-Aktion {getattr(fn, '__name__', fn)}: {e}")
+
+    _executor.submit(run)
+
+
+def _restart_service():
+    # Nicht blockierend neu starten; -n erzwingt nicht-interaktiv (erfordert passende sudoers-Regel)
+    subprocess.Popen(
+        ["sudo", "-n", "systemctl", "restart", "roboter.service"]
+    )  # noqa: S603,S607
+
+
+def _promote_model(addr):
+    ok, msg = yolo_detector.promote_standby()
+    if ok:
+        logger.info(f"{msg} (von {addr})")
+    else:
+        logger.warning(f"PROMOTE_MODEL abgelehnt: {msg} (von {addr})")
+
+
+def _handle_control(sock, data, addr):
+    command = data.decode().strip().upper()
+    if command in ["AUTO", "MANUAL", "DISTORTION", "EXTRINSIK"]:
+        if on_mode_change:
+            # Modus und MODE:-Zeile sofort (nachfolgende Joystick-Pakete sehen schon den neuen Modus);
+            # Kamera-/Kalibrier-Einrichtung im Worker, damit die Schleife weiter Pakete bedient
             try:
-                # Nicht blockierend neu starten; -n erzwingt nicht-interaktiv (erfordert passende sudoers-Regel)
-                subprocess.Popen(
-                    ["sudo", "-n", "systemctl", "restart", "roboter.service"]
-                )  # noqa: S603,S607
+                setup = on_mode_change(command)
+                logger.info(f"Modus auf {command} geändert (von {addr})")
             except Exception as e:
-                logger.error(f"Fehler beim Neustart: {e}")
-        else:
-            logger.warning(f"Unbekannter Befehl: {command} (von {addr})")
+                logger.error(f"Moduswechsel auf {command} fehlgeschlagen (von {addr}): {e}")
+                setup = None
+            if callable(setup):
+                _submit(setup)
+    elif command in ["RESET", "RESTART"]:
+        logger.warning(
+            f"RESET empfangen (von {addr}) – starte roboter.service neu..."
+        )
+        _submit(_restart_service)
+    elif command == "PROMOTE_MODEL":
+        _submit(_promote_model, addr)
+    else:
+        logger.warning(f"Unbekannter Befehl: {command} (von {addr})")
 
 
-def start_joystick_server():
-    """Startet den UDP-Server für Joystick-Kommandos."""
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.bind((config.UDP_IP, config.UDP_JOYSTICK_PORT))
-    logger.info(f"UDP-Joystick-Server läuft auf Port {config.UDP_JOYSTICK_PORT}...")
-
-    while True:
-        data, addr = sock.recvfrom(1024)
-        # Quell-IP prüfen
-        if not _is_source_allowed(addr[0]):
-            logger.warning(
-                f"Verwerfe Joystick-Befehl von nicht erlaubter Quelle: {addr[0]}"
+def _dispatch_joystick(command, addr, click):
+    """Gibt ein Joystick-Kommando an on_command weiter; click = Taste 1 wurde gedrückt."""
+    if not on_command:
+        return
+    handled = on_command(command)
+    if handled:
+        logger.debug(f"Joystick-Befehl empfangen und verarbeitet: {command} (von {addr})")
+        # BUTTON (B=1): je nach Modus
+        if click:
+            mode = (
+                robot_control.robot.get_mode()
+                if hasattr(robot_control, "robot")
+                else None
             )
-            continue
-        command = data.decode().strip()
-        if on_command:
-            handled = on_command(command)
-            if handled:
-                logger.debug(
-                    f"Joystick-Befehl empfangen und verarbeitet: {command} (von {addr})"
-                )
-                # BUTTON (B=1): je nach Modus
-                if ",B=1" in command:
-                    mode = (
-                        robot_control.robot.get_mode()
-                        if hasattr(robot_control, "robot")
-                        else None
-                    )
-                    if mode == "MANUAL":
-                        training.save_training_image()
-                    elif mode == "DISTORTION":
-                        robot_control.robot.calibration_button_pressed()
-                    elif mode == "EXTRINSIK":
-                        robot_control.robot.extrinsic_button_pressed()
-            else:
-                logger.debug(f"Joystick-Befehl ignoriert (von {addr})")
+            if mode == "MANUAL":
+                _submit(training.save_training_image)
+            elif mode == "DISTORTION":
+                _submit(robot_control.robot.calibration_button_pressed)
+            elif mode == "EXTRINSIK":
+                _submit(robot_control.robot.extrinsic_button_pressed)
+    else:
+        logger.debug(f"Joystick-Befehl ignoriert (von {addr})")
 
 
-# Heartbeat-Listener für den Videostream
-def _heartbeat_listener():
-    global _last_heartbeat
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.bind((config.UDP_IP, config.UDP_HEARTBEAT_PORT))
-    logger.info(f"UDP-Heartbeat-Server läuft auf Port {config.UDP_HEARTBEAT_PORT}...")
-    while True:
-        try:
-            data, addr = sock.recvfrom(1024)
-            _last_heartbeat = time.time()
-            logger.debug(f"Heartbeat empfangen von {addr}")
-        except Exception as e:
-            logger.error(f"Fehler im Heartbeat-Listener: {e}")
-            time.sleep(1)
+_joystick_filter = joystick_protocol.SequenceFilter()
 
 
-# Watchdog für den Videostream basierend auf Heartbeat
-def _stream_watchdog():
-    global _last_heartbeat, _stream_running
-    while True:
-        now = time.time()
-        if now - _last_heartbeat < config.HEARTBEAT_TIMEOUT:
-            if not _stream_running:
-                logger.info("Starte Videostream (Heartbeat aktiv)")
-                camera.start_stream()
-                _stream_running = True
-        else:
-            if _stream_running:
-                logger.warning("Stoppe Videostream (kein Heartbeat)")
-                camera.stop_stream()
-                _stream_running = False
-        time.sleep(1)
-
-
-def start_heartbeat_monitor():
-    """Startet Heartbeat-UDP-Listener und Watchdog für den Videostream."""
+def get_joystick_stats():
+    return dict(_joystick_filter.stats)
+
+
+def _handle_binary_joystick(sock, data, addr):
+    p = joystick_protocol.decode(data)
+    if p is None:
+        logger.warning(f"Ungültiges Joystick-Datagramm ({len(data)} Byte) von {addr[0]}")
+        return
+    if p.type == joystick_protocol.TYPE_PING:
+        # Latenzmessung: Paket unverändert (mit Zeitstempel des Absenders) als PONG zurück
+        sock.sendto(joystick_protocol.encode(p._replace(type=joystick_protocol.TYPE_PONG)), addr)
+        return
+    if p.type != joystick_protocol.TYPE_STATE:
+        return
+    sessions = _joystick_filter.stats["sessions"]
+    ok, clicks = _joystick_filter.accept(addr, p)
+    if _joystick_filter.stats["sessions"] != sessions:
+        logger.info(f"Neue Joystick-Session {p.session:08x} von {addr[0]}")
+    if not ok:
+        return  # veraltet oder umsortiert
+    command = f"JOYSTICK:X={p.x},Y={p.y}"
+    if p.buttons & joystick_protocol.BUTTON_3:
+        command += ",B=3"
+    _dispatch_joystick(command, addr, clicks > 0)
+
+
+def _handle_joystick(sock, data, addr):
+    if joystick_protocol.is_binary(data):
+        _handle_binary_joystick(sock, data, addr)
+        return
+    command = data.decode().strip()
+    _dispatch_joystick(command, addr, ",B=1" in command)
+
+
+# Heartbeat für den Videostream
+def _handle_heartbeat(sock, data, addr):
     global _last_heartbeat, _stream_running
+    _last_heartbeat = time.monotonic()
+    logger.debug(f"Heartbeat empfangen von {addr}")
+    if not _stream_running:
+        logger.info("Starte Videostream (Heartbeat aktiv)")
+        _submit(camera.start_stream)
+        _stream_running = True
+
+
+def _expire_heartbeat(now):
+    """Stoppt den Stream nach Ablauf des Heartbeats. Rückgabe: Sekunden bis zur nächsten Prüfung (None = keine)."""
+    global _stream_running
+    if not _stream_running:
+        return None
+    left = _last_heartbeat + config.HEARTBEAT_TIMEOUT - now
+    if left > 0:
+        return left
+    logger.warning("Stoppe Videostream (kein Heartbeat)")
+    _submit(camera.stop_stream)
+    _stream_running = False
+    return None
+
+
+def _open(port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((config.UDP_IP, port))
+    sock.setblocking(False)
+    return sock
+
+
+def serve_forever():
+    """Ereignisschleife für alle UDP-Ports (blockiert; im eigenen Thread starten)."""
+    global _executor, _last_heartbeat, _stream_running
     _last_heartbeat = 0
     _stream_running = False
-    threading.Thread(target=_heartbeat_listener, daemon=True).start()
-    threading.Thread(target=_stream_watchdog, daemon=True).start()
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="udp-action")
+    _compile_allowlist(getattr(config, "ALLOWED_UDP_SOURCES", None))
+    sel = selectors.DefaultSelector()
+    ports = (
+        ("control", config.UDP_CONTROL_PORT, _handle_control, "Steuer-Befehl", "UDP-Steuerkanal"),
+        ("joystick", config.UDP_JOYSTICK_PORT, _handle_joystick, "Joystick-Befehl", "UDP-Joystick-Server"),
+        ("heartbeat", config.UDP_HEARTBEAT_PORT, _handle_heartbeat, None, "UDP-Heartbeat-Server"),
+    )
+    for name, port, handler, what, title in ports:
+        sel.register(_open(port), selectors.EVENT_READ, (name, handler, what))
+        logger.info(f"{title} läuft auf Port {port}...")
+
+    while True:
+        timeout = _expire_heartbeat(time.monotonic())
+        for key, _ in sel.select(timeout):
+            name, handler, what = key.data
+            st = stats[name]
+            # Alle anstehenden Datagramme dieses Sockets abarbeiten
+            while True:
+                try:
+                    data, addr = key.fileobj.recvfrom(1024)
+                except (BlockingIOError, InterruptedError):
+                    break
+                except OSError as e:
+                    st["errors"] += 1
+                    logger.error(f"Fehler beim Empfang auf Port {name}: {e}")
+                    break
+                st["packets"] += 1
+                # Quell-IP prüfen (Heartbeat wie bisher ohne Prüfung)
+                if what is not None and not _is_source_allowed(addr[0]):
+                    st["dropped"] += 1
+                    logger.warning(f"Verwerfe {what} von nicht erlaubter Quelle: {addr[0]}")
+                    continue
+                try:
+                    handler(key.fileobj, data, addr)
+                except Exception as e:
+                    st["errors"] += 1
+                    logger.error(f"Fehler bei {name}-Paket von {addr[0]}: {e}")
+
+
+def start():
+    """Startet die UDP-Ereignisschleife (Steuerung, Joystick, Heartbeat) im Hintergrund."""
+    t = threading.Thread(target=serve_forever, name="udp-server", daemon=True)
+    t.start()
+    return t
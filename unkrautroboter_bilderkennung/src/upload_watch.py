@@ -0,0 +1,96 @@
+"""
+Überwachung des Upload-Verzeichnisses (Firmware-.hex) ohne ständiges iterdir().
+
+Unter Linux meldet inotify (per ctypes, keine Zusatzpakete) fertig geschriebene oder
+hineinverschobene Dateien sofort. Ohne inotify (oder solange das Verzeichnis fehlt) wird
+alle UPLOAD_SCAN_INTERVAL_S Sekunden nachgesehen. Gefundene Dateien werden nur gemeldet
+(Callback); geflasht wird in der Hauptschleife.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+from . import config
+
+logger = logging.getLogger("upload_watch")
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_DELETE_SELF = 0x00000400
+_IN_IGNORED = 0x00008000
+_EVENT = struct.Struct("iIII")
+
+
+def _inotify_open(path: str):
+    """inotify-FD auf path (oder None, wenn nicht verfügbar)."""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = libc.inotify_init1(os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        wd = libc.inotify_add_watch(fd, os.fsencode(path), _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_DELETE_SELF)
+        if wd < 0:
+            os.close(fd)
+            return None
+        return fd
+    except Exception:
+        return None
+
+
+def has_files(path: Path, suffix: str) -> bool:
+    try:
+        return any(p.suffix.lower() == suffix for p in path.iterdir())
+    except FileNotFoundError:
+        return False
+
+
+def _watch(path: Path, suffix: str, on_file: Callable[[], None]) -> None:
+    interval = float(getattr(config, "UPLOAD_SCAN_INTERVAL_S", 5.0))
+    while True:
+        fd = _inotify_open(str(path)) if path.is_dir() else None
+        if fd is None:
+            # Fallback: langsamer Scan (auch solange das Verzeichnis noch nicht existiert)
+            if has_files(path, suffix):
+                on_file()
+            time.sleep(interval)
+            continue
+        logger.info(f"Überwache {path} per inotify")
+        failed = False
+        try:
+            # Vor dem Start abgelegte Dateien nicht übersehen
+            if has_files(path, suffix):
+                on_file()
+            alive = True
+            while alive:
+                buf = os.read(fd, 4096)
+                off = 0
+                while off + _EVENT.size <= len(buf):
+                    _, mask, _, name_len = _EVENT.unpack_from(buf, off)
+                    name = buf[off + _EVENT.size : off + _EVENT.size + name_len].rstrip(b"\0")
+                    off += _EVENT.size + name_len
+                    if mask & (_IN_DELETE_SELF | _IN_IGNORED):
+                        alive = False  # Verzeichnis gelöscht → neu aufsetzen
+                    elif os.fsdecode(name).lower().endswith(suffix):
+                        on_file()
+        except Exception as e:
+            logger.warning(f"inotify für {path} beendet: {e}")
+            failed = True
+        finally:
+            os.close(fd)
+        if failed:
+            # Nach einem Fehler (read/on_file) nicht sofort neu aufsetzen – sonst Endlosschleife mit Log-Flut
+            time.sleep(interval)
+
+
+def start(path, on_file: Callable[[], None], suffix: str = ".hex") -> threading.Thread:
+    """Startet die Überwachung im Hintergrund; on_file() wird bei jeder neuen passenden Datei aufgerufen."""
+    t = threading.Thread(target=_watch, args=(Path(path), suffix.lower(), on_file), name="upload-watch", daemon=True)
+    t.start()
+    return t
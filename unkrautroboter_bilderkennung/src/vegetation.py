@@ -0,0 +1,84 @@
+"""
+Schneller Vegetations-Vorfilter (Excess-Green-Index) vor der YOLO-Inferenz.
+
+Auf blankem Pflaster lohnt sich keine volle Inferenz. Der Vorfilter berechnet auf einem
+verkleinerten Bild ExG = 2G - R - B und den Anteil "grüner" Pixel. Liegt der Anteil unter
+VEG_MIN_FRACTION, kann GETXY ohne Inferenz beantwortet werden. Zusätzlich liefert er die
+Bounding-Boxen der grünen Flecken (in Vollbild-Pixeln) als Crop-Hinweise für den Detektor.
+
+Nur NumPy/OpenCV – keine Projekt-Abhängigkeiten, damit auch Offline-Tools das Modul nutzen können.
+"""
+
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from . import config
+
+
+def _params():
+    return (
+        int(getattr(config, "VEG_DOWNSCALE_WIDTH", 160)),
+        float(getattr(config, "VEG_EXG_THRESHOLD", 20.0)),
+        float(getattr(config, "VEG_MIN_FRACTION", 0.002)),
+    )
+
+
+def excess_green_mask(bgr: np.ndarray, width: Optional[int] = None, exg_threshold: Optional[float] = None) -> np.ndarray:
+    """Binärmaske (uint8, 0/255) der Pixel mit ExG > Schwelle auf dem auf `width` verkleinerten Bild."""
+    w_def, thr_def, _ = _params()
+    width = width or w_def
+    thr = exg_threshold if exg_threshold is not None else thr_def
+    h0, w0 = bgr.shape[:2]
+    if w0 > width:
+        small = cv2.resize(bgr, (width, max(1, int(round(h0 * width / float(w0))))), interpolation=cv2.INTER_AREA)
+    else:
+        small = bgr
+    b, g, r = cv2.split(small.astype(np.int16))
+    exg = 2 * g - r - b
+    return np.where(exg > thr, 255, 0).astype(np.uint8)
+
+
+def green_rois(mask: np.ndarray, full_size: Tuple[int, int], min_area_px: int = 4, pad_px: int = 16) -> List[Tuple[int, int, int, int]]:
+    """Bounding-Boxen (x1,y1,x2,y2) der grünen Flecken, skaliert auf full_size=(W,H) und um pad_px erweitert."""
+    W, H = full_size
+    sx = W / float(mask.shape[1])
+    sy = H / float(mask.shape[0])
+    n, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    rois = []
+    for i in range(1, n):
+        x, y, w, h, area = stats[i]
+        if area < min_area_px:
+            continue
+        x1 = max(0, int(x * sx) - pad_px)
+        y1 = max(0, int(y * sy) - pad_px)
+        x2 = min(W, int((x + w) * sx) + pad_px)
+        y2 = min(H, int((y + h) * sy) + pad_px)
+        rois.append((x1, y1, x2, y2))
+    return rois
+
+
+def union_roi(rois: List[Tuple[int, int, int, int]]) -> Optional[Tuple[int, int, int, int]]:
+    """Umschließendes Rechteck aller ROIs (oder None)."""
+    if not rois:
+        return None
+    a = np.asarray(rois)
+    return int(a[:, 0].min()), int(a[:, 1].min()), int(a[:, 2].max()), int(a[:, 3].max())
+
+
+def prefilter(bgr: np.ndarray, min_fraction: Optional[float] = None):
+    """Bewertet ein BGR-Bild.
+
+    Rückgabe: (has_vegetation, fraction, rois)
+    - has_vegetation: False, wenn der Grünanteil unter min_fraction liegt (Inferenz kann entfallen)
+    - fraction: Anteil grüner Pixel (0..1) im verkleinerten Bild
+    - rois: Liste (x1,y1,x2,y2) grüner Flecken in Vollbild-Pixeln
+    """
+    _, _, min_def = _params()
+    min_fraction = min_def if min_fraction is None else min_fraction
+    mask = excess_green_mask(bgr)
+    fraction = float(np.count_nonzero(mask)) / float(mask.size)
+    h, w = bgr.shape[:2]
+    rois = green_rois(mask, (w, h), pad_px=int(getattr(config, "VEG_ROI_PAD_PX", 32))) if fraction > 0 else []
+    return fraction >= min_fraction, fraction, rois
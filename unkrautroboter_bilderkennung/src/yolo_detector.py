@@ -2,23 +2,102 @@
 Modul für die YOLO-Integration des Unkrautroboters.
 """
 
-from . import config, camera
+from . import config, camera, detections
 import cv2
+import json
 import logging
 import os
+import http.client
+import urllib.parse
 import multiprocessing as mp
 import numpy as np
+import queue
+import threading
 import time
-import shutil
 
 # Logger einrichten
 logger = logging.getLogger("yolo_detector")
 if not logging.getLogger().hasHandlers():
     logging.basicConfig(level=getattr(config, 'LOGLEVEL', logging.INFO), format='[%(asctime)s] %(levelname)s: %(message)s', datefmt='%H:%M:%S')
 
+# Zuletzt per PROMOTE_MODEL übernommene Gewichte (überlebt einen Neustart von roboter.service)
+_STATE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "state"))
+_ACTIVE_MODEL_FILE = os.path.join(_STATE_DIR, "active_model.txt")
+
+
+def _load_promoted_weights():
+    try:
+        with open(_ACTIVE_MODEL_FILE, "r", encoding="utf-8") as f:
+            path = f.read().strip()
+        return path if path and os.path.isfile(path) else None
+    except Exception:
+        return None
+
+
+_registry_tag = None
+
+
+def _runtime_supports(fmt):
+    if fmt == 'pt':
+        return True
+    if fmt == 'onnx':
+        try:
+            import onnxruntime  # noqa: F401
+            return True
+        except Exception:
+            return False
+    if fmt == 'openvino':
+        try:
+            import openvino  # noqa: F401
+            return True
+        except Exception:
+            return False
+    return False
+
+
+def _registry_weights():
+    """Gewichte aus der Modell-Registry (YOLO_REGISTRY_DIR/<YOLO_MODEL_TAG>/meta.json).
+
+    Unter den exportierten Formaten wird das mit der geringsten Referenz-Latenz gewählt,
+    das die Laufzeitumgebung unterstützt (ONNX nur mit onnxruntime und passender Netzgröße).
+    """
+    global _registry_tag
+    tag = getattr(config, 'YOLO_MODEL_TAG', None)
+    if not tag:
+        return None
+    entry = os.path.join(getattr(config, 'YOLO_REGISTRY_DIR', './model/registry/'), tag)
+    try:
+        with open(os.path.join(entry, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except Exception as e:
+        logger.error(f"[YOLO] Registry-Eintrag {tag} nicht lesbar: {e}")
+        return None
+    formats = meta.get('formats') or {}
+    latency = meta.get('latency_ms_cpu1') or {}
+    imgsz = getattr(config, 'YOLO_IMG_SIZE', 640)
+    fixed_size_ok = not isinstance(imgsz, (list, tuple)) and int(imgsz) == int((meta.get('train') or {}).get('imgsz', imgsz))
+    candidates = []
+    for fmt, name in formats.items():
+        path = os.path.join(entry, name)
+        if not os.path.exists(path) or not _runtime_supports(fmt):
+            continue
+        if fmt != 'pt' and not fixed_size_ok:
+            # Exporte haben eine feste Eingangsgröße
+            continue
+        candidates.append((latency.get(fmt, float('inf')), fmt, path))
+    if not candidates:
+        logger.error(f"[YOLO] Registry-Eintrag {tag}: kein nutzbares Format in {list(formats)}")
+        return None
+    candidates.sort()
+    lat, fmt, path = candidates[0]
+    _registry_tag = tag
+    logger.info(f"[YOLO] Registry {tag}: Format {fmt} ({lat} ms Referenz), Datensatz {str((meta.get('dataset') or {}).get('manifest_hash', ''))[:12]}")
+    return path
+
+
 if not config.USE_DUMMY:
     from ultralytics import YOLO
-    _weights = getattr(config, 'YOLO_MODEL_PATH', 'best.pt')
+    _weights = _load_promoted_weights() or _registry_weights() or getattr(config, 'YOLO_MODEL_PATH', 'best.pt')
     _weights_abs = None
     model = None
     try:
@@ -40,7 +119,6 @@ if not config.USE_DUMMY:
 
 # Globale Maxima für Ressourcenverbrauch (über Laufzeit)
 _PEAK_RSS_KB = 0
-_PEAK_TMP_USED_BYTES = 0
 
 # Multiprocessing-Startmethode festlegen
 # Hinweis: Auf Linux bevorzugen wir 'fork', um einen Re-Import von main und damit
@@ -56,12 +134,13 @@ except RuntimeError:
     # Bereits gesetzt – ignorieren
     pass
 
-def _mp_predict_worker(queue, image_path, weights, device, imgsz, conf, iou, use_parent_model=False):
-    """Subprozess-Worker: Lädt YOLO, führt Inferenz aus und gibt (coords, annotated_jpeg_path) zurück.
+def _mp_predict_worker(queue, source, weights, device, imgsz, conf, iou, parent_model=None, frame_ts=0.0):
+    """Subprozess-Worker: Lädt YOLO, führt Inferenz aus und gibt ein Detektions-Array zurück
+    (bzw. eine Liste von Arrays, wenn source eine Bildliste und frame_ts eine Liste ist).
 
-    Wichtiger Hinweis: Um Deadlocks aufgrund begrenzter Pipe-Puffer zu vermeiden, wird die annotierte
-    Vorschau nicht über die Queue (Bytes) übertragen, sondern in eine temporäre Datei geschrieben und
-    nur der Dateipfad übergeben.
+    Die annotierte Vorschau wird hier bewusst NICHT erzeugt (kein plot(), kein JPEG-Encode),
+    damit die Koordinaten so früh wie möglich beim Aufrufer sind. Die Vorschau zeichnet
+    anschließend die Hintergrund-Stufe (_preview_worker) aus dem zurückgegebenen Array.
     """
     try:
         # Threads drosseln, um Stabilität zu erhöhen
@@ -77,74 +156,27 @@ def _mp_predict_worker(queue, image_path, weights, device, imgsz, conf, iou, use
                 _torch.set_num_interop_threads(1)
         except Exception:
             pass
-        # WICHTIG: Nur Ultralytics und OpenCV importieren; keine Projekt-Module importieren,
+        # WICHTIG: Nur Ultralytics importieren; keine Projekt-Module importieren,
         # damit der Kindprozess keine Kamera initialisiert o. Ä.
         mdl = None
-        if use_parent_model and ('model' in globals()) and (globals().get('model') is not None):
+        if parent_model is not None:
             # Unter 'fork' können wir das bereits geladene Modell nutzen (schneller, da kein Reload)
-            mdl = globals().get('model')
+            mdl = parent_model
         else:
             from ultralytics import YOLO as _YOLO
             mdl = _YOLO(weights)
-        import cv2 as _cv2
         # Vorhersage ausführen
-        res = mdl.predict(source=image_path, device=device, imgsz=imgsz, conf=conf, iou=iou, verbose=False, stream=False, save=False, workers=0)
-        coords = []
-        try:
-            for r in res:
-                # Direkt über den xywh-Tensor iterieren (Nx4: x,y,w,h)
-                if hasattr(r, 'boxes') and hasattr(r.boxes, 'xywh') and r.boxes.xywh is not None:
-                    for xywh in r.boxes.xywh:
-                        try:
-                            x_center = float(xywh[0].item())
-                            y_center = float(xywh[1].item())
-                            coords.append((x_center, y_center))
-                        except Exception:
-                            continue
-        except Exception:
-            coords = []
-        annotated_path = None
-        ann_size = None
-        tmp_used_after = None
-        tmp_total = None
+        res = mdl.predict(source=source, device=device, imgsz=imgsz, conf=conf, iou=iou, verbose=False, stream=False, save=False, workers=0)
+        # Batch (Liste von Bildern): ein Detektions-Array pro Bild
+        if isinstance(frame_ts, (list, tuple)):
+            det = [extract_detections([r], ts) for r, ts in zip(res, frame_ts)]
+        else:
+            det = extract_detections(res, frame_ts)
+        names = None
         try:
-            if res and len(res) > 0:
-                ann = res[0].plot()
-                if ann is not None:
-                    if ann.ndim == 3 and ann.shape[2] == 4:
-                        ann = _cv2.cvtColor(ann, _cv2.COLOR_RGBA2BGR)
-                    import tempfile as _tmp
-                    import os as _os2
-                    # In temporäre Datei schreiben
-                    fd, tmppath = _tmp.mkstemp(prefix="yolo_ann_", suffix=".jpg")
-                    try:
-                        _os2.close(fd)
-                        ok = _cv2.imwrite(tmppath, ann, [int(_cv2.IMWRITE_JPEG_QUALITY), 85])
-                        if ok:
-                            annotated_path = tmppath
-                            try:
-                                ann_size = _os2.path.getsize(tmppath)
-                            except Exception:
-                                ann_size = None
-                            try:
-                                du = shutil.disk_usage('/tmp')
-                                tmp_used_after = du.used
-                                tmp_total = du.total
-                            except Exception:
-                                tmp_used_after = None
-                                tmp_total = None
-                        else:
-                            try:
-                                _os2.remove(tmppath)
-                            except Exception:
-                                pass
-                    except Exception:
-                        try:
-                            _os2.remove(tmppath)
-                        except Exception:
-                            pass
+            names = dict(getattr(mdl, 'names', None) or {})
         except Exception:
-            annotated_path = None
+            names = None
         # Peak-RAM erfassen (nur Unix): ru_maxrss in KB
         mem_peak_kb = None
         try:
@@ -154,173 +186,674 @@ def _mp_predict_worker(queue, image_path, weights, device, imgsz, conf, iou, use
             mem_peak_kb = None
         # Ergebnisse als Dict zurückgeben
         queue.put({
-            'coords': coords,
-            'ann_path': annotated_path,
+            'det': det,
+            'names': names,
             'mem_peak_kb': mem_peak_kb,
-            'tmp_used': tmp_used_after,
-            'tmp_total': tmp_total,
-            'ann_size': ann_size,
         })
     except Exception:
         # Bei Fehlern leeres Ergebnis zurückgeben
         try:
-            queue.put(([], None))
+            queue.put({'det': None, 'names': None, 'mem_peak_kb': None})
         except Exception:
             pass
     # Optional: Threads/Resourcen-Logging (unterdrückt, um Rauschen zu vermeiden)
 
-def extract_xy(results):
-    """Extrahiert die Koordinaten aus den YOLO-Ergebnissen robust aus dem xywh-Tensor."""
+
+# ==== Annotierte Vorschau (Hintergrund-Stufe, niedrige Priorität) ====
+# Es wird immer nur die neueste Vorschau gezeichnet (maxsize=1, ältere Aufträge werden verworfen).
+_preview_queue = queue.Queue(maxsize=1)
+_preview_thread = None
+_preview_thread_lock = threading.Lock()
+
+
+def _preview_worker():
+    """Hintergrund-Thread: zeichnet Boxen und veröffentlicht das JPEG unter /last_capture."""
+    # Thread-Priorität senken (Linux: setpriority wirkt auf die native Thread-ID)
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+    except Exception:
+        pass
+    while True:
+        img, det, names = _preview_queue.get()
+        try:
+            t0 = time.time()
+            ann = detections.draw_boxes(img, det, names)
+            camera._encode_and_store_last_capture(ann, quality=85)
+            logger.debug(f"[YOLO] Vorschau aktualisiert in {(time.time() - t0) * 1000.0:.0f}ms")
+        except Exception as e:
+            logger.warning(f"[YOLO] Vorschau konnte nicht erzeugt werden: {e}")
+
+
+def _schedule_preview(img, det, names=None):
+    """Übergibt Bild + Detektionen an die Vorschau-Stufe. Blockiert nie; ältere Aufträge werden ersetzt."""
+    global _preview_thread
+    if img is None:
+        return
+    with _preview_thread_lock:
+        if _preview_thread is None or not _preview_thread.is_alive():
+            _preview_thread = threading.Thread(target=_preview_worker, name="yolo-preview", daemon=True)
+            _preview_thread.start()
+    try:
+        _preview_queue.get_nowait()
+    except queue.Empty:
+        pass
+    try:
+        _preview_queue.put_nowait((img, det, names))
+    except queue.Full:
+        pass
+
+
+# ==== Eigene Vorverarbeitung (Letterbox direkt in einen vorab allokierten Eingabetensor) ====
+class _Letterbox:
+    """Letterbox + BGR→RGB/CHW/float32 in wiederverwendete Puffer.
+
+    Skalierung und Rand werden pro Eingabegröße (h, w) einmal berechnet und gecacht; der
+    uint8-Letterbox-Puffer und der float32-Eingabetensor (N,3,H,W) werden nur neu angelegt,
+    wenn sich Netz- oder Batchgröße ändern. Ultralytics bekommt den fertigen Tensor und
+    überspringt damit Datei-Lesen, Formaterkennung und eigenes Letterboxing.
+    Nur vom GETXY-Pfad verwendet (ein Aufruf gleichzeitig); der Schattenbetrieb nutzt ihn nicht.
+    """
+
+    PAD_VALUE = 114
+    MAX_CACHED_SIZES = 4  # Crop-Hinweise erzeugen wechselnde Größen; Vollbild ist konstant
+
+    def __init__(self, stride=32):
+        self.stride = int(stride)
+        self._net_hw = None
+        self._params = {}  # (h, w) -> (scale, left, top, new_w, new_h, canvas, resized)
+        self._tensor = None
+        self._torch = None
+
+    def _net_size(self, imgsz):
+        if isinstance(imgsz, (list, tuple)):
+            h, w = int(imgsz[0]), int(imgsz[-1])
+        else:
+            h = w = int(imgsz)
+        # Auf Vielfache des Modell-Strides aufrunden (Ultralytics verlangt das für Tensor-Eingaben)
+        s = self.stride
+        return (h + s - 1) // s * s, (w + s - 1) // s * s
+
+    def _get_params(self, h, w, net_hw, auto):
+        """auto=True: Rand nur bis zum nächsten Stride-Vielfachen (wie Ultralytics LetterBox(auto=True)),
+        also z. B. 1280x720 → 640x384 statt 640x640; auto=False: volles quadratisches Netzformat."""
+        if self._net_hw != net_hw:
+            self._params.clear()
+            self._tensor = None
+            self._net_hw = net_hw
+        entry = self._params.get((h, w, auto))
+        if entry is None:
+            nh_net, nw_net = net_hw
+            scale = min(nh_net / float(h), nw_net / float(w))
+            new_w, new_h = int(round(w * scale)), int(round(h * scale))
+            if auto:
+                s = self.stride
+                nh_net, nw_net = (new_h + s - 1) // s * s, (new_w + s - 1) // s * s
+            left, top = (nw_net - new_w) // 2, (nh_net - new_h) // 2
+            canvas = np.full((nh_net, nw_net, 3), self.PAD_VALUE, dtype=np.uint8)
+            resized = np.empty((new_h, new_w, 3), dtype=np.uint8)
+            if len(self._params) >= self.MAX_CACHED_SIZES:
+                self._params.pop(next(iter(self._params)))
+            entry = (scale, left, top, new_w, new_h, canvas, resized)
+            self._params[(h, w, auto)] = entry
+        return entry
+
+    def prepare(self, frames, imgsz, rect=True):
+        """Füllt den Eingabetensor mit den letterboxten Bildern. Rückgabe: (torch-Tensor, Parameter je Bild).
+
+        rect=False erzwingt das volle Netzformat (Exporte wie ONNX haben eine feste Eingabegröße).
+        """
+        if self._torch is None:
+            import torch
+            self._torch = torch
+        net_hw = self._net_size(imgsz)
+        n = len(frames)
+        # Rechteckiges Minimalformat nur für PyTorch-Gewichte und gleich große Bilder (ein Tensor für den Batch)
+        auto = rect and len({bgr.shape[:2] for bgr in frames}) == 1
+        entries = [self._get_params(bgr.shape[0], bgr.shape[1], net_hw, auto) for bgr in frames]
+        in_hw = entries[0][5].shape[:2]
+        if self._tensor is None or self._tensor.shape[0] < n or self._tensor.shape[2:] != in_hw:
+            self._tensor = np.empty((n, 3) + in_hw, dtype=np.float32)
+        params = []
+        for i, (bgr, (scale, left, top, new_w, new_h, canvas, resized)) in enumerate(zip(frames, entries)):
+            h, w = bgr.shape[:2]
+            if (new_w, new_h) == (w, h):
+                canvas[top:top + new_h, left:left + new_w] = bgr
+            else:
+                cv2.resize(bgr, (new_w, new_h), dst=resized, interpolation=cv2.INTER_LINEAR)
+                canvas[top:top + new_h, left:left + new_w] = resized
+            # BGR→RGB, HWC→CHW, 0..255→0..1 in einem Schritt in den vorhandenen Tensor
+            np.multiply(canvas[..., ::-1].transpose(2, 0, 1), np.float32(1.0 / 255.0), out=self._tensor[i], casting='unsafe')
+            params.append((scale, left, top, w, h))
+        return self._torch.from_numpy(self._tensor[:n]), params
+
+    @staticmethod
+    def unmap(det, param):
+        """Rechnet Box-Koordinaten vom Netz-Eingang zurück ins Originalbild (in place, auf das Bild begrenzt)."""
+        scale, left, top, w, h = param
+        if det is None or len(det) == 0:
+            return det
+        cx = (det['cx'] - left) / scale
+        cy = (det['cy'] - top) / scale
+        hw, hh = det['w'] / (2 * scale), det['h'] / (2 * scale)
+        x1, x2 = np.clip(cx - hw, 0, w), np.clip(cx + hw, 0, w)
+        y1, y2 = np.clip(cy - hh, 0, h), np.clip(cy + hh, 0, h)
+        det['cx'], det['cy'] = (x1 + x2) / 2, (y1 + y2) / 2
+        det['w'], det['h'] = x2 - x1, y2 - y1
+        return det
+
+
+_letterbox = _Letterbox()
+
+
+def _own_preprocess_active():
+    return bool(getattr(config, 'YOLO_OWN_PREPROCESS', False))
+
+
+def _infer_frames(frames, frame_ts_list):
+    """Inferenz über BGR-Bilder mit eigener Vorverarbeitung (Fallback: Ultralytics-Pfad).
+
+    Rückgabe: (Liste von Detektions-Arrays, names) bzw. (None, None) bei Fehler.
+    """
+    if _own_preprocess_active():
+        try:
+            imgsz = getattr(config, 'YOLO_IMG_SIZE', 640)
+            # Wie Ultralytics: auto-Padding nur für .pt, exportierte Formate (ONNX, ...) erwarten imgsz x imgsz
+            rect = str(_active_slot()[1] or '').lower().endswith('.pt')
+            tensor, params = _letterbox.prepare(frames, imgsz, rect=rect)
+        except Exception as e:
+            logger.warning(f"[YOLO] Eigene Vorverarbeitung fehlgeschlagen ({e}) – nutze Ultralytics-Pfad")
+        else:
+            dets, names = _run_inference(tensor, list(frame_ts_list))
+            if dets is None or len(dets) != len(frames):
+                return None, None
+            return [_Letterbox.unmap(d, prm) for d, prm in zip(dets, params)], names
+    if len(frames) == 1:
+        det, names = _run_inference(frames[0], float(frame_ts_list[0]))
+        return (None, None) if det is None else ([det], names)
+    return _run_inference(list(frames), list(frame_ts_list))
+
+
+def extract_detections(results, frame_ts=0.0):
+    """Baut aus den YOLO-Ergebnissen ein Detektions-Array (ein .cpu().numpy()-Transfer pro Bild)."""
     if config.USE_DUMMY:
-        # Dummy-Koordinaten zurückgeben
-        return [(100.0, 200.0)]  # Beispielkoordinaten
-    coordinates = []
+        # Dummy-Detektion zurückgeben (Beispielkoordinaten)
+        return detections.from_xyxy([[90.0, 190.0, 110.0, 210.0, 1.0, 0]], frame_ts)
     try:
-        for r in results or []:
-            # Erwartet r.boxes.xywh als Tensor der Form (N,4)
-            if hasattr(r, 'boxes') and hasattr(r.boxes, 'xywh') and r.boxes.xywh is not None:
-                for xywh in r.boxes.xywh:
-                    try:
-                        x_center = float(xywh[0].item())
-                        y_center = float(xywh[1].item())
-                        coordinates.append((x_center, y_center))
-                    except Exception:
-                        continue
+        r = results[0] if results else None
+        # Erwartet r.boxes.data als Tensor der Form (N,6): x1,y1,x2,y2,conf,cls
+        if r is None or getattr(r, 'boxes', None) is None or r.boxes.data is None:
+            return detections.empty()
+        return detections.from_xyxy(r.boxes.data.cpu().numpy(), frame_ts)
     except Exception:
         # Bei Strukturänderungen in Ultralytics lieber leer zurückgeben als crashen
-        return []
-    return coordinates
+        return detections.empty()
+
+def process_image(image_path, frame_ts=None, crop=None):
+    """Verarbeitet ein Bild mit YOLO und gibt ein Detektions-Array (detections.DETECTION_DTYPE) zurück.
 
-def process_image(image_path):
-    """Verarbeitet ein Bild mit YOLO und gibt die Koordinaten zurück."""
+    frame_ts: Aufnahmezeitpunkt; Standard ist der Änderungszeitpunkt der Bilddatei.
+    crop: optionales Rechteck (x1,y1,x2,y2) – Inferenz nur auf diesem Ausschnitt (z. B. Crop-Hinweis
+          des Vegetations-Vorfilters); die Box-Koordinaten beziehen sich weiterhin auf das Vollbild.
+    """
+    if frame_ts is None:
+        try:
+            frame_ts = os.path.getmtime(image_path)
+        except Exception:
+            frame_ts = time.time()
     if config.USE_DUMMY:
         logger.info(f"[YOLO] Dummy-Modus aktiv. Bild: {image_path}")
-        coords = extract_xy(None)
+        det = extract_detections(None, frame_ts)
         # Optional: Dummy-Overlay in der Vorschau anzeigen
         try:
             img = cv2.imread(image_path)
-            if img is not None and len(coords) > 0:
-                x, y = int(coords[0][0]), int(coords[0][1])
-                cv2.circle(img, (x, y), 10, (0, 255, 0), 2)
-                camera._encode_and_store_last_capture(img, quality=85)
-                logger.info(f"[YOLO] Dummy-Preview aktualisiert. Erste Position: ({x},{y})")
+            if img is not None and len(det) > 0:
+                _schedule_preview(img, det, {0: "dummy"})
+                logger.info(f"[YOLO] Dummy-Preview angefordert. Erste Position: ({det['cx'][0]:.0f},{det['cy'][0]:.0f})")
         except Exception:
             pass
-        logger.info(f"[YOLO] Dummy-Ergebnisse: {len(coords)} Position(en)")
-        return coords
+        logger.info(f"[YOLO] Dummy-Ergebnisse: {len(det)} Position(en)")
+        return det
     else:
         logger.info(f"[YOLO] Starte Inferenz: {image_path}")
-        if 'model' not in globals() or model is None:
+        if _active_slot()[0] is None:
             logger.error("[YOLO] Kein Modell verfügbar. Prüfe YOLO_MODEL_PATH oder setze USE_DUMMY=True.")
-            return []
+            return detections.empty()
         # Vorab Eingabe prüfen
         if not image_path or not os.path.isfile(image_path):
             logger.error(f"[YOLO] Bild nicht gefunden: {image_path}")
-            return []
+            return detections.empty()
         try:
             _probe = cv2.imread(image_path)
             if _probe is None:
                 logger.error(f"[YOLO] Bild konnte nicht gelesen werden: {image_path}")
-                return []
+                return detections.empty()
         except Exception as e:
             logger.error(f"[YOLO] Bildlesefehler: {e}")
-            return []
-        # Parameter zusammenstellen
-        device = getattr(config, 'YOLO_DEVICE', 'cpu')
-        imgsz = int(getattr(config, 'YOLO_IMG_SIZE', 640))
-        conf = float(getattr(config, 'YOLO_CONF', 0.25))
-        iou = float(getattr(config, 'YOLO_IOU', 0.45))
-
-    # Inferenz in separatem Prozess (robust gegen native Crashes)
-    if _weights_abs or True:
-            use_fork = ('fork' in mp.get_all_start_methods())
-            ctx = mp.get_context('fork' if use_fork else 'spawn')
-            q = ctx.Queue(maxsize=1)
-            p = ctx.Process(target=_mp_predict_worker, args=(q, image_path, _weights_abs or _weights, device, imgsz, conf, iou, use_fork))
-            p.start()
+            return detections.empty()
+        # Optional nur einen Ausschnitt auswerten
+        source = _probe
+        crop_x, crop_y = 0, 0
+        if crop is not None:
+            h, w = _probe.shape[:2]
+            x1, y1 = max(0, int(crop[0])), max(0, int(crop[1]))
+            x2, y2 = min(w, int(crop[2])), min(h, int(crop[3]))
+            if x2 - x1 >= 32 and y2 - y1 >= 32:
+                source = np.ascontiguousarray(_probe[y1:y2, x1:x2])
+                crop_x, crop_y = x1, y1
+                logger.info(f"[YOLO] Inferenz auf Ausschnitt ({x1},{y1})-({x2},{y2})")
+
+    t0 = time.time()
+    det, names = None, None
+    if _remote_available():
+        det, names = _remote_predict(source, float(frame_ts))
+    if det is None:
+        dets, names = _infer_frames([source], [float(frame_ts)])
+        det = dets[0] if dets else None
+    if det is None:
+        return detections.empty()
+    if crop_x or crop_y:
+        det['cx'] += crop_x
+        det['cy'] += crop_y
+    # Vorschau asynchron zeichnen lassen (nicht auf dem GETXY-Pfad)
+    _schedule_preview(_probe, det, names)
+    dur = (time.time() - t0) * 1000.0
+    _schedule_shadow(source, float(frame_ts), det, dur, (crop_x, crop_y))
+    logger.info(f"[YOLO] Ergebnisse: {len(det)} Position(en) in {dur:.0f}ms")
+    if len(det):
+        try:
+            logger.info(f"[YOLO] Erste Position: ({det['cx'][0]:.1f},{det['cy'][0]:.1f}) cls={det['cls'][0]} conf={det['conf'][0]:.2f}")
+        except Exception:
+            pass
+    return det
+
+
+def process_frames(frames, frame_ts_list):
+    """Führt EINE gebündelte Inferenz über mehrere BGR-Bilder aus (Burst-Modus).
+
+    Gibt eine Liste von Detektions-Arrays zurück (eines pro Bild, gleiche Reihenfolge).
+    """
+    if not frames:
+        return []
+    frame_ts_list = [float(ts) for ts in frame_ts_list]
+    if config.USE_DUMMY:
+        return [extract_detections(None, ts) for ts in frame_ts_list]
+    if _active_slot()[0] is None:
+        logger.error("[YOLO] Kein Modell verfügbar. Prüfe YOLO_MODEL_PATH oder setze USE_DUMMY=True.")
+        return [detections.empty() for _ in frames]
+    logger.info(f"[YOLO] Starte Batch-Inferenz über {len(frames)} Bild(er)")
+    t0 = time.time()
+    dets, names = None, None
+    if _remote_available():
+        # Gemeinsames Zeitbudget für alle Bilder; fällt ein Bild aus, wird der ganze Batch lokal gerechnet
+        deadline = time.monotonic() + float(getattr(config, 'REMOTE_INFERENCE_DEADLINE_S', 2.0))
+        remote = []
+        for f, ts in zip(frames, frame_ts_list):
+            d, names = _remote_predict(f, ts, deadline=deadline)
+            if d is None:
+                remote = None
+                break
+            remote.append(d)
+        dets = remote
+    if dets is None:
+        dets, names = _infer_frames(list(frames), frame_ts_list)
+    if dets is None or len(dets) != len(frames):
+        return [detections.empty() for _ in frames]
+    _schedule_preview(frames[-1], dets[-1], names)
+    dur = (time.time() - t0) * 1000.0
+    _schedule_shadow(list(frames), frame_ts_list, dets, dur)
+    logger.info(f"[YOLO] Batch-Ergebnisse: {[len(d) for d in dets]} Position(en) in {dur:.0f}ms")
+    return dets
+
+
+# ==== Optionale Inferenz auf einem LAN-Rechner (tools/inference_server.py) ====
+# Nach einem Fehler/Timeout wird der Server für REMOTE_INFERENCE_BACKOFF_S übersprungen,
+# damit ein nicht erreichbarer Rechner nicht jeden GETXY-Zyklus um das Zeitbudget verlängert.
+_remote_retry_at = 0.0
+
+
+def _remote_available():
+    return bool(getattr(config, 'REMOTE_INFERENCE_URL', None)) and time.time() >= _remote_retry_at
+
+
+def _remote_predict(bgr, frame_ts, deadline=None):
+    """Schickt ein BGR-Bild an den Inferenz-Server. Rückgabe: (det, names) oder (None, None) bei Fehler/Timeout.
+
+    deadline (time.monotonic()) gilt für die ganze Anfrage: Verbindungsaufbau, Senden und jedes
+    Lesen der Antwort bekommen nur die verbleibende Zeit (ein Socket-Timeout allein gilt je Operation,
+    ein langsam tröpfelnder Server könnte das Budget sonst beliebig überziehen).
+    """
+    global _remote_retry_at
+    url = config.REMOTE_INFERENCE_URL
+    if deadline is None:
+        deadline = time.monotonic() + float(getattr(config, 'REMOTE_INFERENCE_DEADLINE_S', 2.0))
+
+    def left():
+        r = deadline - time.monotonic()
+        if r <= 0:
+            raise TimeoutError("Zeitbudget aufgebraucht")
+        return r
+
+    t0 = time.time()
+    conn = None
+    try:
+        encoding = getattr(config, 'REMOTE_INFERENCE_ENCODING', 'jpeg')
+        headers = {
+            'X-Imgsz': str(int(getattr(config, 'YOLO_IMG_SIZE', 640))),
+            'X-Conf': str(float(getattr(config, 'YOLO_CONF', 0.25))),
+            'X-Iou': str(float(getattr(config, 'YOLO_IOU', 0.45))),
+        }
+        if encoding == 'raw':
+            body = np.ascontiguousarray(bgr).tobytes()
+            headers['Content-Type'] = 'application/octet-stream'
+            headers['X-Shape'] = ",".join(str(x) for x in bgr.shape)
+        else:
+            ok, enc = cv2.imencode('.jpg', bgr, [int(cv2.IMWRITE_JPEG_QUALITY), int(getattr(config, 'REMOTE_INFERENCE_JPEG_QUALITY', 90))])
+            if not ok:
+                raise RuntimeError("JPEG-Encode fehlgeschlagen")
+            body = enc.tobytes()
+            headers['Content-Type'] = 'image/jpeg'
+        headers['X-Deadline-Ms'] = str(int(left() * 1000))
+        u = urllib.parse.urlsplit(url)
+        conn_cls = http.client.HTTPSConnection if u.scheme == 'https' else http.client.HTTPConnection
+        conn = conn_cls(u.hostname, u.port, timeout=left())
+        conn.connect()
+        sock = conn.sock  # getresponse() gibt conn.sock bei "Connection: close" frei, resp liest weiter darüber
+        sock.settimeout(left())  # sendall: Timeout gilt für das gesamte Senden
+        conn.request('POST', (u.path or '/') + (f"?{u.query}" if u.query else ''), body=body, headers=headers)
+        sock.settimeout(left())
+        resp = conn.getresponse()
+        if resp.status != 200:
+            raise RuntimeError(f"HTTP {resp.status} {resp.reason}")
+        # Antwort stückweise lesen und vor jedem recv das Restbudget setzen
+        chunks = []
+        while True:
+            sock.settimeout(left())
+            chunk = resp.read1(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        payload = json.loads(b''.join(chunks).decode('utf-8'))
+        det = detections.from_xyxy(payload.get('boxes') or None, frame_ts)
+        names = {int(k): v for k, v in (payload.get('names') or {}).items()}
+        logger.info(
+            f"[YOLO-Remote] {len(det)} Position(en) in {(time.time() - t0) * 1000.0:.0f}ms "
+            f"(Server {payload.get('server_ms', 0):.0f}ms, {len(body) / 1024:.0f} KB {encoding})"
+        )
+        return det, names
+    except Exception as e:
+        backoff = float(getattr(config, 'REMOTE_INFERENCE_BACKOFF_S', 30.0))
+        _remote_retry_at = time.time() + backoff
+        logger.warning(f"[YOLO-Remote] Fehlgeschlagen nach {(time.time() - t0) * 1000.0:.0f}ms ({e}) – lokale Inferenz, Server {backoff:.0f}s pausiert")
+        return None, None
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+def _run_inference(source, frame_ts, slot=None):
+    """Startet die Inferenz in einem separaten Prozess (robust gegen native Crashes).
+
+    slot: (model, weights_path) – Standard ist das aktive Modell; für den Schattenbetrieb
+          wird das Standby-Modell übergeben.
+    Rückgabe: (det, names) – det ist ein Detektions-Array bzw. eine Liste davon (Batch),
+    oder None bei Timeout/Fehler.
+    """
+    mdl, weights = slot if slot is not None else _active_slot()
+    device = getattr(config, 'YOLO_DEVICE', 'cpu')
+    imgsz = int(getattr(config, 'YOLO_IMG_SIZE', 640))
+    conf = float(getattr(config, 'YOLO_CONF', 0.25))
+    iou = float(getattr(config, 'YOLO_IOU', 0.45))
+    use_fork = ('fork' in mp.get_all_start_methods())
+    ctx = mp.get_context('fork' if use_fork else 'spawn')
+    q = ctx.Queue(maxsize=1)
+    p = ctx.Process(target=_mp_predict_worker, args=(q, source, weights, device, imgsz, conf, iou, mdl if use_fork else None, frame_ts))
+    p.start()
+    t0 = time.time()
+    timeout_s = float(getattr(config, 'YOLO_TIMEOUT_SEC', 30))
+    p.join(timeout=timeout_s)
+    if p.is_alive():
+        try:
+            p.terminate()
+        except Exception:
+            pass
+        logger.error(f"[YOLO] Inferenz-Timeout – Subprozess beendet (>{timeout_s:.1f}s).")
+        return None, None
+    if p.exitcode != 0:
+        dur = (time.time() - t0) * 1000.0
+        logger.error(f"[YOLO] Inferenz-Subprozess exitcode={p.exitcode} nach {dur:.0f}ms")
+        return None, None
+    try:
+        payload = q.get_nowait()
+    except Exception:
+        payload = None
+    if not isinstance(payload, dict):
+        return None, None
+    # Globale Maxima aktualisieren und loggen
+    global _PEAK_RSS_KB
+    mem_peak_kb = payload.get('mem_peak_kb')
+    if isinstance(mem_peak_kb, int) and mem_peak_kb > 0:
+        if mem_peak_kb > _PEAK_RSS_KB:
+            _PEAK_RSS_KB = mem_peak_kb
+        try:
+            cur_mb = mem_peak_kb / 1024.0
+            max_mb = _PEAK_RSS_KB / 1024.0
+            logger.info(f"[YOLO] RAM: max_peak={max_mb:.1f} MB (dieser Lauf: {cur_mb:.1f} MB)")
+        except Exception:
+            pass
+    return payload.get('det'), payload.get('names')
+
+
+# ==== Hot-Swap: Standby-Modell, Schattenbetrieb und Übernahme ====
+# Neue Gewichte in YOLO_MODEL_DIR werden im Hintergrund in ein Standby-Modell geladen (inkl.
+# Aufwärm-Inferenz, also kein Kaltstart bei der Übernahme). Solange ein Standby-Modell existiert,
+# läuft es im Schattenbetrieb mit niedriger Priorität auf den GETXY-Bildern mit; Übereinstimmung
+# und Latenz werden geloggt. PROMOTE_MODEL (UDP-Steuerkanal) tauscht es atomar ein.
+_model_lock = threading.Lock()
+_standby = None  # {'model', 'path', 'mtime', 'stats'}
+_shadow_queue = queue.Queue(maxsize=1)
+_shadow_thread = None
+_shadow_thread_lock = threading.Lock()
+_watcher_thread = None
+
+
+def _active_slot():
+    with _model_lock:
+        return globals().get('model'), (_weights_abs or _weights)
+
+
+def _new_shadow_stats():
+    return {'runs': 0, 'agree_sum': 0.0, 'primary_ms_sum': 0.0, 'shadow_ms_sum': 0.0, 'primary_boxes': 0, 'shadow_boxes': 0}
+
+
+def _agreement(det_a, det_b, match_px):
+    """Anteil übereinstimmender Boxen (gleiche Klasse, Mittelpunktabstand <= match_px); 1.0 wenn beide leer."""
+    if len(det_a) == 0 and len(det_b) == 0:
+        return 1.0
+    if len(det_a) == 0 or len(det_b) == 0:
+        return 0.0
+    d2 = (det_a['cx'][:, None] - det_b['cx'][None, :]) ** 2 + (det_a['cy'][:, None] - det_b['cy'][None, :]) ** 2
+    ok = (d2 <= match_px * match_px) & (det_a['cls'][:, None] == det_b['cls'][None, :])
+    matched = min(int(np.count_nonzero(ok.any(axis=1))), int(np.count_nonzero(ok.any(axis=0))))
+    return matched / float(max(len(det_a), len(det_b)))
+
+
+def _shadow_worker():
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 15)
+    except Exception:
+        pass
+    match_px = float(getattr(config, 'YOLO_SHADOW_MATCH_PX', 20.0))
+    while True:
+        source, frame_ts, primary, primary_ms, offset = _shadow_queue.get()
+        with _model_lock:
+            sb = _standby
+        if sb is None:
+            continue
+        try:
             t0 = time.time()
-            timeout_s = float(getattr(config, 'YOLO_TIMEOUT_SEC', 30))
-            p.join(timeout=timeout_s)
-            if p.is_alive():
-                try:
-                    p.terminate()
-                except Exception:
-                    pass
-                logger.error(f"[YOLO] Inferenz-Timeout – Subprozess beendet (>{timeout_s:.1f}s).")
-                return []
-            if p.exitcode != 0:
-                dur = (time.time() - t0) * 1000.0
-                logger.error(f"[YOLO] Inferenz-Subprozess exitcode={p.exitcode} nach {dur:.0f}ms")
-                return []
+            det, _ = _run_inference(source, frame_ts, slot=(sb['model'], sb['path']))
+            shadow_ms = (time.time() - t0) * 1000.0
+            if det is None:
+                logger.warning("[YOLO-Shadow] Inferenz des Standby-Modells fehlgeschlagen.")
+                continue
+            dets_a = primary if isinstance(primary, list) else [primary]
+            dets_b = det if isinstance(det, list) else [det]
+            if offset and (offset[0] or offset[1]):
+                for d in dets_b:
+                    d['cx'] += offset[0]
+                    d['cy'] += offset[1]
+            agree = float(np.mean([_agreement(a, b, match_px) for a, b in zip(dets_a, dets_b)]))
+            st = sb['stats']
+            st['runs'] += 1
+            st['agree_sum'] += agree
+            st['primary_ms_sum'] += primary_ms
+            st['shadow_ms_sum'] += shadow_ms
+            st['primary_boxes'] += sum(len(a) for a in dets_a)
+            st['shadow_boxes'] += sum(len(b) for b in dets_b)
+            logger.info(
+                f"[YOLO-Shadow] {os.path.basename(sb['path'])}: Übereinstimmung {agree * 100:.0f}% "
+                f"(Mittel {st['agree_sum'] / st['runs'] * 100:.0f}% über {st['runs']} Bild(er)), "
+                f"Latenz {shadow_ms:.0f}ms vs. aktiv {primary_ms:.0f}ms"
+            )
+        except Exception as e:
+            logger.warning(f"[YOLO-Shadow] Fehler: {e}")
+
+
+def _schedule_shadow(source, frame_ts, primary, primary_ms, offset=None):
+    """Übergibt ein bereits ausgewertetes Bild an den Schattenbetrieb (nur wenn ein Standby-Modell existiert)."""
+    global _shadow_thread
+    if _standby is None or not getattr(config, 'YOLO_SHADOW_ACTIVE', True):
+        return
+    with _shadow_thread_lock:
+        if _shadow_thread is None or not _shadow_thread.is_alive():
+            _shadow_thread = threading.Thread(target=_shadow_worker, name="yolo-shadow", daemon=True)
+            _shadow_thread.start()
+    try:
+        _shadow_queue.get_nowait()
+    except queue.Empty:
+        pass
+    try:
+        _shadow_queue.put_nowait((source, frame_ts, primary, primary_ms, offset))
+    except queue.Full:
+        pass
+
+
+def load_standby(path):
+    """Lädt Gewichte als Standby-Modell (inkl. Aufwärm-Inferenz). Gibt True bei Erfolg zurück."""
+    global _standby
+    path = os.path.abspath(path)
+    try:
+        mtime = os.path.getmtime(path)
+        t0 = time.time()
+        mdl = YOLO(path)
+        imgsz = int(getattr(config, 'YOLO_IMG_SIZE', 640))
+        mdl.predict(source=np.zeros((imgsz, imgsz, 3), dtype=np.uint8), device=getattr(config, 'YOLO_DEVICE', 'cpu'), imgsz=imgsz, verbose=False, save=False)
+        with _model_lock:
+            _standby = {'model': mdl, 'path': path, 'mtime': mtime, 'stats': _new_shadow_stats()}
+        logger.info(f"[YOLO] Standby-Modell geladen: {path} in {(time.time() - t0) * 1000.0:.0f}ms – Schattenbetrieb aktiv")
+        return True
+    except Exception as e:
+        logger.error(f"[YOLO] Standby-Modell konnte nicht geladen werden ({path}): {e}")
+        return False
+
+
+def promote_standby():
+    """Tauscht das Standby-Modell atomar als aktives Modell ein. Rückgabe: (ok, Meldung)."""
+    global model, _weights_abs, _standby
+    with _model_lock:
+        sb = _standby
+        if sb is None:
+            return False, "Kein Standby-Modell vorhanden."
+        model = sb['model']
+        _weights_abs = sb['path']
+        _standby = None
+    st = sb['stats']
+    summary = "keine Schattenläufe"
+    if st['runs']:
+        summary = (
+            f"{st['runs']} Schattenläufe, Übereinstimmung {st['agree_sum'] / st['runs'] * 100:.0f}%, "
+            f"Latenz {st['shadow_ms_sum'] / st['runs']:.0f}ms vs. {st['primary_ms_sum'] / st['runs']:.0f}ms"
+        )
+    try:
+        os.makedirs(_STATE_DIR, exist_ok=True)
+        tmp = _ACTIVE_MODEL_FILE + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(sb['path'])
+        os.replace(tmp, _ACTIVE_MODEL_FILE)
+    except Exception as e:
+        logger.warning(f"[YOLO] Aktives Modell konnte nicht persistiert werden: {e}")
+    msg = f"Modell übernommen: {os.path.basename(sb['path'])} ({summary})"
+    logger.info(f"[YOLO] {msg}")
+    return True, msg
+
+
+def get_model_status():
+    """Kurzstatus für Web-UI/Logs: aktives Modell, Standby-Modell und Schatten-Statistik."""
+    with _model_lock:
+        active = _weights_abs or _weights if not config.USE_DUMMY else None
+        sb = _standby
+    status = {'active': os.path.basename(active) if active else None, 'tag': _registry_tag, 'standby': None}
+    if sb is not None:
+        st = sb['stats']
+        status['standby'] = {
+            'name': os.path.basename(sb['path']),
+            'shadow_runs': st['runs'],
+            'agreement': (st['agree_sum'] / st['runs']) if st['runs'] else None,
+            'shadow_ms': (st['shadow_ms_sum'] / st['runs']) if st['runs'] else None,
+            'primary_ms': (st['primary_ms_sum'] / st['runs']) if st['runs'] else None,
+        }
+    return status
+
+
+def _model_watcher():
+    """Überwacht YOLO_MODEL_DIR auf neue Gewichte und lädt sie als Standby-Modell."""
+    model_dir = getattr(config, 'YOLO_MODEL_DIR', None) or os.path.dirname(os.path.abspath(getattr(config, 'YOLO_MODEL_PATH', 'best.pt')))
+    interval = float(getattr(config, 'YOLO_MODEL_WATCH_INTERVAL_S', 5.0))
+    seen = {}
+    # Bestehende Dateien beim Start als bekannt markieren; nur spätere Änderungen zählen
+    try:
+        for name in os.listdir(model_dir):
+            p = os.path.abspath(os.path.join(model_dir, name))
+            if name.endswith('.pt') and os.path.isfile(p):
+                seen[p] = (os.path.getmtime(p), os.path.getsize(p))
+    except Exception:
+        pass
+    pending = {}
+    logger.info(f"[YOLO] Überwache {model_dir} auf neue Gewichte (alle {interval:.0f}s)")
+    while True:
+        time.sleep(interval)
+        try:
+            names = os.listdir(model_dir)
+        except Exception:
+            continue
+        for name in names:
+            p = os.path.abspath(os.path.join(model_dir, name))
+            if not name.endswith('.pt') or not os.path.isfile(p):
+                continue
+            # Das aktive Modell nie zusätzlich als Standby laden (nach PROMOTE_MODEL ist es neu)
+            active = _active_slot()[1]
+            if active and os.path.abspath(active) == p:
+                continue
             try:
-                payload = q.get_nowait()
+                sig = (os.path.getmtime(p), os.path.getsize(p))
             except Exception:
-                payload = None
-            coords, ann_path = [], None
-            mem_peak_kb = None
-            tmp_used = None
-            tmp_total = None
-            ann_size = None
-            if isinstance(payload, dict):
-                coords = payload.get('coords') or []
-                ann_path = payload.get('ann_path')
-                mem_peak_kb = payload.get('mem_peak_kb')
-                tmp_used = payload.get('tmp_used')
-                tmp_total = payload.get('tmp_total')
-                ann_size = payload.get('ann_size')
-            elif isinstance(payload, (list, tuple)) and len(payload) >= 2:
-                coords, ann_path = payload[0], payload[1]
-            # Preview veröffentlichen (lesen aus temporärer Datei)
-            if ann_path:
-                try:
-                    with open(ann_path, 'rb') as f:
-                        ann_bytes = f.read()
-                    try:
-                        if hasattr(camera, '_set_last_capture_bytes'):
-                            camera._set_last_capture_bytes(ann_bytes)  # type: ignore
-                        else:
-                            nparr = np.frombuffer(ann_bytes, dtype=np.uint8)
-                            img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-                            if img is not None:
-                                camera._encode_and_store_last_capture(img, quality=85)
-                    finally:
-                        try:
-                            import os as _os3
-                            _os3.remove(ann_path)
-                        except Exception:
-                            pass
-                except Exception:
-                    pass
-            # Globale Maxima aktualisieren und loggen
-            global _PEAK_RSS_KB, _PEAK_TMP_USED_BYTES
-            if isinstance(mem_peak_kb, int) and mem_peak_kb > 0:
-                if mem_peak_kb > _PEAK_RSS_KB:
-                    _PEAK_RSS_KB = mem_peak_kb
-                try:
-                    cur_mb = mem_peak_kb / 1024.0
-                    max_mb = _PEAK_RSS_KB / 1024.0
-                    logger.info(f"[YOLO] RAM: max_peak={max_mb:.1f} MB (dieser Lauf: {cur_mb:.1f} MB)")
-                except Exception:
-                    pass
-            if isinstance(tmp_used, int) and tmp_used > 0:
-                if tmp_used > _PEAK_TMP_USED_BYTES:
-                    _PEAK_TMP_USED_BYTES = tmp_used
-                try:
-                    used_mb = tmp_used / (1024.0*1024.0)
-                    total_mb = (tmp_total or 0) / (1024.0*1024.0)
-                    max_used_mb = _PEAK_TMP_USED_BYTES / (1024.0*1024.0)
-                    if total_mb > 0:
-                        logger.info(f"[YOLO] /tmp: used={used_mb:.1f}/{total_mb:.1f} MB (max_used={max_used_mb:.1f} MB), ann_size={(ann_size or 0)/1024:.0f} KB")
-                    else:
-                        logger.info(f"[YOLO] /tmp: used={used_mb:.1f} MB (max_used={max_used_mb:.1f} MB), ann_size={(ann_size or 0)/1024:.0f} KB")
-                except Exception:
-                    pass
-            dur = (time.time() - t0) * 1000.0
-            logger.info(f"[YOLO] Ergebnisse: {len(coords)} Position(en) in {dur:.0f}ms")
-            if coords:
-                try:
-                    x0, y0 = coords[0]
-                    logger.info(f"[YOLO] Erste Position: ({x0:.1f},{y0:.1f})")
-                except Exception:
-                    pass
-            return coords
\ No newline at end of file
+                continue
+            if seen.get(p) == sig:
+                continue
+            # Erst laden, wenn die Datei über zwei Durchläufe unverändert ist (Kopiervorgang fertig)
+            if pending.get(p) != sig:
+                pending[p] = sig
+                continue
+            pending.pop(p, None)
+            seen[p] = sig
+            logger.info(f"[YOLO] Neue Gewichte erkannt: {p}")
+            load_standby(p)
+
+
+def start_model_watcher():
+    """Startet die Überwachung des Modellverzeichnisses (einmalig, im Hintergrund)."""
+    global _watcher_thread
+    if config.USE_DUMMY or _watcher_thread is not None:
+        return
+    _watcher_thread = threading.Thread(target=_model_watcher, name="yolo-model-watch", daemon=True)
+    _watcher_thread.start()
@@ -0,0 +1,194 @@
+"""
+CLI-Tool: Offline-Benchmark des Detektors über einen Ordner aufgenommener Bilder.
+
+Verwendet die Produktions-Einstellungen aus src/config.py (imgsz, conf, iou, device, 1 Torch-Thread
+wie im Inferenz-Subprozess) und misst pro Bild die Stufen
+    load (cv2.imread), preprocess, inference, postprocess (Ultralytics result.speed),
+    extract (Detektions-Array), plot (Boxen zeichnen + JPEG-Encode wie die Vorschau-Stufe).
+Ausgegeben werden Perzentile je Stufe, Peak-RSS, Durchsatz und Detektionen pro Bild – als
+maschinenlesbares JSON, damit Läufe über Gewichte, Backends und Konfigurationen vergleichbar sind.
+
+Aufruf (im Projektverzeichnis):
+    python3 tools/benchmark_detector.py --images "./training/bild_*.jpg" --out bench_best.json
+    python3 tools/benchmark_detector.py --weights ./model/best.onnx --tag onnx --out bench_onnx.json
+"""
+
+from __future__ import annotations
+import argparse
+import glob
+import json
+import os
+import platform
+import resource
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src import config, detections  # noqa: E402
+
+STAGES = ("load", "preprocess", "inference", "postprocess", "extract", "plot", "total")
+
+
+def list_images(spec: str):
+    p = Path(spec)
+    if p.is_dir():
+        return sorted(str(x) for x in p.iterdir() if x.suffix.lower() in {".jpg", ".jpeg", ".png"})
+    return sorted(glob.glob(spec))
+
+
+def percentiles(values):
+    a = np.asarray(values, dtype=float)
+    if a.size == 0:
+        return None
+    return {
+        "n": int(a.size),
+        "mean": float(a.mean()),
+        "p50": float(np.percentile(a, 50)),
+        "p90": float(np.percentile(a, 90)),
+        "p99": float(np.percentile(a, 99)),
+        "max": float(a.max()),
+    }
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss: KB unter Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--images", type=str, default=os.path.join(config.TRAINING_IMAGE_DIR, "bild_*.jpg"), help="Verzeichnis oder Glob der Bilder")
+    ap.add_argument("--weights", type=str, default=getattr(config, "YOLO_MODEL_PATH", "best.pt"))
+    ap.add_argument("--imgsz", type=int, default=int(getattr(config, "YOLO_IMG_SIZE", 640)))
+    ap.add_argument("--conf", type=float, default=float(getattr(config, "YOLO_CONF", 0.25)))
+    ap.add_argument("--iou", type=float, default=float(getattr(config, "YOLO_IOU", 0.45)))
+    ap.add_argument("--device", type=str, default=getattr(config, "YOLO_DEVICE", "cpu"))
+    ap.add_argument("--threads", type=int, default=1, help="Torch-Threads (Produktion: 1)")
+    ap.add_argument("--warmup", type=int, default=2, help="Nicht gewertete Aufwärmläufe")
+    ap.add_argument("--limit", type=int, default=0, help="Maximale Anzahl Bilder (0 = alle)")
+    ap.add_argument("--tag", type=str, default=None, help="Freies Label für den Vergleich von Läufen")
+    ap.add_argument("--per-image", action="store_true", help="Messwerte je Bild mit ausgeben")
+    ap.add_argument("--out", type=str, default=None, help="JSON-Datei (Standard: stdout)")
+    args = ap.parse_args()
+
+    images = list_images(args.images)
+    if args.limit > 0:
+        images = images[: args.limit]
+    if not images:
+        print(f"[ERR] Keine Bilder gefunden: {args.images}", file=sys.stderr)
+        return 2
+
+    os.environ.setdefault("OMP_NUM_THREADS", str(args.threads))
+    import torch
+    from ultralytics import YOLO
+    import ultralytics
+
+    torch.set_num_threads(args.threads)
+
+    rss_before_load = peak_rss_mb()
+    t0 = time.perf_counter()
+    model = YOLO(args.weights)
+    model_load_ms = (time.perf_counter() - t0) * 1000.0
+    names = dict(getattr(model, "names", None) or {})
+
+    def run(bgr):
+        return model.predict(source=bgr, device=args.device, imgsz=args.imgsz, conf=args.conf, iou=args.iou, verbose=False, save=False)
+
+    first = cv2.imread(images[0])
+    for _ in range(max(0, args.warmup)):
+        run(first)
+
+    stages = {k: [] for k in STAGES}
+    per_image = []
+    n_det = []
+    t_start = time.perf_counter()
+    for path in images:
+        t_img = time.perf_counter()
+        t = time.perf_counter()
+        bgr = cv2.imread(path)
+        load_ms = (time.perf_counter() - t) * 1000.0
+        if bgr is None:
+            print(f"[WARN] Nicht lesbar: {path}", file=sys.stderr)
+            continue
+        res = run(bgr)
+        speed = dict(getattr(res[0], "speed", {}) or {}) if res else {}
+        t = time.perf_counter()
+        det = detections.from_xyxy(res[0].boxes.data.cpu().numpy(), 0.0) if res else detections.empty()
+        extract_ms = (time.perf_counter() - t) * 1000.0
+        t = time.perf_counter()
+        ann = detections.draw_boxes(bgr, det, names)
+        cv2.imencode(".jpg", ann, [int(cv2.IMWRITE_JPEG_QUALITY), 85])
+        plot_ms = (time.perf_counter() - t) * 1000.0
+        total_ms = (time.perf_counter() - t_img) * 1000.0
+        row = {
+            "image": os.path.basename(path),
+            "load": load_ms,
+            "preprocess": float(speed.get("preprocess", np.nan)),
+            "inference": float(speed.get("inference", np.nan)),
+            "postprocess": float(speed.get("postprocess", np.nan)),
+            "extract": extract_ms,
+            "plot": plot_ms,
+            "total": total_ms,
+            "detections": int(len(det)),
+        }
+        for k in STAGES:
+            if np.isfinite(row[k]):
+                stages[k].append(row[k])
+        n_det.append(len(det))
+        per_image.append(row)
+    wall_s = time.perf_counter() - t_start
+
+    counts = np.asarray(n_det, dtype=int)
+    report = {
+        "tag": args.tag,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": platform.node(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "torch": getattr(torch, "__version__", None),
+        "ultralytics": getattr(ultralytics, "__version__", None),
+        "settings": {
+            "weights": os.path.abspath(args.weights),
+            "weights_bytes": os.path.getsize(args.weights) if os.path.isfile(args.weights) else None,
+            "imgsz": args.imgsz,
+            "conf": args.conf,
+            "iou": args.iou,
+            "device": args.device,
+            "threads": args.threads,
+            "warmup": args.warmup,
+        },
+        "images": len(per_image),
+        "model_load_ms": model_load_ms,
+        "stages_ms": {k: percentiles(v) for k, v in stages.items()},
+        "throughput_img_s": len(per_image) / wall_s if wall_s > 0 else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "rss_before_model_mb": rss_before_load,
+        "detections": {
+            "total": int(counts.sum()) if counts.size else 0,
+            "per_image_mean": float(counts.mean()) if counts.size else 0.0,
+            "images_with_detections": int(np.count_nonzero(counts)),
+            "histogram": {str(k): int(v) for k, v in zip(*np.unique(counts, return_counts=True))} if counts.size else {},
+        },
+    }
+    if args.per_image:
+        report["per_image"] = per_image
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text, encoding="utf-8")
+        st = report["stages_ms"]["total"] or {}
+        print(
+            f"{len(per_image)} Bild(er), total p50={st.get('p50', 0):.0f}ms p90={st.get('p90', 0):.0f}ms, "
+            f"{report['throughput_img_s']:.2f} img/s, peak RSS {report['peak_rss_mb']:.0f} MB -> {args.out}"
+        )
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,121 @@
+"""
+CLI-Tool: Bewertet den Vegetations-Vorfilter (src/vegetation.py) auf aufgenommenen Bildern.
+
+Ein Bild gilt als "positiv", wenn seine YOLO-Labeldatei (gleichnamige .txt) mindestens eine Box
+enthält – oder, mit --weights, wenn das Modell mindestens eine Box findet. Ausgegeben wird, wie viele
+Bilder der Vorfilter überspringen würde und wie viele Positive dabei verloren gingen.
+
+Aufruf (im Projektverzeichnis):
+    python3 tools/eval_vegetation_prefilter.py --images "./training/bild_*.jpg"
+    python3 tools/eval_vegetation_prefilter.py --images ./training --weights ./model/best.pt --sweep 0.0005,0.001,0.002,0.005
+"""
+
+from __future__ import annotations
+import argparse
+import glob
+import json
+import os
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src import config, vegetation  # noqa: E402
+
+
+def list_images(spec: str):
+    p = Path(spec)
+    if p.is_dir():
+        return sorted(str(x) for x in p.iterdir() if x.suffix.lower() in {".jpg", ".jpeg", ".png"})
+    return sorted(glob.glob(spec))
+
+
+def label_positive(img_path: str, labels_dir: str | None) -> bool | None:
+    stem = Path(img_path).stem
+    lbl = Path(labels_dir) / f"{stem}.txt" if labels_dir else Path(img_path).with_suffix(".txt")
+    if not lbl.exists():
+        return None
+    return any(line.strip() for line in lbl.read_text(encoding="utf-8").splitlines())
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--images", type=str, default="./training/bild_*.jpg", help="Verzeichnis oder Glob der Bilder")
+    ap.add_argument("--labels", type=str, default=None, help="Verzeichnis der .txt-Labels (Standard: neben den Bildern)")
+    ap.add_argument("--weights", type=str, default=None, help="YOLO-Gewichte; Positive werden per Modell bestimmt")
+    ap.add_argument("--sweep", type=str, default=None, help="Kommagetrennte VEG_MIN_FRACTION-Werte zum Vergleich")
+    ap.add_argument("--json", type=str, default=None, help="Ergebnis zusätzlich als JSON speichern")
+    args = ap.parse_args()
+
+    images = list_images(args.images)
+    if not images:
+        print(f"[ERR] Keine Bilder gefunden: {args.images}")
+        return 2
+
+    model = None
+    if args.weights:
+        from ultralytics import YOLO
+
+        model = YOLO(args.weights)
+
+    rows = []
+    for path in images:
+        bgr = cv2.imread(path)
+        if bgr is None:
+            print(f"[WARN] Nicht lesbar: {path}")
+            continue
+        _, fraction, rois = vegetation.prefilter(bgr)
+        if model is not None:
+            res = model.predict(
+                source=bgr,
+                imgsz=int(getattr(config, "YOLO_IMG_SIZE", 640)),
+                conf=float(getattr(config, "YOLO_CONF", 0.25)),
+                iou=float(getattr(config, "YOLO_IOU", 0.45)),
+                verbose=False,
+            )
+            positive = bool(res and len(res[0].boxes))
+        else:
+            positive = label_positive(path, args.labels)
+        rows.append({"image": os.path.basename(path), "fraction": fraction, "rois": len(rois), "positive": positive})
+
+    known = [r for r in rows if r["positive"] is not None]
+    thresholds = [float(getattr(config, "VEG_MIN_FRACTION", 0.002))]
+    if args.sweep:
+        thresholds = [float(x) for x in args.sweep.split(",") if x.strip()]
+
+    print("=== Vegetations-Vorfilter ===")
+    print(f"Bilder: {len(rows)}  (davon mit Label/Referenz: {len(known)}, positiv: {sum(1 for r in known if r['positive'])})")
+    fr = np.array([r["fraction"] for r in rows], dtype=float)
+    if fr.size:
+        print(f"Grünanteil: median={np.median(fr) * 100:.3f}%  p90={np.percentile(fr, 90) * 100:.3f}%")
+    results = []
+    for thr in thresholds:
+        skipped = [r for r in rows if r["fraction"] < thr]
+        missed = [r for r in skipped if r["positive"]]
+        positives = sum(1 for r in known if r["positive"])
+        res = {
+            "min_fraction": thr,
+            "skipped": len(skipped),
+            "skip_rate": len(skipped) / float(len(rows)) if rows else 0.0,
+            "missed_positives": len(missed),
+            "miss_rate": len(missed) / float(positives) if positives else 0.0,
+            "missed_images": [r["image"] for r in missed],
+        }
+        results.append(res)
+        print(
+            f"min_fraction={thr:.4f}: übersprungen {res['skipped']}/{len(rows)} ({res['skip_rate'] * 100:.1f}%), "
+            f"verpasste Positive {res['missed_positives']}/{positives} ({res['miss_rate'] * 100:.1f}%)"
+        )
+        for name in res["missed_images"][:10]:
+            print(f"  verpasst: {name}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({"images": rows, "thresholds": results}, indent=2), encoding="utf-8")
+        print(f"JSON gespeichert: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
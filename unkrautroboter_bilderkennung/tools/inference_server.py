@@ -0,0 +1,137 @@
+"""
+Eigenständiger Inferenz-Server für einen Rechner im selben WLAN (z. B. Joystick-PC oder Webserver-Host).
+
+Der Pi schickt Bilder (JPEG oder rohe BGR-Bytes) per HTTP-POST an /predict und erhält die Boxen als
+JSON zurück. Jede Anfrage trägt ein Zeitbudget (Header X-Deadline-Ms, relativ zum Absenden); ist es
+beim Start der Inferenz bereits abgelaufen, antwortet der Server sofort mit 504, damit keine
+veralteten Bilder die Warteschlange verstopfen. Der Pi fällt in diesem Fall auf lokale Inferenz zurück.
+
+Hinweis: keine Authentifizierung – nur im lokalen Netz betreiben.
+
+Protokoll:
+    POST /predict
+        Content-Type: image/jpeg                  -> JPEG-Bytes
+        Content-Type: application/octet-stream    -> rohe uint8-BGR-Bytes, Header X-Shape: "H,W,3"
+        optional: X-Deadline-Ms, X-Imgsz, X-Conf, X-Iou
+    Antwort 200: {"boxes": [[x1,y1,x2,y2,conf,cls], ...], "names": {...}, "server_ms": ..., "speed": {...}}
+    GET /health -> {"ok": true, "weights": ...}
+
+Start (lokal testbar):
+    python3 tools/inference_server.py --weights ./model/best.pt --host 127.0.0.1 --port 8501
+    python3 tools/inference_server.py --dummy   # ohne Modell, liefert eine feste Box (Protokolltest)
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+import numpy as np
+
+_model = None
+_model_lock = threading.Lock()  # eine Inferenz gleichzeitig
+_args = None
+
+
+def _predict(bgr, imgsz, conf, iou):
+    if _model is None:
+        h, w = bgr.shape[:2]
+        return [[w / 2 - 10, h / 2 - 10, w / 2 + 10, h / 2 + 10, 1.0, 0]], {0: "dummy"}, {}
+    res = _model.predict(source=bgr, device=_args.device, imgsz=imgsz, conf=conf, iou=iou, verbose=False, save=False)
+    boxes = res[0].boxes.data.cpu().numpy().tolist() if res else []
+    return boxes, dict(getattr(_model, "names", None) or {}), dict(getattr(res[0], "speed", {}) or {}) if res else {}
+
+
+class Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        if _args.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, code, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.startswith("/health"):
+            self._send_json(200, {"ok": True, "weights": _args.weights if _model is not None else "dummy"})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        t_recv = time.time()
+        if not self.path.startswith("/predict"):
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            n = int(self.headers.get("Content-Length", "0"))
+            body = self.rfile.read(n)
+            ctype = (self.headers.get("Content-Type") or "").split(";")[0].strip()
+            if ctype == "image/jpeg":
+                bgr = cv2.imdecode(np.frombuffer(body, dtype=np.uint8), cv2.IMREAD_COLOR)
+            else:
+                shape = tuple(int(x) for x in self.headers.get("X-Shape", "").split(","))
+                bgr = np.frombuffer(body, dtype=np.uint8).reshape(shape)
+            if bgr is None:
+                raise ValueError("Bild nicht dekodierbar")
+        except Exception as e:
+            self._send_json(400, {"error": f"ungültige Anfrage: {e}"})
+            return
+        budget_ms = float(self.headers.get("X-Deadline-Ms", "0") or 0)
+        deadline = t_recv + budget_ms / 1000.0 if budget_ms > 0 else None
+        imgsz = int(self.headers.get("X-Imgsz", _args.imgsz))
+        conf = float(self.headers.get("X-Conf", _args.conf))
+        iou = float(self.headers.get("X-Iou", _args.iou))
+        with _model_lock:
+            if deadline is not None and time.time() > deadline:
+                self._send_json(504, {"error": "deadline abgelaufen"})
+                return
+            t0 = time.time()
+            boxes, names, speed = _predict(bgr, imgsz, conf, iou)
+            infer_ms = (time.time() - t0) * 1000.0
+        self._send_json(200, {
+            "boxes": boxes,
+            "names": {str(k): v for k, v in names.items()},
+            "server_ms": (time.time() - t_recv) * 1000.0,
+            "infer_ms": infer_ms,
+            "speed": speed,
+        })
+
+
+def main():
+    global _model, _args
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--weights", type=str, default="./model/best.pt")
+    ap.add_argument("--host", type=str, default="127.0.0.1", help="0.0.0.0 für Zugriff aus dem WLAN")
+    ap.add_argument("--port", type=int, default=8501)
+    ap.add_argument("--device", type=str, default="cpu")
+    ap.add_argument("--imgsz", type=int, default=640)
+    ap.add_argument("--conf", type=float, default=0.25)
+    ap.add_argument("--iou", type=float, default=0.45)
+    ap.add_argument("--dummy", action="store_true", help="Ohne Modell; feste Box in der Bildmitte")
+    ap.add_argument("--verbose", action="store_true")
+    _args = ap.parse_args()
+
+    if not _args.dummy:
+        from ultralytics import YOLO
+
+        _model = YOLO(_args.weights)
+        # Aufwärmen, damit die erste echte Anfrage nicht das Zeitbudget sprengt
+        _predict(np.zeros((_args.imgsz, _args.imgsz, 3), dtype=np.uint8), _args.imgsz, _args.conf, _args.iou)
+    server = ThreadingHTTPServer((_args.host, _args.port), Handler)
+    print(f"Inferenz-Server läuft auf http://{_args.host}:{_args.port}/predict ({'dummy' if _model is None else _args.weights})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
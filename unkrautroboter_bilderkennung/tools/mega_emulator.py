@@ -0,0 +1,232 @@
+"""
+CLI-Tool: Mega-Emulator an einem Pseudo-Terminal (pty) zum Testen der Zielübergabe ohne Hardware.
+
+Der Emulator verhält sich wie anfrageUndAbarbeiten in der Firmware: er sendet "GETXY", wartet bis
+zu 5 s auf XY-Zeilen + DONE (Textformat) oder einen Ziel-Rahmen (Binärformat, src/target_protocol.py),
+beantwortet Rahmen mit ACK/NAK und gibt die empfangenen Ziele aus. Mit --corrupt / --drop-ack
+werden Übertragungsfehler simuliert, um die Wiederholung auf dem Pi zu prüfen.
+
+Die Slave-Seite des pty wird (mit --link) unter config.SIMULATED_SERIAL_PORT verlinkt; der
+SerialManager versucht diesen Port zuerst.
+
+Aufruf (im Projektverzeichnis):
+    python3 tools/mega_emulator.py --link                   # Emulator für main.py
+    python3 tools/mega_emulator.py --link --corrupt 0.3     # jeder 3. Rahmen verfälscht
+    python3 tools/mega_emulator.py --selftest               # Encoder/Decoder + SerialManager gegen den Emulator
+"""
+
+from __future__ import annotations
+import argparse
+import os
+import pty
+import random
+import select
+import sys
+import threading
+import time
+import tty
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import config, target_protocol  # noqa: E402
+
+FRAME_TIMEOUT_S = 0.2  # FRAME_TIMEOUT_MS der Firmware
+
+
+class MegaEmulator:
+    def __init__(self, corrupt: float = 0.0, drop_ack: float = 0.0, max_targets: int = 50, verbose: bool = True):
+        self.master, self.slave = pty.openpty()
+        tty.setraw(self.slave)
+        self.slave_name = os.ttyname(self.slave)
+        self.corrupt = corrupt
+        self.drop_ack = drop_ack
+        self.max_targets = max_targets
+        self.verbose = verbose
+        self._reader = target_protocol.FrameReader()
+        self._text = bytearray()
+        self.stats = {"requests": 0, "frames": 0, "nak": 0, "text_batches": 0, "timeouts": 0}
+
+    def log(self, msg: str) -> None:
+        if self.verbose:
+            print(f"[Mega] {msg}", flush=True)
+
+    def write_line(self, line: str) -> None:
+        os.write(self.master, (line + "\n").encode())
+
+    def _answer_frame(self, frame: bytes):
+        """Rahmen prüfen (ggf. verfälschen) und beantworten. Rückgabe: Ziele (N,2) oder None."""
+        self.stats["frames"] += 1
+        if self.corrupt and random.random() < self.corrupt:
+            b = bytearray(frame)
+            b[random.randrange(4, len(b))] ^= 1 << random.randrange(8)
+            frame = bytes(b)
+        try:
+            seq, t = target_protocol.decode_frame(frame)
+        except ValueError as e:
+            self.stats["nak"] += 1
+            seq = frame[2] if len(frame) > 2 and frame[1] == target_protocol.FRAME_VERSION else -1
+            self.log(f"Rahmen verworfen ({e}) → NAK:{seq}")
+            self.write_line(f"NAK:{seq}")
+            return None
+        if self.drop_ack and random.random() < self.drop_ack:
+            self.log(f"Rahmen seq={seq} ok, ACK absichtlich nicht gesendet")
+            return None
+        self.write_line(f"ACK:{seq}")
+        return target_protocol.targets_mm(t)
+
+    def _text_lines(self, data: bytes):
+        self._text += data
+        while True:
+            i = self._text.find(b"\n")
+            if i < 0:
+                return
+            line = self._text[:i].decode(errors="ignore").strip()
+            del self._text[: i + 1]
+            if line:
+                yield line
+
+    def request_targets(self, timeout_s: float = 5.0):
+        """Ein Zyklus wie anfrageUndAbarbeiten. Rückgabe: (N,2)-Ziele in mm (leer bei Timeout)."""
+        self.stats["requests"] += 1
+        self._reader.discard()
+        self._text.clear()
+        self.write_line("GETXY")
+        deadline = time.monotonic() + timeout_s
+        text_targets = []
+        while True:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                self.stats["timeouts"] += 1
+                self.log(f"Timeout, {len(text_targets)} Ziel(e) aus Textzeilen")
+                return np.asarray(text_targets, dtype=np.float64).reshape(-1, 2)
+            r, _, _ = select.select([self.master], [], [], min(left, FRAME_TIMEOUT_S))
+            if not r:
+                if self._reader.pending():
+                    # Unvollständiger Rahmen (z. B. verfälschte Länge) wie FRAME_TIMEOUT_MS verwerfen
+                    self._reader.discard()
+                    self.stats["nak"] += 1
+                    self.write_line("NAK:-1")
+                continue
+            for text, frame in self._reader.feed(os.read(self.master, 4096)):
+                if frame is not None:
+                    xy = self._answer_frame(frame)
+                    if xy is not None:
+                        return xy
+                    continue
+                for line in self._text_lines(text):
+                    if line == "DONE":
+                        self.stats["text_batches"] += 1
+                        return np.asarray(text_targets, dtype=np.float64).reshape(-1, 2)
+                    if line.startswith("XY:") and "," in line and len(text_targets) < self.max_targets:
+                        try:
+                            x, y = line[3:].split(",", 1)
+                            text_targets.append((float(x), float(y)))
+                        except ValueError:
+                            self.log(f"Zeile nicht lesbar: {line}")
+
+    def close(self) -> None:
+        os.close(self.master)
+        os.close(self.slave)
+
+
+def advance_mm(xy) -> float:
+    """Fahrstrecke wie anfrageUndAbarbeiten (nur vorwärts, > 0,5 mm)."""
+    cur = 0.0
+    for _, y in np.asarray(xy, dtype=float).reshape(-1, 2):
+        if y - cur > 0.5:
+            cur = y
+    return cur
+
+
+def selftest() -> int:
+    ok = True
+    # Encoder/Decoder
+    rng = np.random.default_rng(1)
+    xy = np.round(rng.uniform(-500, 1500, (50, 2)), 1)
+    cls = rng.integers(0, 3, 50)
+    prio = rng.integers(0, 256, 50)
+    frame = target_protocol.encode_targets(7, xy, cls, prio)
+    seq, t = target_protocol.decode_frame(frame)
+    ok &= seq == 7 and np.allclose(target_protocol.targets_mm(t), xy) and np.array_equal(t["cls"], cls)
+    ok &= target_protocol.crc16_ccitt(b"123456789") == 0x29B1  # Prüfwert CRC-16/CCITT-FALSE
+    detected = 0
+    for i in range(1, len(frame)):
+        bad = bytearray(frame)
+        bad[i] ^= 0x10
+        try:
+            target_protocol.decode_frame(bytes(bad))
+        except ValueError:
+            detected += 1
+    ok &= detected == len(frame) - 1
+    print(f"Encoder/Decoder: {len(frame)} Byte für 50 Ziele, {detected}/{len(frame) - 1} Bitfehler erkannt")
+
+    # SerialManager gegen den Emulator (Text und Rahmen, mit Störungen)
+    from src import serial_manager
+
+    for protocol, corrupt in (("text", 0.0), ("frame", 0.0), ("frame", 0.5)):
+        emu = MegaEmulator(corrupt=corrupt, verbose=False)
+        config.SIMULATED_SERIAL_PORT = emu.slave_name
+        config.SERIAL_TARGET_PROTOCOL = protocol
+        config.SERIAL_FRAME_RETRIES = 10
+        random.seed(3)
+        sm = serial_manager.SerialManager()
+        results = []
+        for _ in range(5):
+            sent = np.round(rng.uniform(0, 400, (rng.integers(0, 12), 2)), 1)
+            th = threading.Thread(target=lambda: results.append(emu.request_targets()))
+            th.start()
+            line = sm.read_line(timeout=2.0)
+            t0 = time.perf_counter()
+            acked = sm.send_targets(sent, line_delay_s=0.0, cls=np.zeros(len(sent)), prio=np.full(len(sent), 200))
+            dt = (time.perf_counter() - t0) * 1000
+            th.join(6.0)
+            same = line == "GETXY" and acked and np.allclose(results[-1], sent)
+            ok &= same
+            print(f"  {protocol:5s} Störung {corrupt:.1f}: {len(sent):2d} Ziel(e) in {dt:6.1f} ms {'ok' if same else 'FEHLER'}")
+        print(f"  {protocol:5s} Rahmen-Statistik Pi: {sm.frame_stats}, Mega: {emu.stats}")
+        sm.close()
+        emu.close()
+    print("Selbsttest", "bestanden" if ok else "FEHLGESCHLAGEN")
+    return 0 if ok else 1
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Mega-Emulator (pty) für die Zielübergabe")
+    ap.add_argument("--link", action="store_true", help="pty unter config.SIMULATED_SERIAL_PORT verlinken")
+    ap.add_argument("--interval", type=float, default=2.0, help="Sekunden zwischen zwei GETXY")
+    ap.add_argument("--corrupt", type=float, default=0.0, help="Wahrscheinlichkeit, einen Rahmen zu verfälschen")
+    ap.add_argument("--drop-ack", type=float, default=0.0, help="Wahrscheinlichkeit, ein ACK wegzulassen")
+    ap.add_argument("--selftest", action="store_true")
+    args = ap.parse_args()
+    if args.selftest:
+        return selftest()
+
+    emu = MegaEmulator(corrupt=args.corrupt, drop_ack=args.drop_ack)
+    link = Path(config.SIMULATED_SERIAL_PORT)
+    if args.link:
+        if link.is_symlink() or link.exists():
+            link.unlink()
+        link.symlink_to(emu.slave_name)
+        print(f"pty {emu.slave_name} → {link}")
+    else:
+        print(f"pty {emu.slave_name}")
+    try:
+        while True:
+            xy = emu.request_targets()
+            emu.log(f"{len(xy)} Ziel(e), Fahrt {advance_mm(xy):.1f} mm: {np.round(xy, 1).tolist()[:5]}{' …' if len(xy) > 5 else ''}")
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Statistik: {emu.stats}")
+        if args.link and link.is_symlink():
+            link.unlink()
+        emu.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
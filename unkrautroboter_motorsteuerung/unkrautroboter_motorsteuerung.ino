@@ -84,10 +84,20 @@ volatile long encoderZ = 0;
 struct Zielpunkt {
     float x_mm;
     float y_mm;
+    uint8_t klasse; // nur im Binärformat übertragen
+    uint8_t prio;
 };
 
+// Binärformat für die Zielübergabe (siehe src/target_protocol.py auf dem Pi):
+// 0xA5, Version, Seq, N, N x (int16 x*10, int16 y*10, u8 Klasse, u8 Prio), CRC16-CCITT (LE), '\n'
+// Das abschließende '\n' dient nur der Resynchronisation: nach einem kaputten Rahmen wird bis dorthin verworfen.
+#define FRAME_SOF 0xA5
+#define FRAME_VERSION 1
+#define FRAME_TIMEOUT_MS 200
+
 Zielpunkt ziele[MAX_KOORDINATEN];
 int zielCount = 0;
+Zielpunkt zielPuffer[MAX_KOORDINATEN]; // Rahmen wird erst nach korrekter CRC nach ziele[] übernommen
 float aktuelleY_mm = 0;
 
 volatile long encoderBrush = 0;
@@ -531,6 +541,92 @@ void fahreStrecke(int strecke_mm, bool vorLinks, bool vorRechts) {
     Serial.println("Fahrt beendet");
 }
 
+uint16_t crc16Ccitt(uint16_t crc, uint8_t b) {
+    crc ^= (uint16_t)b << 8;
+    for (uint8_t i = 0; i < 8; i++)
+        crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : (crc << 1);
+    return crc;
+}
+
+// Liest ein Byte von Serial2; -1 wenn bis deadline nichts kommt
+int leseByte(unsigned long deadline) {
+    while (!Serial2.available()) {
+        if ((long)(millis() - deadline) >= 0)
+            return -1;
+    }
+    return Serial2.read();
+}
+
+void antworteFrame(bool ok, int seq) {
+    Serial2.print(ok ? "ACK:" : "NAK:");
+    Serial2.println(seq);
+}
+
+// Rest eines kaputten Rahmens bis zum abschließenden '\n' verwerfen (oder bis 5 ms lang nichts kommt).
+// Nachfolgende Textzeilen (MODE:, JOYSTICK:) bleiben erhalten.
+void verwerfeRahmenRest() {
+    int c;
+    while ((c = leseByte(millis() + 5)) >= 0 && c != '\n')
+        ;
+}
+
+// Liest einen Ziel-Rahmen (SOF bereits gelesen) in zielPuffer[] und antwortet mit ACK/NAK.
+// Nur mit uebernehmen und korrekter CRC werden die Ziele nach ziele[]/zielCount kopiert; ein
+// verspätet wiederholter Rahmen (ACK verloren, Mega war beschäftigt) wird nur erneut bestätigt.
+// Rückgabe true, wenn der Rahmen vollständig und die CRC korrekt war.
+bool leseZielFrame(bool uebernehmen) {
+    unsigned long deadline = millis() + FRAME_TIMEOUT_MS;
+    int version = leseByte(deadline);
+    int seq = leseByte(deadline);
+    int n = leseByte(deadline);
+    if (version != FRAME_VERSION || seq < 0 || n < 0 || n > MAX_KOORDINATEN) {
+        // Rest des kaputten Rahmens verwerfen, dann Wiederholung anfordern
+        verwerfeRahmenRest();
+        antworteFrame(false, version == FRAME_VERSION ? seq : -1);
+        return false;
+    }
+    uint16_t crc = 0xFFFF;
+    crc = crc16Ccitt(crc, version);
+    crc = crc16Ccitt(crc, seq);
+    crc = crc16Ccitt(crc, n);
+    for (int i = 0; i < n; i++) {
+        uint8_t b[6];
+        for (int k = 0; k < 6; k++) {
+            int c = leseByte(deadline);
+            if (c < 0) {
+                // Abgeschnitten (z. B. RX-Puffer übergelaufen, während der Mega fuhr)
+                antworteFrame(false, seq);
+                return false;
+            }
+            b[k] = (uint8_t)c;
+            crc = crc16Ccitt(crc, b[k]);
+        }
+        int16_t x = (int16_t)(b[0] | ((uint16_t)b[1] << 8));
+        int16_t y = (int16_t)(b[2] | ((uint16_t)b[3] << 8));
+        zielPuffer[i] = {x / 10.0f, y / 10.0f, b[4], b[5]};
+    }
+    int lo = leseByte(deadline);
+    int hi = leseByte(deadline);
+    if (lo < 0 || hi < 0 || (uint16_t)(lo | (hi << 8)) != crc) {
+        Serial.println("Ziel-Rahmen: CRC falsch");
+        verwerfeRahmenRest();
+        antworteFrame(false, seq);
+        return false;
+    }
+    // Abschließendes '\n' mitnehmen (fehlt es, bleibt das nächste Byte unangetastet)
+    unsigned long ende = millis() + 5;
+    while (!Serial2.available() && (long)(millis() - ende) < 0)
+        ;
+    if (Serial2.available() && Serial2.peek() == '\n')
+        Serial2.read();
+    if (uebernehmen) {
+        memcpy(ziele, zielPuffer, n * sizeof(Zielpunkt));
+        zielCount = n;
+    }
+    antworteFrame(true, seq);
+    return true;
+}
+
 void anfrageUndAbarbeiten() {
 
     // Setze Kamera oben in die Mitte
@@ -548,6 +644,13 @@ void anfrageUndAbarbeiten() {
 
     while (millis() - start < 5000) {
         sendeStatus();
+        // Binärformat: ein Rahmen mit allen Zielen statt XY-Zeilen + DONE
+        if (Serial2.available() && Serial2.peek() == FRAME_SOF) {
+            Serial2.read();
+            if (leseZielFrame(true))
+                break;
+            continue;
+        }
         if (readSerialLine(cmdBuffer)) {
             // Prüfe auf Ende der Übertragung
             if (cmdBuffer == "DONE") {
@@ -621,6 +724,13 @@ void processSerialCommand() {
     static String cmdBuffer = "";
     bool lineComplete = false;
 
+    // Wiederholter Ziel-Rahmen nach verlorenem ACK: nur erneut bestätigen, Ziele sind veraltet
+    if (Serial2.available() && Serial2.peek() == FRAME_SOF) {
+        Serial2.read();
+        leseZielFrame(false);
+        return;
+    }
+
     lineComplete = readSerialLine(cmdBuffer);
 
     // Verarbeite nur vollständige Zeilen
@@ -0,0 +1,209 @@
+# file: check_dataset.py
+# Datensatz prüfen, bevor model.train startet: Bilder dekodieren, Labels parsen, Duplikate finden
+#
+# - kaputte/unlesbare Bilder, fehlerhafte .txt-Zeilen, Klassen-ID außerhalb NAMES,
+#   Koordinaten außerhalb 0..1, degenerierte Boxen (Breite/Höhe < MIN_BOX_PX), doppelte Zeilen
+# - doppelte Bilder über den Inhalts-Hash (SHA-1 der Datei)
+# - Statistik: Klassenverteilung, Boxen pro Bild, Boxgrößen (Histogramm)
+# Ergebnisse je Datei werden mit Größe/mtime in dataset/.check_cache.json gecacht → erneute Prüfung sofort.
+#
+# Aufruf:
+#   python check_dataset.py                      # dataset/images_raw
+#   python check_dataset.py --src ../unkrautroboter_bilderkennung/training --json report.json --strict
+
+import argparse, hashlib, json, math, os, sys, time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from prepare_and_train import NAMES, RAW_DIR, DATASET_DIR
+
+# ===== CONFIG =====
+CACHE_FILE = DATASET_DIR / ".check_cache.json"
+MIN_BOX_PX = 2.0  # kleinere Boxen gelten als degeneriert
+COORD_TOL = 1e-3  # Toleranz für normierte Koordinaten außerhalb 0..1
+EXTS = {".jpg", ".jpeg", ".png"}
+SIZE_BINS = [0, 8, 16, 32, 64, 128, 256, 512, 100000]  # Boxgröße sqrt(w*h) in Pixeln
+COUNT_BINS = [0, 1, 2, 3, 5, 10, 20, 1000]  # Boxen pro Bild
+
+# ==================
+
+
+def _stat(p: Path):
+    try:
+        st = p.stat()
+        return [st.st_size, st.st_mtime_ns]
+    except FileNotFoundError:
+        return None
+
+
+def check_file(img_path: str, n_classes: int):
+    """Prüft ein Bild samt Label. Läuft im Worker-Prozess."""
+    import cv2
+    import numpy as np
+
+    img = Path(img_path)
+    res = {"errors": [], "warnings": [], "w": None, "h": None, "sha1": None, "label": None, "boxes": []}
+    try:
+        data = img.read_bytes()
+        res["sha1"] = hashlib.sha1(data).hexdigest()
+        arr = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if arr is None:
+            res["errors"].append("Bild nicht dekodierbar")
+        else:
+            res["h"], res["w"] = arr.shape[:2]
+    except Exception as e:
+        res["errors"].append(f"Bild nicht lesbar: {e}")
+
+    lbl = img.with_suffix(".txt")
+    if not lbl.exists():
+        res["label"] = "fehlt"
+        return res
+    try:
+        lines = lbl.read_text(encoding="utf-8").splitlines()
+    except Exception as e:
+        res["errors"].append(f"Label nicht lesbar: {e}")
+        return res
+    res["label"] = "leer" if not any(l.strip() for l in lines) else "ok"
+    seen = set()
+    for i, line in enumerate(lines, 1):
+        s = line.strip()
+        if not s:
+            continue
+        parts = s.split()
+        if len(parts) != 5:
+            res["errors"].append(f"Zeile {i}: {len(parts)} statt 5 Werte")
+            continue
+        try:
+            cls_f = float(parts[0])
+            cx, cy, bw, bh = (float(x) for x in parts[1:])
+        except ValueError:
+            res["errors"].append(f"Zeile {i}: keine Zahl")
+            continue
+        # nan/inf parsen als float, würden aber int() bzw. die Bereichsprüfungen aushebeln
+        if not all(math.isfinite(v) for v in (cls_f, cx, cy, bw, bh)):
+            res["errors"].append(f"Zeile {i}: nan/inf")
+            continue
+        if cls_f != int(cls_f) or not (0 <= int(cls_f) < n_classes):
+            res["errors"].append(f"Zeile {i}: Klasse {parts[0]} außerhalb 0..{n_classes - 1}")
+            continue
+        cls = int(cls_f)
+        if not all(-COORD_TOL <= v <= 1 + COORD_TOL for v in (cx, cy, bw, bh)):
+            res["errors"].append(f"Zeile {i}: Koordinaten außerhalb 0..1")
+            continue
+        if cx - bw / 2 < -COORD_TOL or cx + bw / 2 > 1 + COORD_TOL or cy - bh / 2 < -COORD_TOL or cy + bh / 2 > 1 + COORD_TOL:
+            res["warnings"].append(f"Zeile {i}: Box ragt über den Bildrand")
+        pw = bw * (res["w"] or 0)
+        ph = bh * (res["h"] or 0)
+        if bw <= 0 or bh <= 0 or (res["w"] and (pw < MIN_BOX_PX or ph < MIN_BOX_PX)):
+            res["errors"].append(f"Zeile {i}: degenerierte Box ({pw:.1f}x{ph:.1f}px)")
+            continue
+        key = (cls, round(cx, 4), round(cy, 4), round(bw, 4), round(bh, 4))
+        if key in seen:
+            res["warnings"].append(f"Zeile {i}: doppelte Box")
+        seen.add(key)
+        res["boxes"].append([cls, pw, ph])
+    return res
+
+
+def _histogram(values, bins):
+    out = {}
+    for lo, hi in zip(bins[:-1], bins[1:]):
+        out[f"{lo}-{hi}"] = sum(1 for v in values if lo <= v < hi)
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Datensatz prüfen (Bilder, Labels, Duplikate, Statistik)")
+    ap.add_argument("--src", type=Path, default=RAW_DIR)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    ap.add_argument("--no-cache", action="store_true")
+    ap.add_argument("--json", type=Path, default=None, help="Bericht zusätzlich als JSON speichern")
+    ap.add_argument("--strict", action="store_true", help="Exit-Code 1 bei Fehlern (z. B. vor dem Training)")
+    args = ap.parse_args()
+
+    assert args.src.exists(), f"Verzeichnis nicht gefunden: {args.src}"
+    imgs = sorted(p for p in args.src.rglob("*") if p.is_file() and p.suffix.lower() in EXTS)
+    cache = {}
+    if not args.no_cache and CACHE_FILE.exists():
+        try:
+            cache = json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+        except Exception:
+            cache = {}
+
+    t0 = time.time()
+    results, todo, keys = {}, [], {}
+    for p in imgs:
+        k = str(p.resolve())
+        keys[k] = [_stat(p), _stat(p.with_suffix(".txt")), len(NAMES)]
+        c = cache.get(k)
+        if c and c["key"] == keys[k]:
+            results[k] = c["res"]
+        else:
+            todo.append(k)
+    print(f"{len(imgs)} Bild(er), {len(imgs) - len(todo)} aus dem Cache, {len(todo)} zu prüfen ({args.workers} Prozesse)")
+    if todo:
+        with ProcessPoolExecutor(max_workers=args.workers) as ex:
+            for k, res in zip(todo, ex.map(check_file, todo, [len(NAMES)] * len(todo), chunksize=16)):
+                results[k] = res
+        new_cache = {k: {"key": keys[k], "res": results[k]} for k in results}
+        try:
+            tmp = CACHE_FILE.with_suffix(".tmp")
+            CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(new_cache), encoding="utf-8")
+            os.replace(tmp, CACHE_FILE)
+        except Exception as e:
+            print(f"WARN: Cache nicht gespeichert: {e}")
+
+    # ---- Auswertung ----
+    errors = {k: r["errors"] for k, r in results.items() if r["errors"]}
+    warnings = {k: r["warnings"] for k, r in results.items() if r["warnings"]}
+    by_hash = defaultdict(list)
+    for k, r in results.items():
+        if r["sha1"]:
+            by_hash[r["sha1"]].append(k)
+    duplicates = [sorted(v) for v in by_hash.values() if len(v) > 1]
+    cls_boxes = Counter()
+    cls_images = Counter()
+    sizes = []
+    counts = []
+    for r in results.values():
+        counts.append(len(r["boxes"]))
+        for c in set(b[0] for b in r["boxes"]):
+            cls_images[c] += 1
+        for c, pw, ph in r["boxes"]:
+            cls_boxes[c] += 1
+            sizes.append((pw * ph) ** 0.5)
+    labels = Counter(r["label"] for r in results.values())
+    report = {
+        "src": str(args.src),
+        "images": len(results),
+        "labels": dict(labels),
+        "classes": {NAMES[c]: {"boxes": cls_boxes[c], "images": cls_images[c]} for c in range(len(NAMES))},
+        "boxes_per_image": _histogram(counts, COUNT_BINS),
+        "box_size_px": _histogram(sizes, SIZE_BINS),
+        "errors": errors,
+        "warnings": warnings,
+        "duplicates": duplicates,
+        "seconds": round(time.time() - t0, 2),
+    }
+
+    print(f"\nLabels: {dict(labels)}")
+    for name, v in report["classes"].items():
+        print(f"  {name:10s} {v['boxes']:6d} Boxen in {v['images']:5d} Bildern")
+    print(f"Boxen pro Bild: {report['boxes_per_image']}")
+    print(f"Boxgröße sqrt(w*h) [px]: {report['box_size_px']}")
+    for k, errs in sorted(errors.items()):
+        print(f"FEHLER {Path(k).name}: " + "; ".join(errs))
+    for k, w in sorted(warnings.items()):
+        print(f"WARN   {Path(k).name}: " + "; ".join(w))
+    for grp in duplicates:
+        print("DUPLIKAT: " + ", ".join(Path(x).name for x in grp))
+    print(f"\n{len(errors)} Datei(en) mit Fehlern, {len(warnings)} mit Warnungen, {len(duplicates)} Duplikat-Gruppe(n) – {report['seconds']}s")
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 1 if (args.strict and errors) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+# file: prelabel.py
+# Vorab-Labeln: aktuelles Modell über unbeschriftete Bilder laufen lassen → YOLO-.txt-Vorschläge
+#
+# - Vorschläge landen in <name>.prelabel.txt (Standard-YOLO-Format, class cx cy w h, normiert), atomar
+#   geschrieben – NICHT in <name>.txt: prepare_and_train.py behandelt jede .txt als geprüftes Label
+#   (eine leere .txt als Negativbild). Erst nach Durchsicht mit --promote zur .txt machen.
+# - Bilder mit vorhandener .txt oder .prelabel.txt werden übersprungen (auch von einem abgebrochenen Lauf) → fortsetzbar
+# - daneben <name>.prelabel.json mit Konfidenz je Box und review-Flag (leer oder unsichere Box)
+# - am Ende prelabel_review.txt mit allen Bildern, die besonders geprüft werden sollten
+#
+# Aufruf:
+#   python prelabel.py --src dataset/images_raw --weights runs/detect/train/weights/best.pt
+#   python prelabel.py --src ../unkrautroboter_bilderkennung/training --workers 4
+#   python prelabel.py --promote dataset/images_raw/img_001.jpg ...   # geprüfte Vorschläge übernehmen
+
+import argparse, json, os, sys, time
+from multiprocessing import Pool
+from pathlib import Path
+
+# ===== CONFIG =====
+SRC_DIR = Path("dataset") / "images_raw"
+WEIGHTS = Path("runs") / "detect" / "train" / "weights" / "best.pt"
+IMGSZ = 640
+CONF = 0.25  # Boxen darunter werden nicht vorgeschlagen
+REVIEW_CONF = 0.5  # Boxen darunter → Bild zur Prüfung markieren
+WORKERS = max(1, (os.cpu_count() or 2) - 1)
+EXTS = {".jpg", ".jpeg", ".png"}
+PROPOSAL_SUFFIX = ".prelabel.txt"
+META_SUFFIX = ".prelabel.json"
+REVIEW_FILE = "prelabel_review.txt"
+
+# ==================
+
+_model = None
+_args = None
+
+
+def _init_worker(weights, imgsz, conf, review_conf):
+    # Pro Prozess ein Modell und ein Torch-Thread (sonst überbuchen sich die Worker)
+    global _model, _args
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+    import torch
+    from ultralytics import YOLO
+
+    torch.set_num_threads(1)
+    _model = YOLO(str(weights))
+    _args = {"imgsz": imgsz, "conf": conf, "review_conf": review_conf}
+
+
+def _write_atomic(path: Path, text: str):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _label_one(img_path: str):
+    img = Path(img_path)
+    lbl = img.with_suffix(PROPOSAL_SUFFIX)
+    if img.with_suffix(".txt").exists() or lbl.exists():  # inzwischen von Hand oder von einem anderen Lauf beschriftet
+        return img_path, None, False
+    try:
+        res = _model.predict(source=img_path, imgsz=_args["imgsz"], conf=_args["conf"], verbose=False, save=False)
+        r = res[0]
+        rows, boxes = [], []
+        if r.boxes is not None and len(r.boxes):
+            xywhn = r.boxes.xywhn.cpu().numpy()
+            confs = r.boxes.conf.cpu().numpy()
+            clss = r.boxes.cls.cpu().numpy().astype(int)
+            for (cx, cy, w, h), cf, cl in zip(xywhn, confs, clss):
+                rows.append(f"{cl} {cx:.6f} {cy:.6f} {w:.6f} {h:.6f}")
+                boxes.append({"cls": int(cl), "conf": round(float(cf), 4)})
+        review = (not boxes) or any(b["conf"] < _args["review_conf"] for b in boxes)
+        meta = {"model": str(getattr(_model, "ckpt_path", "") or ""), "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "review": review, "boxes": boxes}
+        # Sidecar zuerst: existiert die .prelabel.txt, ist der Eintrag vollständig
+        _write_atomic(img.with_suffix(META_SUFFIX), json.dumps(meta, indent=1))
+        _write_atomic(lbl, "\n".join(rows) + ("\n" if rows else ""))
+        return img_path, len(rows), review
+    except Exception as e:
+        print(f"[WARN] {img.name}: {e}", file=sys.stderr)
+        return img_path, None, False
+
+
+def collect_unlabeled(src: Path):
+    imgs = sorted(p for p in src.rglob("*") if p.is_file() and p.suffix.lower() in EXTS)
+    return [p for p in imgs if not p.with_suffix(".txt").exists() and not p.with_suffix(PROPOSAL_SUFFIX).exists()], len(imgs)
+
+
+def promote(images):
+    # Geprüfte Vorschläge zur echten .txt machen (vorhandene .txt wird nie überschrieben)
+    n = 0
+    for img in images:
+        prop, lbl = img.with_suffix(PROPOSAL_SUFFIX), img.with_suffix(".txt")
+        if not prop.exists():
+            print(f"[WARN] kein Vorschlag für {img}", file=sys.stderr)
+        elif lbl.exists():
+            print(f"[WARN] {lbl.name} existiert bereits – Vorschlag bleibt liegen", file=sys.stderr)
+        else:
+            os.replace(prop, lbl)
+            img.with_suffix(META_SUFFIX).unlink(missing_ok=True)
+            n += 1
+    print(f"{n} Vorschlag/Vorschläge übernommen")
+    return 0
+
+
+def main():
+    ap = argparse.ArgumentParser(description="YOLO-Vorschläge für unbeschriftete Bilder erzeugen")
+    ap.add_argument("--src", type=Path, default=SRC_DIR)
+    ap.add_argument("--weights", type=Path, default=WEIGHTS)
+    ap.add_argument("--imgsz", type=int, default=IMGSZ)
+    ap.add_argument("--conf", type=float, default=CONF)
+    ap.add_argument("--review-conf", type=float, default=REVIEW_CONF)
+    ap.add_argument("--workers", type=int, default=WORKERS)
+    ap.add_argument("--promote", type=Path, nargs="+", metavar="BILD", help="geprüfte Vorschläge dieser Bilder als .txt übernehmen")
+    args = ap.parse_args()
+    if args.promote:
+        return promote(args.promote)
+
+    assert args.src.exists(), f"Quellverzeichnis nicht gefunden: {args.src}"
+    assert args.weights.exists(), f"Gewichte nicht gefunden: {args.weights}"
+    # Nur eigene Reste eines abgebrochenen Laufs entfernen (_write_atomic: <ziel>.tmp)
+    for pattern in (f"*{PROPOSAL_SUFFIX}.tmp", f"*{META_SUFFIX}.tmp", f"{REVIEW_FILE}.tmp"):
+        for tmp in args.src.rglob(pattern):
+            tmp.unlink(missing_ok=True)
+    todo, total = collect_unlabeled(args.src)
+    print(f"{total} Bild(er), davon {len(todo)} ohne Label → Vorab-Labeln mit {args.workers} Prozess(en)")
+    if not todo:
+        return 0
+
+    t0 = time.time()
+    done = boxes = 0
+    review = []
+    with Pool(args.workers, initializer=_init_worker, initargs=(args.weights, args.imgsz, args.conf, args.review_conf)) as pool:
+        for img_path, n, rev in pool.imap_unordered(_label_one, [str(p) for p in todo], chunksize=4):
+            if n is None:
+                continue
+            done += 1
+            boxes += n
+            if rev:
+                review.append(img_path)
+            if done % 50 == 0:
+                rate = done / max(1e-6, time.time() - t0)
+                print(f"  {done}/{len(todo)} ({rate:.1f} Bilder/s)")
+
+    review_file = args.src / REVIEW_FILE
+    old = set(review_file.read_text(encoding="utf-8").split()) if review_file.exists() else set()
+    _write_atomic(review_file, "\n".join(sorted(old | set(review))) + "\n")
+    print(f"Fertig: {done} Bild(er), {boxes} Box(en) in {time.time() - t0:.0f}s; {len(review)} zur Prüfung → {review_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
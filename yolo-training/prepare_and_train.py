@@ -1,7 +1,7 @@
 # file: prepare_and_train.py
-# All‑in‑one: YAML erzeugen → 80/20 splitten (mit Shuffle) → YOLOv8m trainieren
+# All‑in‑one: YAML erzeugen → 80/20 splitten (deterministisch per Hash, inkrementell) → YOLOv8m trainieren
 
-import os, shutil, random
+import hashlib, json, os, platform, shutil, time
 from pathlib import Path
 
 # ===== CONFIG =====
@@ -13,11 +13,17 @@ IMGSZ = 640
 EPOCHS = 100
 BATCH = 8
 VAL_SPLIT = 0.20
-SEED = 42
-SHUFFLE = True
-CLEAN_SPLIT = True  # train/val vorab leeren
+SEED = 42  # Salz für die Hash-Zuordnung train/val (ändern = neuer Split)
+CLEAN_SPLIT = False  # True: train/val vorab leeren und alles neu verlinken (Zuordnung bleibt gleich)
+SPLIT_MANIFEST = DATASET_DIR / "split_manifest.json"
 PROJECT = "runs"
 RUN_NAME = "train"
+# Modell-Registry: jedes Training landet versioniert in REGISTRY_DIR/<tag>/ (best.pt, best.onnx, meta.json).
+# Auf den Pi kopieren nach unkrautroboter_bilderkennung/model/registry/ und YOLO_MODEL_TAG setzen.
+REGISTRY_DIR = Path("registry")
+PUBLISH_TO_REGISTRY = True
+EXPORT_FORMATS = ["onnx"]  # zusätzlich zu PyTorch (.pt)
+BENCH_RUNS = 20  # Referenz-Benchmark: CPU, 1 Thread, Bild imgsz x imgsz
 
 # ==================
 
@@ -76,60 +82,199 @@ def collect_pairs():
     return pairs
 
 
-def split_copy(pairs):
-    if SHUFFLE:
-        random.seed(SEED)
-        random.shuffle(pairs)
-    split_idx = int(len(pairs) * (1.0 - VAL_SPLIT))
-    train_pairs = pairs[:split_idx]
-    val_pairs = pairs[split_idx:]
+def split_of(name: str, seed=SEED, val_split=VAL_SPLIT) -> str:
+    # Deterministisch und stabil: hängt nur vom Dateinamen und SEED ab, nicht von den anderen Dateien
+    h = hashlib.sha1(f"{seed}:{name}".encode("utf-8")).digest()
+    return "val" if int.from_bytes(h[:8], "big") / 2.0**64 < val_split else "train"
 
-    dst_im_train = DATASET_DIR / "images" / "train"
-    dst_im_val = DATASET_DIR / "images" / "val"
-    dst_lb_train = DATASET_DIR / "labels" / "train"
-    dst_lb_val = DATASET_DIR / "labels" / "val"
 
-    # Nur in train kopieren
-    for img, lbl in train_pairs:
-        shutil.copy2(img, dst_im_train / img.name)
-        out = dst_lb_train / (img.stem + ".txt")
-        if lbl.exists():
-            shutil.copy2(lbl, out)
-        else:
-            out.write_text("", encoding="utf-8")
+def link_or_copy(src: Path, dst: Path) -> str:
+    # Hardlink (kein zusätzlicher Platz) → Symlink → Kopie als letzter Ausweg
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+        return "link"
+    except OSError:
+        pass
+    try:
+        os.symlink(src.resolve(), dst)
+        return "symlink"
+    except OSError:
+        shutil.copy2(src, dst)
+        return "copy"
+
+
+def _stat_key(p: Path):
+    try:
+        st = p.stat()
+        return [st.st_size, st.st_mtime_ns]
+    except FileNotFoundError:
+        return None
+
+
+def load_manifest():
+    try:
+        m = json.loads(SPLIT_MANIFEST.read_text(encoding="utf-8"))
+        if m.get("seed") == SEED:
+            return m
+        print(f"Manifest mit anderem SEED ({m.get('seed')}) – Split wird neu aufgebaut.")
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"WARN: Manifest unlesbar ({e}) – Split wird neu aufgebaut.")
+    return None
+
+
+def manifest_hash(manifest) -> str:
+    # Fingerabdruck des Datensatzes (Dateien, Zuordnung, Größe/Zeitstempel) für die Modell-Registry
+    items = sorted((k, v["split"], v["img"], v["lbl"]) for k, v in manifest["files"].items())
+    return hashlib.sha256(json.dumps(items).encode("utf-8")).hexdigest()
+
+
+def split_link(pairs):
+    manifest = None if CLEAN_SPLIT else load_manifest()
+    if manifest is None:
+        # Ohne gültiges Manifest unbekannte Altbestände (z. B. aus Kopier-Läufen) entfernen
+        clear_all_workdirs()
+        manifest = {"version": 1, "seed": SEED, "val_split": VAL_SPLIT, "files": {}}
+    files = manifest["files"]
+
+    current = {}
+    for img, lbl in pairs:
+        key = img.relative_to(RAW_DIR.resolve()).as_posix()
+        current[key] = (img, lbl)
 
-    # Nur in val kopieren
-    for img, lbl in val_pairs:
-        shutil.copy2(img, dst_im_val / img.name)
-        out = dst_lb_val / (img.stem + ".txt")
+    added = updated = removed = 0
+    methods = {}
+    # Entfernte Bilder: verlinkte Dateien löschen
+    for key in sorted(set(files) - set(current)):
+        e = files.pop(key)
+        (DATASET_DIR / "images" / e["split"] / e["name"]).unlink(missing_ok=True)
+        (DATASET_DIR / "labels" / e["split"] / (Path(e["name"]).stem + ".txt")).unlink(missing_ok=True)
+        removed += 1
+
+    for key, (img, lbl) in sorted(current.items()):
+        e = files.get(key)
+        # Bestehende Zuordnung bleibt erhalten (auch wenn VAL_SPLIT geändert wurde)
+        split = e["split"] if e else split_of(key)
+        img_key, lbl_key = _stat_key(img), _stat_key(lbl)
+        dst_img = DATASET_DIR / "images" / split / img.name
+        dst_lbl = DATASET_DIR / "labels" / split / (img.stem + ".txt")
+        if e and e["img"] == img_key and e["lbl"] == lbl_key and dst_img.exists() and dst_lbl.exists():
+            continue
+        m = link_or_copy(img, dst_img)
+        methods[m] = methods.get(m, 0) + 1
         if lbl.exists():
-            shutil.copy2(lbl, out)
+            link_or_copy(lbl, dst_lbl)
+        else:
+            # Ohne Label: leere .txt (Negativbeispiel), wie bisher
+            dst_lbl.unlink(missing_ok=True)
+            dst_lbl.write_text("", encoding="utf-8")
+        files[key] = {"split": split, "name": img.name, "img": img_key, "lbl": lbl_key}
+        if e:
+            updated += 1
         else:
-            out.write_text("", encoding="utf-8")
+            added += 1
+
+    tmp = SPLIT_MANIFEST.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+    os.replace(tmp, SPLIT_MANIFEST)
 
-    # Nach dem Kopieren:
-    print("Nach split_copy:")
-    train_list = list(dst_im_train.glob("*"))
-    val_list = list(dst_im_val.glob("*"))
+    n_val = sum(1 for e in files.values() if e["split"] == "val")
     print(
-        f"Split: train {len(train_pairs)} | val {len(val_pairs)} | unique files -> train {len(train_list)} | val {len(val_list)}"
+        f"Split: train {len(files) - n_val} | val {n_val} | neu {added}, geändert {updated}, entfernt {removed}"
+        + (f" | {methods}" if methods else "")
     )
-    # Überschneidungen prüfen (sollten 0 sein) – keine nachträgliche Bereinigung für deterministisches Verhalten
-    overlap = set(p.name for p in train_list) & set(p.name for p in val_list)
+    # Überschneidungen prüfen (gleicher Dateiname in verschiedenen Unterordnern von RAW_DIR)
+    train_names = set(p.name for p in (DATASET_DIR / "images" / "train").iterdir())
+    val_names = set(p.name for p in (DATASET_DIR / "images" / "val").iterdir())
+    overlap = train_names & val_names
     if overlap:
         print(f"WARN: Überschneidung zwischen train und val: {sorted(list(overlap))}")
+    return manifest
+
+
+def bench_cpu_ms(weights: Path, imgsz: int, runs: int = BENCH_RUNS):
+    # Referenz-Latenz (p50, ms) auf der CPU mit einem Thread – wie im Inferenz-Subprozess des Roboters
+    import numpy as np
+    import torch
+    from ultralytics import YOLO
+
+    torch.set_num_threads(1)
+    m = YOLO(str(weights), task="detect")
+    img = np.zeros((imgsz, imgsz, 3), dtype=np.uint8)
+    for _ in range(3):
+        m.predict(source=img, imgsz=imgsz, device="cpu", verbose=False)
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        m.predict(source=img, imgsz=imgsz, device="cpu", verbose=False)
+        times.append((time.perf_counter() - t0) * 1000.0)
+    times.sort()
+    return round(times[len(times) // 2], 1)
+
+
+def publish_to_registry(best: Path, manifest, results, tag=None):
+    tag = tag or f"{time.strftime('%Y%m%d-%H%M')}-{RUN_NAME}"
+    dst = REGISTRY_DIR / tag
+    dst.mkdir(parents=True, exist_ok=False)
+    formats = {"pt": "best.pt"}
+    shutil.copy2(best, dst / "best.pt")
+    from ultralytics import YOLO
+
+    for fmt in EXPORT_FORMATS:
+        try:
+            out = Path(YOLO(str(best)).export(format=fmt, imgsz=IMGSZ))
+            if out.is_file():
+                shutil.copy2(out, dst / out.name)
+            else:
+                shutil.copytree(out, dst / out.name)
+            formats[fmt] = out.name
+        except Exception as e:
+            print(f"WARN: Export {fmt} fehlgeschlagen: {e}")
+    latency = {}
+    for fmt, name in formats.items():
+        try:
+            latency[fmt] = bench_cpu_ms(dst / name, IMGSZ)
+        except Exception as e:
+            print(f"WARN: Benchmark {fmt} fehlgeschlagen: {e}")
+    metrics = {}
+    try:
+        metrics = {k: round(float(v), 5) for k, v in dict(getattr(results, "results_dict", {}) or {}).items()}
+    except Exception:
+        pass
+    n_val = sum(1 for e in manifest["files"].values() if e["split"] == "val")
+    meta = {
+        "tag": tag,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": platform.node(),
+        "formats": formats,
+        "latency_ms_cpu1": latency,
+        "metrics": metrics,
+        "train": {"base_model": MODEL, "imgsz": IMGSZ, "epochs": EPOCHS, "batch": BATCH, "names": NAMES, "rect": True},
+        "dataset": {
+            "manifest_hash": manifest_hash(manifest),
+            "seed": SEED,
+            "val_split": VAL_SPLIT,
+            "train_images": len(manifest["files"]) - n_val,
+            "val_images": n_val,
+        },
+    }
+    (dst / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    print(f"Registry: {dst} | Formate {list(formats)} | Latenz {latency} ms")
+    return dst
 
 
 def main():
 
     assert RAW_DIR.exists(), f"RAW_DIR nicht gefunden: {RAW_DIR}"
     ensure_dirs()
-    clear_all_workdirs()  # Immer aufräumen, unabhängig von CLEAN_SPLIT
 
     pairs = collect_pairs()
     assert pairs, f"Keine Bilder in {RAW_DIR} gefunden."
     write_dataset_yaml(Path("dataset.yaml"), NAMES)
-    split_copy(pairs)
+    manifest = split_link(pairs)
+    print(f"Datensatz-Hash: {manifest_hash(manifest)[:16]}")
 
     # Train starten (Python-API vermeidet CLI-Abhängigkeiten)
     from ultralytics import YOLO
@@ -145,13 +290,19 @@ def main():
         project=PROJECT,
         name=RUN_NAME,
     )
-    # Pfad zur best.pt ausgeben
-    out_dir = Path(PROJECT) / "detect" / RUN_NAME / "weights" / "best.pt"
+    # Pfad zur best.pt vom Trainer übernehmen (Ultralytics hängt bei belegtem RUN_NAME z. B. "2" an)
+    trainer = getattr(model, "trainer", None)
+    if trainer is not None and getattr(trainer, "best", None):
+        out_dir = Path(trainer.best)
+    else:
+        out_dir = Path(PROJECT) / RUN_NAME / "weights" / "best.pt"
     print("\n=== Training fertig ===")
     print(
         "best.pt:",
         out_dir if out_dir.exists() else "(noch nicht gefunden – siehe runs/...)",
     )
+    if PUBLISH_TO_REGISTRY and out_dir.exists():
+        publish_to_registry(out_dir, manifest, results)
 
 
 if __name__ == "__main__":